@@ -0,0 +1,142 @@
+import hashlib
+import io
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Callable, Optional
+from urllib.request import Request, urlopen
+
+from ovos_config.meta import get_xdg_base
+from ovos_utils.log import LOG
+from ovos_utils.xdg_utils import xdg_cache_home
+
+
+class ArtworkCache:
+    """ On disk cache of remote artwork for the GUI and MPRIS
+
+    - `get` never blocks, unknown urls are fetched in the background and the
+      remote url is returned until the local copy is ready
+    - images are downscaled to `max_size` pixels if Pillow is installed,
+      otherwise they are stored as downloaded (up to `max_file_size` bytes)
+    - least recently used files are evicted once `max_cache_size` bytes is exceeded
+    """
+
+    def __init__(self, path: str = None, max_size: int = 512,
+                 max_cache_size: int = 50 * 1024 * 1024,
+                 max_file_size: int = 2 * 1024 * 1024, timeout: float = 10,
+                 on_update: Callable[[str], None] = None):
+        """
+        @param path: cache directory, defaults to the XDG cache dir
+        @param max_size: max thumbnail width/height in pixels
+        @param max_cache_size: max total bytes on disk
+        @param max_file_size: max bytes of a single downloaded image
+        @param timeout: download timeout in seconds
+        @param on_update: called with the remote url once its local copy is ready
+        """
+        self.path = path or os.path.join(xdg_cache_home(), get_xdg_base(), "ocp_artwork")
+        os.makedirs(self.path, exist_ok=True)
+        self.max_size = max_size
+        self.max_cache_size = max_cache_size
+        self.max_file_size = max_file_size
+        self.timeout = timeout
+        self.on_update = on_update
+        self._lock = Lock()
+        self._pending = set()
+        self._failed = set()  # not retried until restart
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="OCPArtwork")
+        # file name -> size in bytes, least recently used first
+        self._index = OrderedDict()
+        self._total = 0
+        files = [f for f in os.scandir(self.path)
+                 if f.is_file() and not f.name.endswith(".tmp")]
+        for f in sorted(files, key=lambda f: f.stat().st_mtime):
+            self._index[f.name] = f.stat().st_size
+            self._total += self._index[f.name]
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def get(self, url: Optional[str]) -> Optional[str]:
+        """
+        @param url: artwork url
+        @return: file:// uri of the cached thumbnail, or `url` if it is not
+                 cached (yet) or is not a remote image
+        """
+        if not url or not url.startswith("http"):
+            return url
+        key = self._key(url)
+        with self._lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+                return "file://" + os.path.join(self.path, key)
+            if key in self._pending or key in self._failed:
+                return url
+            self._pending.add(key)
+        self._pool.submit(self._fetch, url, key)
+        return url
+
+    def _fetch(self, url: str, key: str):
+        try:
+            req = Request(url, headers={"User-Agent": "ovos-media"})
+            with urlopen(req, timeout=self.timeout) as r:
+                data = r.read(self.max_file_size + 1)
+            if len(data) > self.max_file_size:
+                LOG.debug(f"artwork too large to cache: {url}")
+                self._failed.add(key)
+                return
+            data = self._thumbnail(data)
+            file = os.path.join(self.path, key)
+            with open(file + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(file + ".tmp", file)
+            with self._lock:
+                self._total += len(data) - self._index.pop(key, 0)
+                self._index[key] = len(data)
+                self._evict()
+        except Exception as e:
+            LOG.debug(f"failed to cache artwork {url}: {e}")
+            self._failed.add(key)
+            return
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+        if self.on_update:
+            try:
+                self.on_update(url)
+            except Exception as e:
+                LOG.error(f"artwork update callback failed: {e}")
+
+    def _thumbnail(self, data: bytes) -> bytes:
+        try:
+            # NOTE: imported on first download, not at startup
+            from PIL import Image
+        except ImportError:
+            return data
+        try:
+            img = Image.open(io.BytesIO(data))
+            if max(img.size) <= self.max_size:
+                return data
+            img.thumbnail((self.max_size, self.max_size))
+            out = io.BytesIO()
+            if img.mode in ("RGBA", "LA", "P"):
+                img.save(out, format="PNG")
+            else:
+                img.convert("RGB").save(out, format="JPEG", quality=85)
+            return out.getvalue()
+        except Exception as e:
+            LOG.debug(f"failed to resize artwork: {e}")
+            return data
+
+    def _evict(self):
+        while self._total > self.max_cache_size and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(os.path.join(self.path, key))
+            except OSError:
+                pass
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,141 @@
+import time
+from os.path import dirname
+from threading import RLock
+
+from json_database import JsonStorageXDG
+
+from ovos_config.meta import get_xdg_base
+from ovos_media.search import SearchResults
+from ovos_utils.log import LOG
+from ovos_utils.messagebus import Message
+from ovos_utils.ocp import MediaType, PlaybackType
+from ovos_workshop.decorators.ocp import ocp_search
+from ovos_workshop.skills.common_play import OVOSCommonPlaybackSkill
+
+
+class OCPMediaCatalog(OVOSCommonPlaybackSkill):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.skill_icon = f"{dirname(__file__)}/qt5/images/liked.svg"
+
+        self.liked_songs = JsonStorageXDG("OCP_liked_songs",
+                                          subfolder=get_xdg_base())
+        LOG.debug(f"Liked songs playlist loaded: {self.liked_songs.path}")
+        self.search_playlist = SearchResults()
+        self.ocp_skills = {}
+        self.featured_skills = {}
+        self.search_lock = RLock()
+        self.library = None  # LocalMediaLibrary, set by the player if configured
+        self.add_event("ovos.common_play.skills.detach", self.handle_ocp_skill_detach)
+        self.add_event("ovos.common_play.announce", self.handle_skill_announce)
+
+        # TODO - add search results clear/replace events
+
+        # register keywords
+        def norm_name(n):
+            return n.split("|")[0].split("(")[0].split("[")[0].split("{")[0].split("-")[0].strip()
+
+        self.register_ocp_keyword(MediaType.MUSIC, "song_name",
+                                  [norm_name(n["title"]) for n in self.liked_songs.values()])
+        self.register_ocp_keyword(MediaType.MUSIC, "playlist_name",
+                                  ["favorite", "liked", "favorites",
+                                   "favorite songs", "favorite tracks",
+                                   "favorite music", "my favorite songs",
+                                   "my favorite tracks", "my favorite music",
+                                   "liked songs", "liked tracks", "liked music",
+                                   "my liked songs", "my liked tracks", "my liked music"])
+
+    @ocp_search()
+    def search_db(self, phrase, media_type):
+        base_score = 15 if media_type == MediaType.MUSIC else 0
+        entities = self.ocp_voc_match(phrase)
+        base_score += 30 * len(entities)
+
+        if entities.get("playlist_name"):
+            if phrase.lower() == entities["playlist_name"]:
+                base_score = 100
+            yield {
+                "match_confidence": min(base_score + 35, 100),
+                "media_type": MediaType.MUSIC,
+                "playback": PlaybackType.AUDIO,
+                "playlist": self.liked_songs_playlist,  # return full playlist result
+                "skill_icon": self.skill_icon,
+                "title": "Liked Songs",
+                "skill_id": self.skill_id
+            }
+
+        if entities.get("song_name"):
+            title = entities["song_name"]
+            candidates = [song for song in self.liked_songs_playlist
+                          if title.lower() in song["title"].lower()]
+            for c in candidates:
+                c["match_confidence"] = min(base_score + 40, 100)
+                c["media_type"] = MediaType.MUSIC
+                c["playback"] = PlaybackType.AUDIO
+                c["skill_id"] = self.skill_id
+                c["skill_icon"] = self.skill_icon
+                yield c
+
+        if self.library:
+            for track in self.library.search(phrase):
+                if media_type not in (MediaType.GENERIC, MediaType.MUSIC, track["media_type"]):
+                    continue
+                track["skill_id"] = self.skill_id
+                track["skill_icon"] = self.skill_icon
+                yield track
+
+    @property
+    def liked_songs_playlist(self):
+        pl = list(self.liked_songs.values())
+        for idx, p in enumerate(pl):
+            pl[idx]["media_type"] = MediaType.MUSIC
+            pl[idx]["playback"] = PlaybackType.AUDIO
+            # HACK to allow sort_by_conf to work once this is in a Playlist object
+            pl[idx]["match_confidence"] = p.get("play_count", 0) + 50
+        return sorted(pl, key=lambda k: k.get("play_count", 0), reverse=True)
+
+    def handle_skill_announce(self, message):
+        skill_id = message.data.get("skill_id")
+        skill_name = message.data.get("skill_name") or skill_id
+        img = message.data.get("image") or message.data.get("thumbnail")
+        has_featured = bool(message.data.get("featured_tracks"))
+        media_types = message.data.get("media_types") or \
+                      message.data.get("media_type") or \
+                      [MediaType.GENERIC]
+
+        if skill_id not in self.ocp_skills:
+            LOG.debug(f"Registered {skill_id}")
+            self.ocp_skills[skill_id] = []
+
+        if has_featured:
+            LOG.debug(f"Found skill with featured media: {skill_id}")
+            self.featured_skills[skill_id] = {
+                "skill_id": skill_id,
+                "skill_name": skill_name,
+                "image": img,
+                "media_types": media_types
+            }
+
+    def handle_ocp_skill_detach(self, message):
+        skill_id = message.data["skill_id"]
+        if skill_id in self.ocp_skills:
+            self.ocp_skills.pop(skill_id)
+        if skill_id in self.featured_skills:
+            self.featured_skills.pop(skill_id)
+
+    def get_featured_skills(self, adult=False):
+        # trigger a presence announcement from all loaded ocp skills
+        self.bus.emit(Message("ovos.common_play.skills.get"))
+        time.sleep(0.2)
+        skills = list(self.featured_skills.values())
+        if adult:
+            return skills
+        return [s for s in skills
+                if MediaType.ADULT not in s["media_types"] and
+                MediaType.HENTAI not in s["media_types"]]
+
+    def clear(self):
+        self.search_playlist.clear()
+
+    def replace(self, playlist):
+        self.search_playlist.replace(playlist)
@@ -0,0 +1,318 @@
+import time
+from collections import deque
+from functools import wraps
+from threading import Condition, Event, Thread, Timer, current_thread
+from typing import Callable, Optional
+
+from ovos_utils.log import LOG
+
+
+class CommandCancelled(Exception):
+    """ The running command was superseded while waiting on a blocking step """
+
+
+class PlayerCommand:
+    """ A queued player operation """
+
+    def __init__(self, name: str, func: Callable, args: tuple = (), kwargs: dict = None):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.submitted = time.monotonic()
+        self.cancel_event = Event()
+        self.timer: Optional[Timer] = None  # set for scheduled commands
+        self.waiters = []  # Events of blocking steps, woken up on cancel
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        self.cancel_event.set()
+        for waiter in list(self.waiters):
+            waiter.set()
+        if self.timer:
+            self.timer.cancel()
+
+    def __repr__(self):
+        return f"PlayerCommand({self.name})"
+
+
+class PlayerCommandExecutor:
+    """ Runs player commands one at a time, in order, on a dedicated thread
+
+    - a new command drops pending commands it supersedes and flags the
+      in-flight one as cancelled, long running commands check
+      `executor.cancelled` between steps and bail out early
+    - blocking steps run through `run_cancellable` are abandoned as soon as
+      the command is cancelled, so the next command starts right away
+    - commands can be scheduled to run later, superseding also cancels them
+    - queue depth and per command latency are tracked in `metrics`
+    """
+    # command -> commands made obsolete by it
+    # "recover" is the automatic skip after a playback error,
+    # any user command takes over from it
+    # "mpris_sync" applies the latest external player state, only the
+    # newest one matters and local playback makes it obsolete
+    # "stop" clears the playlist, queued playlist changes are dropped too
+    SUPERSEDES = {
+        "stop": ("play", "next", "prev", "pause", "resume", "seek", "recover",
+                 "mpris_sync", "playlist"),
+        "play": ("play", "next", "prev", "pause", "resume", "seek", "recover",
+                 "mpris_sync"),
+        "mpris_sync": ("mpris_sync",),
+        "next": ("recover",),
+        "prev": ("recover",),
+        "pause": ("recover",),
+        "pause_toggle": ("recover",),
+        "resume": ("recover",),
+        "seek": ("recover",),
+    }
+
+    def __init__(self, name: str = "OCPCommandExecutor"):
+        self._pending = deque()
+        self._cond = Condition()
+        self._current: Optional[PlayerCommand] = None
+        self._scheduled = []
+        self._running = True
+        self._stats = {}
+        self._cancelled = 0
+        self._superseded = 0
+        self._max_depth = 0
+        self._thread = Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, name: str, func: Callable, *args, **kwargs) -> PlayerCommand:
+        """
+        Queue a command for execution
+        @param name: command name, used for superseding and metrics
+        @param func: callable to execute
+        @return: the queued PlayerCommand
+        """
+        command = PlayerCommand(name, func, args, kwargs)
+        self._enqueue(command)
+        return command
+
+    def schedule(self, delay: float, name: str, func: Callable, *args, **kwargs) -> PlayerCommand:
+        """
+        Queue a command after `delay` seconds, unless superseded before that
+        @param delay: seconds to wait before queueing
+        @param name: command name, used for superseding and metrics
+        @param func: callable to execute
+        @return: the scheduled PlayerCommand
+        """
+        command = PlayerCommand(name, func, args, kwargs)
+        command.timer = Timer(delay, self._submit_scheduled, (command,))
+        command.timer.daemon = True
+        with self._cond:
+            if not self._running:
+                return command
+            self._scheduled.append(command)
+        command.timer.start()
+        return command
+
+    def _submit_scheduled(self, command: PlayerCommand):
+        with self._cond:
+            if command not in self._scheduled:
+                return
+            self._scheduled.remove(command)
+        if not command.cancelled:
+            self._enqueue(command)
+
+    def _enqueue(self, command: PlayerCommand):
+        name = command.name
+        obsolete = self.SUPERSEDES.get(name, ())
+        command.submitted = time.monotonic()
+        with self._cond:
+            if obsolete:
+                kept = deque(c for c in self._pending if c.name not in obsolete)
+                self._superseded += len(self._pending) - len(kept)
+                self._pending = kept
+                for c in [c for c in self._scheduled if c.name in obsolete]:
+                    c.cancel()
+                    self._scheduled.remove(c)
+                    self._superseded += 1
+                if self._current and self._current.name in obsolete \
+                        and not self._current.cancelled:
+                    LOG.debug(f"{name} cancels in-flight {self._current.name}")
+                    self._current.cancel()
+                    self._cancelled += 1
+            self._pending.append(command)
+            self._max_depth = max(self._max_depth, len(self._pending))
+            self._cond.notify()
+
+    def call(self, name: str, func: Callable, *args, timeout: float = None, **kwargs):
+        """
+        Run a command and wait for its result, for other threads that need
+        a consistent view of the player state (eg. snapshots)
+        @param name: command name, used for superseding and metrics
+        @param func: callable to execute
+        @param timeout: seconds to wait for the command to run
+        @return: the result of func
+        @raise CommandCancelled: if superseded, dropped or timed out
+        """
+        if current_thread() is self._thread:
+            return func(*args, **kwargs)  # already running as a command
+        done = Event()
+        outcome = {}
+
+        def run():
+            try:
+                outcome["result"] = func(*args, **kwargs)
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                done.set()
+
+        command = self.submit(name, run)
+        if not done.wait(timeout):
+            command.cancel()
+            raise CommandCancelled(name)
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
+
+    def wrap(self, func: Callable, name: str) -> Callable:
+        """
+        Return a bus handler that queues `func` instead of running it
+        @param func: handler receiving the Message
+        @param name: command name
+        """
+
+        @wraps(func)
+        def handler(*args, **kwargs):
+            self.submit(name, func, *args, **kwargs)
+
+        return handler
+
+    def run_cancellable(self, name: str, func: Callable, *args,
+                        on_abandoned: Callable = None, **kwargs):
+        """
+        Run a blocking step of the current command on a helper thread
+        @param name: step name, recorded in metrics as "{command}.{name}"
+        @param func: callable to execute
+        @param on_abandoned: called with the result if the step completes
+                             after the command was cancelled (eg. to undo it)
+        @return: the result of func
+        @raise CommandCancelled: as soon as the command is cancelled, the step
+                                 keeps running in the background
+        """
+        command = self._current
+        if current_thread() is not self._thread or command is None:
+            return func(*args, **kwargs)  # not running as a command
+        if command.cancelled:
+            raise CommandCancelled(command.name)
+        done = Event()
+        outcome = {}
+
+        def step():
+            try:
+                outcome["result"] = func(*args, **kwargs)
+            except BaseException as e:
+                outcome["error"] = e
+            done.set()
+            if command.cancelled and on_abandoned and "result" in outcome:
+                try:
+                    on_abandoned(outcome["result"])
+                except Exception as e:
+                    LOG.error(f"failed to undo abandoned {name}: {e}")
+
+        started = time.monotonic()
+        command.waiters.append(done)
+        try:
+            Thread(target=step, daemon=True, name=f"{self._thread.name}.{name}").start()
+            done.wait()
+        finally:
+            command.waiters.remove(done)
+        with self._cond:
+            self._record_step(f"{command.name}.{name}", time.monotonic() - started)
+        if "result" not in outcome and "error" not in outcome:
+            LOG.debug(f"{command.name} cancelled during {name}")
+            raise CommandCancelled(command.name)
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
+
+    @property
+    def cancelled(self) -> bool:
+        """
+        True if called from a command that has since been superseded
+        """
+        command = self._current
+        return current_thread() is self._thread and \
+            command is not None and command.cancelled
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    @property
+    def metrics(self) -> dict:
+        """
+        Queue depth and latency stats, latencies in seconds from
+        submission until the command finished executing
+        """
+        with self._cond:
+            return {"queue_depth": len(self._pending),
+                    "scheduled": [c.name for c in self._scheduled],
+                    "max_queue_depth": self._max_depth,
+                    "current": self._current.name if self._current else None,
+                    "cancelled": self._cancelled,
+                    "superseded": self._superseded,
+                    "commands": {k: dict(v) for k, v in self._stats.items()}}
+
+    def _record(self, command: PlayerCommand, started: float, finished: float):
+        stats = self._stats.setdefault(command.name, {"count": 0,
+                                                      "avg_latency": 0.0,
+                                                      "max_latency": 0.0,
+                                                      "avg_runtime": 0.0})
+        latency = finished - command.submitted
+        stats["count"] += 1
+        stats["avg_latency"] += (latency - stats["avg_latency"]) / stats["count"]
+        stats["avg_runtime"] += (finished - started - stats["avg_runtime"]) / stats["count"]
+        stats["max_latency"] = max(stats["max_latency"], latency)
+
+    def _record_step(self, name: str, runtime: float):
+        stats = self._stats.setdefault(name, {"count": 0, "avg_runtime": 0.0,
+                                              "max_runtime": 0.0})
+        stats["count"] += 1
+        stats["avg_runtime"] += (runtime - stats["avg_runtime"]) / stats["count"]
+        stats["max_runtime"] = max(stats["max_runtime"], runtime)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._pending:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                command = self._current = self._pending.popleft()
+            started = time.monotonic()
+            try:
+                command.func(*command.args, **command.kwargs)
+            except CommandCancelled:
+                LOG.info(f"{command} cancelled")
+            except Exception as e:
+                LOG.exception(f"{command} failed: {e}")
+            finished = time.monotonic()
+            with self._cond:
+                self._current = None
+                self._record(command, started, finished)
+
+    def shutdown(self, timeout: float = 5):
+        """
+        Drop pending and scheduled commands, cancel the in-flight one and
+        stop the worker
+        """
+        with self._cond:
+            self._running = False
+            self._pending.clear()
+            for c in self._scheduled:
+                c.cancel()
+            self._scheduled = []
+            if self._current:
+                self._current.cancel()
+            self._cond.notify_all()
+        if current_thread() is not self._thread:
+            self._thread.join(timeout)
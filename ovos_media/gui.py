@@ -1,9 +1,12 @@
 import enum
 import random
+import time
 from os.path import join, dirname
 from threading import Timer
 
 from ovos_bus_client.apis.gui import GUIInterface
+from ovos_bus_client.message import Message
+from ovos_utils.gui import is_gui_running
 from ovos_utils.ocp import *
 
 
@@ -16,6 +19,91 @@ class OCPGUIState(str, enum.Enum):
     PLAYBACK_ERROR = "playback_error"
 
 
+class GUIPresenceTracker:
+    """ Cached GUI presence, kept up to date from GUI bus events
+
+    answers "is a GUI attached?" instantly instead of a blocking
+    'gui.status.request' round trip for every track
+    """
+
+    def __init__(self, bus, refresh_interval: float = 300, enabled: bool = True):
+        """
+        @param bus: MessageBusClient to listen for GUI events on
+        @param refresh_interval: seconds before the cached value is
+                                 re-validated in the background
+        @param enabled: if False the GUI is always reported as disconnected
+        """
+        self.bus = bus
+        self.refresh_interval = refresh_interval
+        self.enabled = enabled
+        self._connected = enabled and is_gui_running()
+        self._last_update = 0
+        self._callbacks = []
+        if not enabled:
+            return
+        self.bus.on("gui.status.request.response", self.handle_gui_status)
+        self.bus.on("mycroft.gui.connected", self.handle_gui_connected)
+        self.bus.on("mycroft.gui.available", self.handle_gui_connected)
+        self.bus.on("mycroft.gui.disconnected", self.handle_gui_disconnected)
+        self.bus.on("mycroft.gui.unavailable", self.handle_gui_disconnected)
+        self.refresh()
+
+    @property
+    def connected(self) -> bool:
+        """
+        Return the cached GUI presence, never blocks
+        """
+        if not self.enabled:
+            return False
+        if time.monotonic() - self._last_update > self.refresh_interval:
+            self.refresh()  # answer arrives in handle_gui_status
+        return self._connected
+
+    def on_change(self, callback):
+        """
+        Register a callback called with the new value when presence changes
+        """
+        self._callbacks.append(callback)
+
+    def refresh(self):
+        """
+        Ask the GUI service for its status without waiting for the answer
+        """
+        self._last_update = time.monotonic()
+        self.bus.emit(Message("gui.status.request"))
+
+    def _set_connected(self, connected: bool):
+        self._last_update = time.monotonic()
+        if connected == self._connected:
+            return
+        LOG.info(f"GUI {'connected' if connected else 'disconnected'}")
+        self._connected = connected
+        for callback in self._callbacks:
+            try:
+                callback(connected)
+            except Exception as e:
+                LOG.error(f"GUI presence callback failed: {e}")
+
+    def handle_gui_status(self, message):
+        self._set_connected(bool(message.data.get("connected")))
+
+    def handle_gui_connected(self, message):
+        self._set_connected(True)
+
+    def handle_gui_disconnected(self, message):
+        # stop driving a GUI that is gone right away, not at the next refresh
+        self._set_connected(False)
+
+    def shutdown(self):
+        if not self.enabled:
+            return
+        self.bus.remove("gui.status.request.response", self.handle_gui_status)
+        self.bus.remove("mycroft.gui.connected", self.handle_gui_connected)
+        self.bus.remove("mycroft.gui.available", self.handle_gui_connected)
+        self.bus.remove("mycroft.gui.disconnected", self.handle_gui_disconnected)
+        self.bus.remove("mycroft.gui.unavailable", self.handle_gui_disconnected)
+
+
 class OCPGUIInterface(GUIInterface):
     def __init__(self):
         # the skill_id is chosen so the namespace matches the regular bus api
@@ -24,6 +112,7 @@ class OCPGUIInterface(GUIInterface):
                                               ui_directories={"qt5": f"{dirname(__file__)}/qt5"})
         self.ocp_skills = {}  # skill_id: meta
         self.notification_timeout = None
+        self.presence: GUIPresenceTracker = None
 
         # other components may interact with this via their own
         # GUIInterface if they share OCP_ID
@@ -36,21 +125,32 @@ class OCPGUIInterface(GUIInterface):
 
     def bind(self, player):
         self.player = player
-        super().set_bus(self.bus)
+        super().set_bus(player.bus)
+        self.presence = GUIPresenceTracker(
+            player.bus, player.ocp_config.get("gui_presence_refresh", 300),
+            enabled=not player.ocp_config.get("disable_gui", False))
+        self.presence.on_change(self.handle_presence_change)
+        # run as player commands, ordered with bus and voice requests
+        # and cancelled by stop like them
+        executor = self.player.executor
         self.player.add_event('ovos.common_play.playlist.play',
-                              self.handle_play_from_playlist)
+                              executor.wrap(self.handle_play_from_playlist, "play"))
         self.player.add_event('ovos.common_play.liked_tracks.play',
-                              self.handle_play_from_liked_tracks)
+                              executor.wrap(self.handle_play_from_liked_tracks, "play"))
         self.player.add_event('ovos.common_play.search.play',
-                              self.handle_play_from_search)
+                              executor.wrap(self.handle_play_from_search, "play"))
         self.player.add_event('ovos.common_play.skill.play',
-                              self.handle_play_skill_featured_media)
+                              executor.wrap(self.handle_play_skill_featured_media, "playlist"))
         self.player.add_event('ovos.common_play.home',
                               self.handle_home)
 
     def handle_home(self, message):
         self.manage_display(OCPGUIState.HOME)
 
+    def handle_presence_change(self, connected: bool):
+        if connected:  # rendering was skipped while headless, sync data now
+            self.prepare_gui_data()
+
     def release(self):
         self.clear()
         super().release()
@@ -60,13 +160,15 @@ class OCPGUIInterface(GUIInterface):
         skills_cards = [
             {"skill_id": skill["skill_id"],
              "title": skill["skill_name"],
-             "image": skill.get("image") or skill.get("thumbnail") or f"{dirname(__file__)}/qt5/images/placeholder.png"
+             "image": self.player.get_artwork(skill.get("image") or skill.get("thumbnail")) or
+                      f"{dirname(__file__)}/qt5/images/placeholder.png"
              } for skill in self.player.media.get_featured_skills()]
         self["skillCards"] = skills_cards
         liked_cards = sorted([
             {"uri": uri,
              "title": song["title"],
-             "image": song.get("image") or song.get("thumbnail") or f"{dirname(__file__)}/qt5/images/placeholder.png"
+             "image": self.player.get_artwork(song.get("image") or song.get("thumbnail")) or
+                      f"{dirname(__file__)}/qt5/images/placeholder.png"
              } for uri, song in self.player.media.liked_songs.items()
             if song["title"] and song.get("image")],
             key=lambda k: k.get("play_count", 0),
@@ -97,11 +199,10 @@ class OCPGUIInterface(GUIInterface):
         self["media"] = self.player.now_playing.infocard
         self["uri"] = self.player.now_playing.original_uri
         self["title"] = self.player.now_playing.title
-        self["image"] = self.player.now_playing.image or \
-                        join(dirname(__file__), "res/qt5/images/ocp.png")
+        image = self.player.get_artwork(self.player.now_playing.image)
+        self["image"] = image or join(dirname(__file__), "res/qt5/images/ocp.png")
         self["artist"] = self.player.now_playing.artist
-        self["bg_image"] = self.player.now_playing.image or \
-                           join(dirname(__file__), "res/qt5/images/ocp_bg.png")
+        self["bg_image"] = image or join(dirname(__file__), "res/qt5/images/ocp_bg.png")
         self["duration"] = self.player.now_playing.length
         self["position"] = self.player.now_playing.position
         # options below control the web player
@@ -113,17 +214,26 @@ class OCPGUIInterface(GUIInterface):
         self["allowUrlChange"] = False  # TODO allow to be defined per track
 
     def update_search_results(self):
+        prober = self.player.stream_prober
         self["searchModel"] = {
-            "data": [e.infocard for e in self.player.search_results]
+            "data": [prober.annotate(e, self._card(e)) if prober else self._card(e)
+                     for e in self.player.search_results]
         }
 
     def update_playlist(self):
         self["playlistModel"] = {
-            "data": [e.infocard for e in self.player.tracks]
+            "data": [self._card(e) for e in self.player.tracks]
         }
 
+    def _card(self, entry: MediaEntry) -> dict:
+        card = entry.infocard
+        card["image"] = self.player.get_artwork(card.get("image"))
+        return card
+
     # GUI
     def manage_display(self, state: OCPGUIState, timeout=None):
+        if not self.presence.connected:
+            return  # headless, skip all rendering work
         self.prepare_gui_data()
         # handle any state management needed before render
         if state == OCPGUIState.HOME:
@@ -145,6 +255,8 @@ class OCPGUIInterface(GUIInterface):
 
     # OCP pre-rendering
     def prepare_gui_data(self):
+        if not self.presence.connected:
+            return
         self.update_buttons()
         self.update_current_track()  # populate now_playing metadata
         self.update_playlist()  # populate self["playlistModel"]
@@ -152,6 +264,8 @@ class OCPGUIInterface(GUIInterface):
 
     # OCP rendering
     def render_pages(self, timeout=None, index=0):
+        if not self.presence.connected:
+            return
 
         pages = ["Home"]
 
@@ -270,19 +384,9 @@ class OCPGUIInterface(GUIInterface):
         LOG.info("Playback requested from playlist results")
         media = message.data["playlistData"]
         # if media is a playlist, it doesnt have a uri assigned
-
-        for track in self.player.search_results:
-            if isinstance(track, dict):
-                track = MediaEntry.from_dict(track)
-
-            if isinstance(track, MediaEntry) and \
-                    track.uri == media.get("uri"):  # found track
-                self.player.play_media(track)
-                break
-            elif isinstance(track, Playlist) and \
-                    track.title == media.get("track"):  # found playlist
-                self.player.play_media(track)
-                break
+        track = self.player.media.search_playlist.find(media)
+        if track:
+            self.player.play_media(track)
         else:
             LOG.error("Track is not part of loaded playlist!")
 
@@ -290,19 +394,9 @@ class OCPGUIInterface(GUIInterface):
         LOG.info("Playback requested from search results")
         media = message.data["playlistData"]
         # if media is a playlist, it doesnt have a uri assigned
-
-        for track in self.player.search_results:
-            if isinstance(track, dict):
-                track = MediaEntry.from_dict(track)
-
-            if isinstance(track, MediaEntry) and \
-                    track.uri == media.get("uri"):  # found track
-                self.player.play_media(track)
-                break
-            elif isinstance(track, Playlist) and \
-                    track.title == media.get("track"):  # found playlist
-                self.player.play_media(track)
-                break
+        track = self.player.media.search_playlist.find(media)
+        if track:
+            self.player.play_media(track)
         else:
             LOG.error("Track is not part of search results!")
 
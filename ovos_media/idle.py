@@ -0,0 +1,121 @@
+import time
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, List, Optional
+
+from ovos_utils.log import LOG
+
+
+class IdleReclaimer:
+    """ Releases resources that were not used for a while
+
+    resources (eg. media backends, stream extractors) are registered with a
+    release callback and `touch`ed whenever they are used, a background
+    thread releases the ones idle for longer than `timeout` seconds, the
+    owner reloads them on the next use and `touch`es them again
+    """
+
+    def __init__(self, timeout: float = 1800, interval: float = None):
+        """
+        @param timeout: seconds without use before a resource is released
+        @param interval: seconds between checks, defaults to timeout / 10
+        """
+        self.timeout = timeout
+        self.interval = interval or max(min(timeout / 10, 60), 1)
+        self._lock = Lock()
+        self._resources: Dict[str, dict] = {}
+        self._released = 0
+        self._stop = Event()
+        self._thread = Thread(target=self._run, daemon=True, name="OCPIdleReclaimer")
+        self._thread.start()
+
+    def register(self, key: str, release: Callable[[], None],
+                 in_use: Callable[[], bool] = None):
+        """
+        Track a loaded resource, counts as used now
+        @param key: unique resource name
+        @param release: callable freeing the resource
+        @param in_use: callable returning True while the resource must not be
+                       released (eg. the backend currently playing)
+        """
+        with self._lock:
+            self._resources[key] = {"release": release, "in_use": in_use,
+                                    "last_used": time.monotonic(), "loaded": True}
+
+    def unregister(self, key: str):
+        with self._lock:
+            self._resources.pop(key, None)
+
+    def touch(self, key: str):
+        """
+        Mark a resource as used (and loaded) now
+        """
+        with self._lock:
+            if key in self._resources:
+                self._resources[key]["last_used"] = time.monotonic()
+                self._resources[key]["loaded"] = True
+
+    def is_loaded(self, key: str) -> bool:
+        with self._lock:
+            return key in self._resources and self._resources[key]["loaded"]
+
+    def least_recently_used(self, prefix: str = "") -> Optional[str]:
+        """
+        @param prefix: only consider resources whose key starts with this
+        @return: key of the loaded resource unused for the longest time that
+                 is not in use, None if there is none
+        """
+        with self._lock:
+            candidates = sorted((r["last_used"], k) for k, r in self._resources.items()
+                                if r["loaded"] and k.startswith(prefix))
+        for _, key in candidates:
+            in_use = self._resources.get(key, {}).get("in_use")
+            try:
+                if in_use and in_use():
+                    continue
+            except Exception as e:
+                LOG.error(f"failed to check if {key} is in use: {e}")
+                continue
+            return key
+        return None
+
+    def reclaim(self, timeout: float = None) -> List[str]:
+        """
+        Release every resource idle for more than `timeout` seconds
+        @param timeout: override the configured timeout, 0 releases all idle resources
+        @return: keys of the released resources
+        """
+        timeout = self.timeout if timeout is None else timeout
+        now = time.monotonic()
+        with self._lock:
+            idle = [(k, r) for k, r in self._resources.items()
+                    if r["loaded"] and now - r["last_used"] >= timeout]
+        released = []
+        for key, res in idle:
+            try:
+                if res["in_use"] and res["in_use"]():
+                    self.touch(key)
+                    continue
+                LOG.info(f"releasing idle resource: {key}")
+                res["release"]()
+                res["loaded"] = False
+                released.append(key)
+            except Exception as e:
+                LOG.error(f"failed to release {key}: {e}")
+        self._released += len(released)
+        return released
+
+    @property
+    def metrics(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {"released": self._released,
+                    "resources": {k: {"loaded": r["loaded"],
+                                      "idle": round(now - r["last_used"], 1)}
+                                  for k, r in self._resources.items()}}
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.reclaim()
+
+    def shutdown(self):
+        self._stop.set()
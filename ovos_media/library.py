@@ -0,0 +1,300 @@
+import gzip
+import json
+import multiprocessing
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from threading import Event, Lock, Thread, Timer
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ovos_config.meta import get_xdg_base
+from ovos_utils.log import LOG
+from ovos_utils.ocp import MediaType, PlaybackType
+from ovos_utils.xdg_utils import xdg_cache_home
+
+AUDIO_EXTENSIONS = (".mp3", ".ogg", ".oga", ".opus", ".flac", ".m4a", ".aac", ".wav", ".wma")
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".webm", ".avi", ".mov", ".m4v")
+
+# index row, one per file, kept as a list so the index stays compact in memory and on disk
+MTIME, SIZE, TITLE, ARTIST, ALBUM, LENGTH = range(6)
+
+_STOPWORDS = {"the", "a", "an", "of", "and", "by", "to", "in", "on", "my",
+              "play", "song", "music", "track", "album", "some"}
+
+
+def _tokenize(text: str) -> List[str]:
+    return [w for w in re.findall(r"\w+", (text or "").lower())
+            if w not in _STOPWORDS]
+
+
+def read_tags(path: str) -> Tuple[str, str, str, int]:
+    """
+    Read title, artist, album and length (ms) of a media file, runs in the
+    scanner process pool
+
+    tags are read with mutagen if installed, otherwise they are guessed from
+    the file name ("Artist - Title.mp3") and the parent folder (album)
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    artist, _, title = name.rpartition(" - ")
+    album = os.path.basename(os.path.dirname(path))
+    length = 0
+    try:
+        import mutagen
+        tags = mutagen.File(path, easy=True)
+        if tags is not None:
+            title = (tags.get("title") or [title])[0]
+            artist = (tags.get("artist") or [artist])[0]
+            album = (tags.get("album") or [album])[0]
+            if tags.info and getattr(tags.info, "length", None):
+                length = int(tags.info.length * 1000)
+    except ImportError:
+        pass
+    except Exception as e:
+        LOG.debug(f"failed to read tags from {path}: {e}")
+    return title or name, artist, album, length
+
+
+class LocalMediaLibrary:
+    """ Index of local media files, searched by OCPMediaCatalog.search_db
+
+    - configured folders are walked in a background thread, only new or
+      changed files (by mtime and size) have their tags read, in a process
+      pool when there are many of them
+    - the index is stored gzipped in the XDG cache dir and loaded on start,
+      so a restart only stats files instead of reading them again
+    - folders are watched for changes if watchdog is installed, otherwise
+      they are rescanned every `rescan_interval` seconds
+    - searches use an in memory word index and do not touch the disk
+    """
+
+    def __init__(self, folders: List[str], path: str = None, workers: int = None,
+                 rescan_interval: float = 3600, pool_threshold: int = 50,
+                 watch: bool = True):
+        """
+        @param folders: directories to index, recursively
+        @param path: index file, defaults to the XDG cache dir
+        @param workers: processes reading tags, defaults to the cpu count
+        @param rescan_interval: seconds between incremental rescans, 0 to only scan on start/changes
+        @param pool_threshold: changed files needed to start the process pool
+        @param watch: rescan when files change, requires watchdog
+        """
+        self.folders = [os.path.expanduser(f) for f in folders]
+        self.path = path or os.path.join(xdg_cache_home(), get_xdg_base(), "OCP_library.json.gz")
+        self.workers = workers
+        self.rescan_interval = rescan_interval
+        self.pool_threshold = pool_threshold
+        self._lock = Lock()
+        self._tracks: Dict[str, list] = {}
+        self._words: Dict[str, set] = {}
+        self._scan_lock = Lock()
+        self._rescan = Event()
+        self._stop = Event()
+        self._timer: Optional[Timer] = None
+        self._observer = None
+        self._stats = {"files": 0, "scans": 0, "last_scan": 0.0,
+                       "tags_read": 0, "load_time": 0.0}
+        self._load()
+        self._thread = Thread(target=self._run, daemon=True, name="OCPLibraryScanner")
+        self._thread.start()
+        if watch:
+            self._watch()
+
+    # persistence
+    def _load(self):
+        start = time.monotonic()
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("folders") == self.folders:
+                self._set_tracks(data.get("tracks", {}))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            LOG.error(f"failed to load media library index {self.path}: {e}")
+        self._stats["load_time"] = round(time.monotonic() - start, 3)
+        LOG.debug(f"media library loaded: {len(self._tracks)} files")
+
+    def _save(self, tracks: Dict[str, list]):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump({"folders": self.folders, "tracks": tracks}, f,
+                      separators=(",", ":"), ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def _set_tracks(self, tracks: Dict[str, list]):
+        words = {}
+        for path, row in tracks.items():
+            for w in set(_tokenize(f"{row[TITLE]} {row[ARTIST]} {row[ALBUM]}")):
+                words.setdefault(w, set()).add(path)
+        with self._lock:
+            self._tracks, self._words = tracks, words
+        self._stats["files"] = len(tracks)
+
+    # scanning
+    def _walk(self) -> Iterator[os.DirEntry]:
+        stack = [f for f in self.folders if os.path.isdir(f)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.lower().endswith(AUDIO_EXTENSIONS + VIDEO_EXTENSIONS):
+                            yield entry
+            except OSError as e:
+                LOG.debug(f"failed to scan {e.filename}: {e}")
+
+    def scan(self) -> dict:
+        """
+        Incremental scan, only files that are new or changed since the last
+        scan have their tags read
+        @return: number of "added", "updated" and "removed" files
+        """
+        with self._scan_lock:
+            start = time.monotonic()
+            old = self._tracks
+            tracks, changed = {}, []
+            for entry in self._walk():
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                row = old.get(entry.path)
+                if row and row[MTIME] == int(st.st_mtime) and row[SIZE] == st.st_size:
+                    tracks[entry.path] = row
+                else:
+                    changed.append((entry.path, int(st.st_mtime), st.st_size))
+
+            for (path, mtime, size), tags in zip(changed, self._read_all([c[0] for c in changed])):
+                tracks[path] = [mtime, size, *tags]
+
+            result = {"added": sum(1 for c in changed if c[0] not in old),
+                      "updated": sum(1 for c in changed if c[0] in old),
+                      "removed": sum(1 for p in old if p not in tracks)}
+            if changed or result["removed"] or not os.path.isfile(self.path):
+                self._set_tracks(tracks)
+                try:
+                    self._save(tracks)
+                except Exception as e:
+                    LOG.error(f"failed to save media library index: {e}")
+            self._stats["scans"] += 1
+            self._stats["tags_read"] += len(changed)
+            self._stats["last_scan"] = round(time.monotonic() - start, 3)
+            LOG.info(f"media library scanned in {self._stats['last_scan']}s: "
+                     f"{len(tracks)} files, {result}")
+            return result
+
+    def _read_all(self, paths: List[str]) -> List[tuple]:
+        if len(paths) < self.pool_threshold:
+            return [read_tags(p) for p in paths]
+        # spawn, the media service has bus and player threads that fork would copy
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            return list(pool.map(read_tags, paths, chunksize=64))
+
+    def rescan(self, delay: float = 0):
+        """
+        Request a background rescan
+        @param delay: seconds to wait, requests in between are coalesced
+        """
+        if not delay:
+            self._rescan.set()
+            return
+        with self._lock:
+            if self._timer is None:
+                self._timer = Timer(delay, self._rescan_now)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _rescan_now(self):
+        with self._lock:
+            self._timer = None
+        self._rescan.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.scan()
+            except Exception as e:
+                LOG.exception(f"media library scan failed: {e}")
+            self._rescan.wait(self.rescan_interval or None)
+            self._rescan.clear()
+
+    def _watch(self):
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            LOG.debug("watchdog not installed, media library only rescans periodically")
+            return
+
+        library = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.event_type not in ("opened", "closed_no_write"):
+                    library.rescan(delay=5)  # copying an album triggers many events
+
+        self._observer = Observer()
+        for folder in self.folders:
+            if os.path.isdir(folder):
+                self._observer.schedule(_Handler(), folder, recursive=True)
+        self._observer.daemon = True
+        self._observer.start()
+
+    # search
+    def search(self, phrase: str, limit: int = 25) -> List[dict]:
+        """
+        Find indexed files matching the words in `phrase`
+        @param phrase: search query, eg. "metallica nothing else matters"
+        @param limit: max results
+        @return: track dicts with "match_confidence", best first
+        """
+        words = set(_tokenize(phrase))
+        with self._lock:
+            hits = Counter(p for w in words for p in self._words.get(w, ()))
+            rows = {p: self._tracks[p] for p, _ in hits.most_common(limit * 4)}
+
+        results = []
+        for path, row in rows.items():
+            # fraction of each field said in the query, the title counts most
+            score = 0.0
+            for field, weight in ((TITLE, 60), (ARTIST, 30), (ALBUM, 20)):
+                field_words = set(_tokenize(row[field]))
+                if field_words:
+                    score += weight * len(field_words & words) / len(field_words)
+            if score:
+                results.append(self._track(path, row, min(int(score), 100)))
+        return sorted(results, key=lambda r: r["match_confidence"], reverse=True)[:limit]
+
+    @staticmethod
+    def _track(path: str, row: list, confidence: int) -> dict:
+        video = path.lower().endswith(VIDEO_EXTENSIONS)
+        return {"uri": f"file://{path}",
+                "title": row[TITLE],
+                "artist": row[ARTIST],
+                "album": row[ALBUM],
+                "length": row[LENGTH],
+                "media_type": MediaType.VIDEO if video else MediaType.MUSIC,
+                "playback": PlaybackType.VIDEO if video else PlaybackType.AUDIO,
+                "match_confidence": confidence}
+
+    def __len__(self):
+        return len(self._tracks)
+
+    @property
+    def metrics(self) -> dict:
+        return dict(self._stats, watching=self._observer is not None)
+
+    def shutdown(self):
+        self._stop.set()
+        self._rescan.set()
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+        if self._observer:
+            self._observer.stop()
@@ -1,7 +1,11 @@
+import time
+from threading import Event, Lock, Thread, local
+
 from ovos_plugin_manager.ocp import find_ocp_audio_plugins
 
 from ovos_bus_client.message import Message
-from ovos_media.media_backends.base import BaseMediaService
+from ovos_media.media_backends.base import BaseMediaService, UnloadedBackend
+from ovos_utils.log import LOG
 from ovos_utils.ocp import MediaState, TrackState
 
 
@@ -9,6 +13,10 @@ class AudioService(BaseMediaService):
     """ Audio Service class.
         Handles playback of audio and selecting proper backend for the uri
         to be played.
+
+        With "audio_standby" enabled the preferred backend is kept loaded
+        and warmed while idle, when a search starts and after playback
+        stops, so the next play does not pay for the backend start up.
     """
 
     def __init__(self, bus, config=None, *args, **kwargs):
@@ -16,8 +24,147 @@ class AudioService(BaseMediaService):
             Args:
                 bus: OVOS messagebus
         """
+        self._standby_lock = Lock()  # only guards the flags below, never held while loading
+        self._warm = None  # (backend name, seconds spent warming it) until it plays
+        self._warming = False
+        self._reloads = {}  # backend name -> [Event, service] while reloading
+        self._local = local()  # marks reloads done by the warm up thread
+        self._standby_stats = {"warm_ups": 0, "warm_hits": 0, "cold_starts": 0,
+                               "avg_warm_up": 0.0, "avg_cold_start": 0.0,
+                               "saved_latency": 0.0}
         super().__init__(bus, "audio", find_ocp_audio_plugins, config, *args, **kwargs)
+        self.bus.on("ovos.common_play.search.start", self.handle_search_start)
+        self.warm_up_async()
 
     def get_preferred_players(self):
         return self.config.get("preferred_audio_services")
 
+    # warm standby
+    @property
+    def standby_enabled(self) -> bool:
+        return bool(self.config.get("audio_standby", False))
+
+    def _standby_service(self):
+        """
+        Returns:
+            the backend kept warm, the first preferred player that is
+            configured, else the first backend handling local files
+        """
+        services = {s.name: s for s in self.services}
+        for name in self.get_preferred_players() or []:
+            if name in services:
+                return services[name]
+        return self._routes.get("file") or self._routes.get("http") or \
+               (self.services[0] if self.services else None)
+
+    def _in_use(self, player_name: str) -> bool:
+        if super()._in_use(player_name):
+            return True
+        # the standby backend is not released while idle
+        standby = self._standby_service() if self.standby_enabled else None
+        return standby is not None and standby.name == player_name
+
+    def warm_up(self):
+        """
+        Load the standby backend if it was released and let it prepare for
+        playback (optional plugin method `warm_up`), skipped while playing
+        """
+        if not self.standby_enabled:
+            return
+        with self._standby_lock:
+            service = self._standby_service()
+            if self.current or service is None or self._warming or \
+                    (self._warm and not isinstance(service, UnloadedBackend)):
+                return  # playing, nothing to warm, already warm or warming
+            self._warming = True
+        # a play request arriving now does not wait for the warm up
+        start = time.monotonic()
+        self._local.warming = True
+        try:
+            if isinstance(service, UnloadedBackend):
+                service = self._reload_service(service)
+                if not service:
+                    return
+            warm_up = getattr(service, "warm_up", None)
+            if callable(warm_up) and not self.current:
+                try:
+                    warm_up()
+                except Exception as e:
+                    LOG.error(f"{service.name} warm up failed: {e}")
+        finally:
+            self._local.warming = False
+            with self._standby_lock:
+                self._warming = False
+        elapsed = time.monotonic() - start
+        if self.reclaimer:
+            self.reclaimer.touch(self._reclaim_key(service.name))
+        with self._standby_lock:
+            stats = self._standby_stats
+            stats["warm_ups"] += 1
+            stats["avg_warm_up"] += (elapsed - stats["avg_warm_up"]) / stats["warm_ups"]
+            if not self.current:  # else it started playing while warming up
+                self._warm = (service.name, elapsed)
+        LOG.debug(f"{service.name} ready for playback in {elapsed:.3f}s")
+
+    def warm_up_async(self):
+        if self.standby_enabled:
+            Thread(target=self.warm_up, daemon=True, name="OCPAudioStandby").start()
+
+    def handle_search_start(self, message: Message):
+        # a play request is likely to follow
+        self.warm_up_async()
+
+    def _release_service(self, player_name: str):
+        super()._release_service(player_name)
+        if self._warm and self._warm[0] == player_name:
+            self._warm = None
+
+    def _reload_service(self, placeholder: UnloadedBackend):
+        with self._standby_lock:
+            pending = self._reloads.get(placeholder.name)
+            loading = pending is None
+            if loading:
+                pending = self._reloads[placeholder.name] = [Event(), None]
+        if not loading:
+            # a warm up is loading it already, do not load the plugin twice
+            pending[0].wait()
+            return pending[1]
+        start = time.monotonic()
+        try:
+            service = pending[1] = super()._reload_service(placeholder)
+        finally:
+            with self._standby_lock:
+                self._reloads.pop(placeholder.name, None)
+            pending[0].set()
+        if service and not getattr(self._local, "warming", False):
+            # loaded inside play, the latency warm standby avoids
+            stats = self._standby_stats
+            stats["cold_starts"] += 1
+            stats["avg_cold_start"] += (time.monotonic() - start - stats["avg_cold_start"]) / \
+                                       stats["cold_starts"]
+        return service
+
+    def play(self, uri, preferred_service=None):
+        with self._standby_lock:
+            warm, self._warm = self._warm, None
+        super().play(uri, preferred_service)
+        if warm and self.current and self.current.name == warm[0]:
+            self._standby_stats["warm_hits"] += 1
+            self._standby_stats["saved_latency"] += warm[1]
+
+    def _perform_stop(self, message: Message = None):
+        super()._perform_stop(message)
+        self.warm_up_async()  # get ready for the next request
+
+    def backend_metrics(self) -> dict:
+        metrics = super().backend_metrics()
+        if self.standby_enabled:
+            standby = self._standby_service()
+            metrics["standby"] = dict(self._standby_stats,
+                                      backend=standby.name if standby else None,
+                                      warm=bool(self._warm))
+        return metrics
+
+    def shutdown(self):
+        self.bus.remove("ovos.common_play.search.start", self.handle_search_start)
+        super().shutdown()
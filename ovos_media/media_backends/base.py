@@ -9,18 +9,54 @@ from ovos_utils.ocp import MediaState, TrackState
 
 from ovos_bus_client.message import Message
 from ovos_config.config import Configuration
-from ovos_media.utils import validate_message_context
+from ovos_media.idle import IdleReclaimer
+from ovos_media.media_backends.isolated import IsolatedMediaBackend
+from ovos_media.utils import MessageSourceFilter, MediaStateDispatcher
 from ovos_utils.log import LOG
 from ovos_utils.process_utils import MonotonicEvent
 
 
+class UnloadedBackend:
+    """ Stands in for a backend released while idle, keeps what routing
+    needs so the plugin is only loaded again when selected for playback """
+
+    def __init__(self, service: MediaBackend):
+        self.name = service.name
+        self.aliases = service.aliases
+        self.config = service.config
+        self.remote = isinstance(service, RemoteAudioPlayerBackend) or \
+                      isinstance(service, RemoteWebPlayerBackend) or \
+                      isinstance(service, RemoteVideoPlayerBackend) or \
+                      getattr(service, "remote", False)
+        self._uris = list(service.supported_uris())
+
+    def supported_uris(self):
+        return self._uris
+
+    def shutdown(self):
+        pass
+
+    def __repr__(self):
+        return f"UnloadedBackend({self.name})"
+
+
 class BaseMediaService:
 
     def __init__(self, bus, namespace: str, plugin_loader: Callable,
-                 config=None, autoload=True, validate_source=True):
+                 config=None, autoload=True, validate_source=True,
+                 source_filter: MessageSourceFilter = None,
+                 state_dispatcher: MediaStateDispatcher = None,
+                 reclaimer: IdleReclaimer = None):
         """
             Args:
                 bus: OVOS messagebus
+                source_filter: shared MessageSourceFilter, one is created
+                               if not provided
+                state_dispatcher: shared MediaStateDispatcher, media state
+                                  updates are read from the bus directly
+                                  if not provided
+                reclaimer: IdleReclaimer, backends not used for a while are
+                           shut down and loaded again when needed
         """
         self.bus = bus
         self.namespace = namespace
@@ -31,14 +67,26 @@ class BaseMediaService:
         self.default = None
         self.services = []
         self.current = None
+        # derived from self.services, rebuilt whenever they change
+        self._routes = {}  # uri type -> first service supporting it
+        self._aliases = []  # (lowercase alias, service)
+        # config changes of the playing backend, applied once it stops
+        self._deferred = {}  # player name -> new config, None to unload
         self.play_start_time = 0
         self.volume_is_low = False
         self.validate_source = validate_source
+        self.source_filter = source_filter or MessageSourceFilter()
+        self.reclaimer = reclaimer
 
         self._loaded = MonotonicEvent()
         if autoload:
             self.load_services()
-        self.bus.on("ovos.common_play.media.state", self.handle_media_state_change)
+        self.state_dispatcher = state_dispatcher
+        if self.state_dispatcher:
+            self.state_dispatcher.subscribe(self.handle_media_state_change,
+                                            MediaStateDispatcher.BACKEND)
+        else:
+            self.bus.on("ovos.common_play.media.state", self.handle_media_state_change)
 
     def available_backends(self):
         """Return available media backends.
@@ -52,7 +100,10 @@ class BaseMediaService:
                 'supported_uris': s.supported_uris(),
                 'remote': isinstance(s, RemoteAudioPlayerBackend) or
                           isinstance(s, RemoteWebPlayerBackend) or
-                          isinstance(s, RemoteVideoPlayerBackend)
+                          isinstance(s, RemoteVideoPlayerBackend) or
+                          getattr(s, "remote", False),
+                'isolated': isinstance(s, IsolatedMediaBackend),
+                'loaded': not isinstance(s, UnloadedBackend)
             }
             data[s.name] = info
         return data
@@ -78,36 +129,13 @@ class BaseMediaService:
         Sets up the global service, default and registers the event handlers
         for the subsystem.
         """
-        local = []
-        remote = []
-
         plugs = self.plugin_loader()
+        services = []
         for player_name, plug_cfg in self.config.get(f"{self.namespace}_players", {}).items():
-            plug_name = plug_cfg["module"]
-            if plug_name not in plugs:
-                LOG.error(f"{plug_name} configured but not installed")
-                continue
-            if not plug_cfg.get("active", True):
-                LOG.info(f"{plug_name} is disabled in configuration")
-                continue
-            try:
-                service = plugs[plug_name](plug_cfg, self.bus)
-                service.aliases = plug_cfg.get("aliases", []) or [plug_name]
-                service.name = player_name
-                if isinstance(service, RemoteAudioPlayerBackend):
-                    remote.append(service)
-                else:
-                    local.append(service)
-                LOG.info(f"Loaded {self.__class__.__name__} plugin: {plug_name}")
-            except:
-                LOG.exception(f"Failed to load {plug_name}")
-
-        # Sort services so local services are checked first
-        self.services = local + remote
-
-        # Register end of track callback
-        for s in self.services:
-            s.set_track_start_callback(self.track_start)
+            service = self._load_service(player_name, plug_cfg, plugs)
+            if service:
+                services.append(service)
+        self._set_services(services)
 
         # Setup event handlers
         self.bus.on(f'ovos.{self.namespace}.service.play', self.handle_play)
@@ -127,9 +155,204 @@ class BaseMediaService:
         self._loaded.set()  # Report services loaded
         return self.services
 
+    def _load_service(self, player_name: str, plug_cfg: dict, plugs: dict):
+        """
+        Instantiate the backend of a "{namespace}_players" entry
+
+        Returns:
+            MediaBackend or None if disabled or failed to load
+        """
+        plug_name = plug_cfg["module"]
+        if plug_name not in plugs:
+            LOG.error(f"{plug_name} configured but not installed")
+            return None
+        if not plug_cfg.get("active", True):
+            LOG.info(f"{plug_name} is disabled in configuration")
+            return None
+        try:
+            if plug_cfg.get("isolated", self.config.get("isolate_backends", False)):
+                # run in a subprocess, a hanging or crashing plugin can't take the service down
+                service = IsolatedMediaBackend(
+                    plug_cfg, self.bus, self.plugin_loader, plug_name,
+                    timeout=plug_cfg.get("rpc_timeout", self.config.get("backend_rpc_timeout", 3)),
+                    load_timeout=self.config.get("backend_load_timeout", 30))
+            else:
+                service = plugs[plug_name](plug_cfg, self.bus)
+            service.aliases = plug_cfg.get("aliases", []) or [plug_name]
+            service.name = player_name
+            # Register end of track callback
+            service.set_track_start_callback(self.track_start)
+            LOG.info(f"Loaded {self.__class__.__name__} plugin: {plug_name}")
+            if self.reclaimer:
+                self.reclaimer.register(self._reclaim_key(player_name),
+                                        lambda: self._release_service(player_name),
+                                        in_use=lambda: self._in_use(player_name))
+            return service
+        except:
+            LOG.exception(f"Failed to load {plug_name}")
+            return None
+
+    @staticmethod
+    def _unload_service(service: MediaBackend):
+        try:
+            LOG.info('shutting down ' + service.name)
+            service.shutdown()
+        except Exception as e:
+            LOG.error('shutdown of ' + service.name + ' failed: ' + repr(e))
+
+    def _in_use(self, player_name: str) -> bool:
+        """
+        Returns:
+            True if the backend must not be released while idle
+        """
+        current = self.current
+        return bool(current) and current.name == player_name
+
+    def _reclaim_key(self, player_name: str) -> str:
+        # services of every zone share the IdleReclaimer
+        zone = getattr(self.bus, "zone", None)
+        key = f"{self.namespace}.{player_name}"
+        return f"{zone}.{key}" if isinstance(zone, str) else key
+
+    def _release_service(self, player_name: str):
+        """
+        Shut down an idle backend, it is loaded again once selected for playback
+        """
+        with self.service_lock:
+            service = next((s for s in self.services if s.name == player_name), None)
+            if service is None or service is self.current or \
+                    isinstance(service, UnloadedBackend):
+                return
+            # swapped while holding the lock, play can not select it anymore
+            placeholder = UnloadedBackend(service)
+            self.services, self._routes, self._aliases = self._service_tables(
+                [placeholder if s is service else s for s in self.services])
+        self._unload_service(service)
+
+    def _reload_service(self, placeholder: UnloadedBackend):
+        """
+        Load a backend released while idle
+
+        Returns:
+            MediaBackend or None if it failed to load
+        """
+        LOG.info(f"reloading idle {self.namespace} backend: {placeholder.name}")
+        service = self._load_service(placeholder.name, placeholder.config, self.plugin_loader())
+        if service:
+            self._set_services([service if s is placeholder else s for s in self.services])
+        return service
+
+    def _set_services(self, services: list):
+        """
+        Replace the loaded services and rebuild the uri and alias tables
+        """
+        tables = self._service_tables(services)
+        with self.service_lock:
+            self.services, self._routes, self._aliases = tables
+
+    @staticmethod
+    def _service_tables(services: list) -> tuple:
+        """
+        Returns:
+            services sorted local first, uri type -> service and
+            (alias, service) tables
+        """
+        local = []
+        remote = []
+        for service in services:
+            if isinstance(service, RemoteAudioPlayerBackend) or getattr(service, "remote", False):
+                remote.append(service)
+            else:
+                local.append(service)
+        # Sort services so local services are checked first
+        services = local + remote
+        routes = {}
+        for service in services:
+            for uri_type in service.supported_uris():
+                routes.setdefault(uri_type, service)
+        aliases = [(a.lower(), service) for service in services
+                   for a in service.aliases if isinstance(a, str)]
+        return services, routes, aliases
+
+    def reload_config(self, config: dict = None):
+        """
+        Apply changes to the "{namespace}_players" configuration without
+        restarting, new or re-activated players are loaded, removed or
+        deactivated players are shut down and changed players are reloaded,
+        a change to the playing backend waits until it stops playing
+
+        Args:
+            config: new "media" configuration, read if not provided
+        """
+        config = config if config is not None else Configuration().get("media") or {}
+        key = f"{self.namespace}_players"
+        old_players = self.config.get(key, {})
+        new_players = config.get(key, {})
+        self.config = config
+        changed = {name: new_players.get(name)
+                   for name in set(old_players) | set(new_players)
+                   if old_players.get(name) != new_players.get(name)}
+        changed.update({name: new_players.get(name) for name in self._deferred})
+        if changed:
+            self._apply_player_changes(changed)
+
+    def _apply_player_changes(self, changes: dict):
+        """
+        Args:
+            changes: player name -> new config, None if removed
+        """
+        loaded = {s.name: s for s in self.services}
+        current = self.current
+        plugs = None
+        for name, plug_cfg in changes.items():
+            service = loaded.get(name)
+            if service is not None and service is current:
+                LOG.info(f"{name} is playing, config change deferred")
+                self._deferred[name] = plug_cfg
+                continue
+            self._deferred.pop(name, None)
+            active = bool(plug_cfg) and plug_cfg.get("active", True)
+            if service is not None and active and \
+                    getattr(service, "config", None) is not None and \
+                    {k: v for k, v in service.config.items() if k != "aliases"} == \
+                    {k: v for k, v in plug_cfg.items() if k != "aliases"}:
+                # only the aliases changed, no need to reload the plugin
+                service.config = plug_cfg
+                service.aliases = plug_cfg.get("aliases", []) or [plug_cfg["module"]]
+                LOG.info(f"updated {name} aliases: {service.aliases}")
+                continue
+            if service is not None:
+                loaded.pop(name)
+                self._unload_service(service)
+                if self.reclaimer:
+                    self.reclaimer.unregister(self._reclaim_key(name))
+            if active:
+                plugs = plugs if plugs is not None else self.plugin_loader()
+                service = self._load_service(name, plug_cfg, plugs)
+                if service:
+                    loaded[name] = service
+        # keep the configured order
+        order = list(self.config.get(f"{self.namespace}_players", {}))
+        self._set_services(sorted(loaded.values(),
+                                  key=lambda s: order.index(s.name) if s.name in order else len(order)))
+
+    def _apply_deferred(self):
+        """
+        Apply config changes that waited for the backend to stop playing
+        """
+        if self._deferred:
+            self._apply_player_changes(dict(self._deferred))
+
     def get_preferred_players(self):
         return []
 
+    def backend_metrics(self) -> dict:
+        """
+        RPC stats of the backends running in a subprocess
+        """
+        return {s.name: s.metrics for s in self.services
+                if isinstance(s, IsolatedMediaBackend)}
+
     def handle_media_state_change(self, message: Message):
         """
         if self.current and state == MediaState.LOADED_MEDIA:
@@ -193,10 +416,13 @@ class BaseMediaService:
         """Stop mediaservice if active."""
         if not self._is_message_for_service(message):
             return
-        if self.current:
-            LOG.debug(f'stopping playing service: {self.current}')
-            if self.current.stop():
-                self.current.ocp_stop()  # emit ocp state events
+        with self.service_lock:
+            # detach first, a load finishing meanwhile won't start playback
+            service, self.current = self.current, None
+        if service:
+            LOG.debug(f'stopping playing service: {service}')
+            if service.stop():
+                service.ocp_stop()  # emit ocp state events
                 if message:
                     msg = message.reply("mycroft.stop.handled",
                                         {"by": "OCP"})
@@ -204,25 +430,23 @@ class BaseMediaService:
                     msg = Message("mycroft.stop.handled",
                                   {"by": "OCP"})
                 self.bus.emit(msg)
-
-        self.current = None
+        self._apply_deferred()
 
     def stop(self, message: Message = None):
         """
-            Handler for mycroft.stop. Stops any playing service.
+            Handler for mycroft.stop. Stops any playing service, also while
+            a track is still loading.
 
             Args:
                 message: message bus message, not used but required
         """
         if not self._is_message_for_service(message):
             return
-        if time.monotonic() - self.play_start_time > 1:
-            with self.service_lock:
-                try:
-                    self._perform_stop(message)
-                except Exception as e:
-                    LOG.exception(e)
-                    LOG.error("failed to stop!")
+        try:
+            self._perform_stop(message)
+        except Exception as e:
+            LOG.exception(e)
+            LOG.error("failed to stop!")
 
     def lower_volume(self, message: Message = None):
         """
@@ -259,6 +483,13 @@ class BaseMediaService:
         """
         uri_type = uri.split(':')[0]
 
+        if self.current and self.current.name in self._deferred:
+            # the track is being replaced, good time to reload the backend
+            with self.service_lock:
+                service, self.current = self.current, None
+            service.stop()
+            self._apply_deferred()
+
         # check if user requested a particular service
         if preferred_service and uri_type in preferred_service.supported_uris():
             selected_service = preferred_service
@@ -268,25 +499,41 @@ class BaseMediaService:
             selected_service = self.current
 
         else:  # Check if any media service can play the media
-            for s in self.services:
-                if uri_type in s.supported_uris():
-                    LOG.debug(f"Service {s.__class__.__name__} supports URI {uri_type}")
-                    selected_service = s
-                    break
-            else:
+            selected_service = self._routes.get(uri_type)
+            if not selected_service:
                 LOG.info('No service found for uri_type: ' + uri_type)
                 return
+            LOG.debug(f"Service {selected_service.__class__.__name__} supports URI {uri_type}")
+
+        while True:
+            if isinstance(selected_service, UnloadedBackend):
+                selected_service = self._reload_service(selected_service)
+                if not selected_service:
+                    LOG.error(f"Failed to reload backend for uri_type: {uri_type}")
+                    return
+            with self.service_lock:
+                # the idle reclaimer may have released it since it was selected
+                if any(s is selected_service for s in self.services):
+                    self.current = selected_service
+                    self.play_start_time = time.monotonic()
+                    break
+                selected_service = next((s for s in self.services
+                                         if s.name == selected_service.name), None)
+            if not selected_service:
+                LOG.error(f"Backend for uri_type {uri_type} was removed")
+                return
+        if self.reclaimer:
+            self.reclaimer.touch(self._reclaim_key(selected_service.name))
 
         LOG.debug(f"Using {selected_service.__class__.__name__}")
-        self.current = selected_service
-        self.play_start_time = time.monotonic()
         # once loaded self.handle_media_state_change is called
+        # NOTE: not holding service_lock, stop must not wait for a slow load
         selected_service.load_track(uri)
 
     def _is_message_for_service(self, message: Message):
         if not message or not self.validate_source:
             return True
-        return validate_message_context(message)
+        return self.source_filter.validate(message)
 
     def handle_play(self, message: Message):
         """
@@ -299,28 +546,19 @@ class BaseMediaService:
         """
         if not self._is_message_for_service(message):
             return
-        with self.service_lock:
-            tracks = message.data['tracks']
-
-            # Find if the user wants to use a specific backend
-            query = message.data.get("utterance", "").lower()
-            for s in self.services:
-                try:
-                    # match query against "aliases" (assigned from config on load)
-                    if any(a.lower() in query.lower() for a in s.aliases):
-                        preferred_service = s
-                        LOG.debug(s.name + ' would be preferred')
-                        break
-                except Exception as e:
-                    LOG.error(f"failed to parse media service name: {s}")
-            else:
-                preferred_service = None
+        tracks = message.data['tracks']
+
+        # Find if the user wants to use a specific backend
+        query = message.data.get("utterance", "").lower()
+        # match query against "aliases" (assigned from config on load)
+        preferred_service = next((s for a, s in self._aliases if a in query), None)
+        if preferred_service:
+            LOG.debug(preferred_service.name + ' would be preferred')
 
-            try:
-                self.play(tracks, preferred_service)
-                time.sleep(0.5)
-            except Exception as e:
-                LOG.exception(e)
+        try:
+            self.play(tracks, preferred_service)
+        except Exception as e:
+            LOG.exception(e)
 
     def handle_track_info(self, message: Message):
         """
@@ -344,16 +582,37 @@ class BaseMediaService:
         data = self.available_backends()
         self.bus.emit(message.response(data))
 
+    def get_track_length(self):
+        """
+        getting the duration of the media in milliseconds
+        """
+        if self.current:
+            return self.current.get_track_length()
+
+    def get_track_position(self):
+        """
+        get current position in milliseconds
+        """
+        if self.current:
+            return self.current.get_track_position()
+
+    def set_track_position(self, milliseconds):
+        """
+            go to position in milliseconds
+
+            Args:
+                milliseconds (int): number of milliseconds of final position
+        """
+        if milliseconds and self.current:
+            self.current.set_track_position(milliseconds)
+
     def handle_get_track_length(self, message: Message):
         """
         getting the duration of the media in milliseconds
         """
         if not self._is_message_for_service(message):
             return
-        dur = None
-        if self.current:
-            dur = self.current.get_track_length()
-        self.bus.emit(message.response({"length": dur}))
+        self.bus.emit(message.response({"length": self.get_track_length()}))
 
     def handle_get_track_position(self, message: Message):
         """
@@ -361,10 +620,7 @@ class BaseMediaService:
         """
         if not self._is_message_for_service(message):
             return
-        pos = None
-        if self.current:
-            pos = self.current.get_track_position()
-        self.bus.emit(message.response({"position": pos}))
+        self.bus.emit(message.response({"position": self.get_track_position()}))
 
     def handle_set_track_position(self, message: Message):
         """
@@ -375,9 +631,7 @@ class BaseMediaService:
         """
         if not self._is_message_for_service(message):
             return
-        milliseconds = message.data.get("position")
-        if milliseconds and self.current:
-            self.current.set_track_position(milliseconds)
+        self.set_track_position(message.data.get("position"))
 
     def handle_seek_forward(self, message: Message):
         """
@@ -407,11 +661,9 @@ class BaseMediaService:
 
     def shutdown(self):
         for s in self.services:
-            try:
-                LOG.info('shutting down ' + s.name)
-                s.shutdown()
-            except Exception as e:
-                LOG.error('shutdown of ' + s.name + ' failed: ' + repr(e))
+            self._unload_service(s)
+            if self.reclaimer:
+                self.reclaimer.unregister(self._reclaim_key(s.name))
         self.remove_listeners()
 
     def remove_listeners(self):
@@ -425,3 +677,7 @@ class BaseMediaService:
         self.bus.remove(f'ovos.{self.namespace}.service.get_track_length', self.handle_get_track_length)
         self.bus.remove(f'ovos.{self.namespace}.service.seek_forward', self.handle_seek_forward)
         self.bus.remove(f'ovos.{self.namespace}.service.seek_backward', self.handle_seek_backward)
+        if self.state_dispatcher:
+            self.state_dispatcher.unsubscribe(self.handle_media_state_change)
+        else:
+            self.bus.remove("ovos.common_play.media.state", self.handle_media_state_change)
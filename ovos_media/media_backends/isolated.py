@@ -0,0 +1,444 @@
+import itertools
+import multiprocessing
+import queue
+import time
+from threading import Event, Lock, Thread
+from typing import Callable, Optional
+
+from ovos_plugin_manager.templates.media import MediaBackend, RemoteAudioPlayerBackend, \
+    RemoteVideoPlayerBackend, RemoteWebPlayerBackend
+
+from ovos_bus_client.message import Message
+from ovos_utils.log import LOG
+
+
+class _HostBus:
+    """ messagebus seen by a plugin inside the backend host process
+
+    emitted messages are forwarded to the media service, which emits them
+    on the real bus, events the plugin listens to are forwarded back
+    """
+
+    def __init__(self, send: Callable[[tuple], None]):
+        self._send = send
+        self._handlers = {}
+        self._lock = Lock()
+
+    def emit(self, message: Message):
+        self._send(("emit", message.serialize()))
+
+    def on(self, event: str, func: Callable):
+        with self._lock:
+            if event not in self._handlers:
+                self._send(("on", event))
+            self._handlers.setdefault(event, []).append(func)
+
+    def once(self, event: str, func: Callable):
+        def handler(message):
+            self.remove(event, handler)
+            func(message)
+
+        self.on(event, handler)
+
+    def remove(self, event: str, func: Callable):
+        with self._lock:
+            handlers = self._handlers.get(event, [])
+            if func in handlers:
+                handlers.remove(func)
+            if not handlers and event in self._handlers:
+                self._handlers.pop(event)
+                self._send(("remove", event))
+
+    def remove_all_listeners(self, event: str):
+        with self._lock:
+            if self._handlers.pop(event, None):
+                self._send(("remove", event))
+
+    def wait_for_message(self, message_type: str, timeout: float = 3.0) -> Optional[Message]:
+        """
+        Wait for a message of a specific type
+        @param message_type: message type to wait for
+        @param timeout: seconds to wait
+        @return: the received Message, None on timeout
+        """
+        return self.wait_for_response(None, message_type, timeout)
+
+    def wait_for_response(self, message: Optional[Message], reply_type: str = None,
+                          timeout: float = 3.0) -> Optional[Message]:
+        """
+        Emit a message and wait for its reply
+        @param message: Message to emit, None to only wait
+        @param reply_type: reply message type, defaults to "{msg_type}.response"
+        @param timeout: seconds to wait
+        @return: the reply Message, None on timeout
+        """
+        reply_type = reply_type or f"{message.msg_type}.response"
+        received = []
+        event = Event()
+
+        def handler(reply):
+            received.append(reply)
+            event.set()
+
+        # subscribed before emitting, the host forwards both in order
+        self.on(reply_type, handler)
+        try:
+            if message is not None:
+                self.emit(message)
+            event.wait(timeout)
+        finally:
+            self.remove(reply_type, handler)
+        return received[0] if received else None
+
+    def dispatch(self, serialized: str):
+        message = Message.deserialize(serialized)
+        for func in list(self._handlers.get(message.msg_type, [])):
+            try:
+                func(message)
+            except Exception as e:
+                LOG.exception(f"plugin bus handler failed: {e}")
+
+
+def _backend_host(conn, plugin_loader: Callable, plug_name: str, config: dict):
+    """
+    Entry point of the backend host process, loads the plugin and serves
+    calls from IsolatedMediaBackend until the connection is closed
+    """
+    send_lock = Lock()
+
+    def send(data: tuple):
+        with send_lock:
+            conn.send(data)
+
+    bus = _HostBus(send)
+    try:
+        service = plugin_loader()[plug_name](config, bus)
+        service.set_track_start_callback(lambda track: send(("track_start", track)))
+        send(("ready", {"supported_uris": list(service.supported_uris()),
+                        "remote": isinstance(service, (RemoteAudioPlayerBackend,
+                                                       RemoteVideoPlayerBackend,
+                                                       RemoteWebPlayerBackend)),
+                        "warm_up": callable(getattr(service, "warm_up", None))}))
+    except Exception as e:
+        send(("failed", repr(e)))
+        return
+
+    calls = queue.Queue()
+
+    def read():
+        # bus messages are dispatched while a call runs, so plugins can
+        # wait for replies inside their methods
+        while True:
+            try:
+                data = conn.recv()
+            except (EOFError, OSError):
+                break
+            if data[0] == "bus":
+                bus.dispatch(data[1])
+            else:
+                calls.put(data)
+        calls.put(None)
+
+    Thread(target=read, daemon=True, name=f"OCPBackendHost.{plug_name}.reader").start()
+    while True:
+        data = calls.get()
+        if data is None:
+            break
+        _, call_id, method, args = data
+        start = time.monotonic()
+        try:
+            result, ok = getattr(service, method)(*args), True
+        except Exception as e:
+            result, ok = repr(e), False
+        send(("result", call_id, ok, result, time.monotonic() - start))
+        if method == "shutdown":
+            break
+
+
+class IsolatedMediaBackend(MediaBackend):
+    """ Runs a media backend plugin in a supervised subprocess
+
+    calls are forwarded over a pipe and time out instead of blocking the
+    media service, a host that hangs is killed and restarted, a host that
+    crashes is restarted and the current track reported as invalid
+
+    RPC round trip and overhead (round trip minus time spent in the plugin)
+    are tracked in `metrics`
+    """
+
+    def __init__(self, config: dict, bus, plugin_loader: Callable, plug_name: str,
+                 timeout: float = 3, load_timeout: float = 30, max_restart_delay: float = 30):
+        """
+        @param config: plugin config, passed to the plugin
+        @param bus: messagebus the plugin messages are emitted on
+        @param plugin_loader: callable returning {name: plugin class}, runs in the host
+        @param plug_name: plugin to load
+        @param timeout: seconds before a call is abandoned and the host restarted
+        @param load_timeout: seconds to wait for the host to load the plugin
+        @param max_restart_delay: max seconds between restarts of a crashing host
+        """
+        super().__init__(config, bus)
+        self.plugin_loader = plugin_loader
+        self.plug_name = plug_name
+        self.timeout = timeout
+        self.load_timeout = load_timeout
+        self.max_restart_delay = max_restart_delay
+        self.remote = False
+        self._can_warm_up = False
+        self._uris = []
+        self._ctx = multiprocessing.get_context("spawn")
+        self._proc = None
+        self._conn = None
+        self._generation = 0
+        self._ids = itertools.count()
+        self._calls = {}  # call id -> [Event, ok, result, runtime]
+        self._send_lock = Lock()
+        self._restart_lock = Lock()
+        self._restarts = 0
+        self._events = queue.Queue()
+        self._forwarded = {}  # event -> bus handler sending it to the host
+        self._closing = False
+        self._stats = {"calls": 0, "timeouts": 0, "errors": 0, "restarts": 0,
+                       "avg_rtt": 0.0, "max_rtt": 0.0, "avg_overhead": 0.0}
+        Thread(target=self._dispatch_events, daemon=True,
+               name=f"OCPBackendHost.{plug_name}.events").start()
+        if not self._start():
+            self.shutdown()
+            raise RuntimeError(f"failed to start backend host for {plug_name}")
+
+    # host process management
+    def _start(self) -> bool:
+        parent, child = self._ctx.Pipe()
+        proc = self._ctx.Process(target=_backend_host, daemon=True,
+                                 name=f"OCPBackendHost.{self.plug_name}",
+                                 args=(child, self.plugin_loader, self.plug_name, self.config))
+        proc.start()
+        child.close()
+        deadline = time.monotonic() + self.load_timeout
+        status, info = "failed", f"plugin not loaded in {self.load_timeout}s"
+        while parent.poll(max(deadline - time.monotonic(), 0)):
+            try:
+                data = parent.recv()
+            except (EOFError, OSError):
+                status, info = "failed", "host process died"
+                break
+            if data[0] in ("ready", "failed"):
+                status, info = data
+                break
+            self._events.put(data)  # the plugin emitted or subscribed while loading
+        if status != "ready":
+            LOG.error(f"{self.plug_name} backend host failed to load plugin: {info}")
+            self._kill(proc, parent)
+            return False
+        self._uris = info["supported_uris"]
+        self.remote = info["remote"]
+        self._can_warm_up = info.get("warm_up", False)
+        self._generation += 1
+        self._proc, self._conn = proc, parent
+        Thread(target=self._read, args=(parent, self._generation), daemon=True,
+               name=f"OCPBackendHost.{self.plug_name}.reader").start()
+        LOG.info(f"{self.plug_name} backend host started, pid: {proc.pid}")
+        return True
+
+    @staticmethod
+    def _kill(proc, conn):
+        try:
+            conn.close()
+        except OSError:
+            pass
+        proc.terminate()
+        proc.join(1)
+        if proc.is_alive():
+            proc.kill()
+            proc.join(1)
+
+    def _restart(self, generation: int, reason: str):
+        """ replace the host process, unless another thread already did """
+        with self._restart_lock:
+            if self._closing or generation != self._generation:
+                return
+            LOG.error(f"restarting {self.plug_name} backend host: {reason}")
+            self._stats["restarts"] += 1
+            was_playing = self._now_playing
+            self._kill(self._proc, self._conn)
+            self._fail_pending()
+            if was_playing:
+                self.ocp_error()  # OCP moves on to the next track
+            while not self._closing:
+                delay = min(2 ** self._restarts - 1, self.max_restart_delay)
+                self._restarts += 1
+                time.sleep(delay)
+                if self._start():
+                    return
+
+    def _fail_pending(self):
+        for call in list(self._calls.values()):
+            call[1:] = [False, "backend host restarted", 0.0]
+            call[0].set()
+
+    # RPC
+    def _send(self, data: tuple):
+        with self._send_lock:
+            self._conn.send(data)
+
+    def _read(self, conn, generation: int):
+        while True:
+            try:
+                data = conn.recv()
+            except (EOFError, OSError):
+                break
+            kind = data[0]
+            if kind == "result":
+                _, call_id, ok, result, runtime = data
+                call = self._calls.get(call_id)
+                if call:
+                    call[1:] = [ok, result, runtime]
+                    call[0].set()
+            else:  # emit/on/remove/track_start, keep their order
+                self._events.put(data)
+        if not self._closing and generation == self._generation:
+            Thread(target=self._restart, args=(generation, "host process died"),
+                   daemon=True).start()
+
+    def _dispatch_events(self):
+        """ runs host events outside the reader thread, handlers may call back into the host """
+        while True:
+            data = self._events.get()
+            if data is None:
+                return
+            kind = data[0]
+            try:
+                if kind == "emit":
+                    self.bus.emit(Message.deserialize(data[1]))
+                elif kind == "track_start":
+                    if self._track_start_callback:
+                        self._track_start_callback(data[1])
+                elif kind == "on" and data[1] not in self._forwarded:
+                    self._forwarded[data[1]] = self._forward_handler(data[1])
+                    self.bus.on(data[1], self._forwarded[data[1]])
+                elif kind == "remove" and data[1] in self._forwarded:
+                    self.bus.remove(data[1], self._forwarded.pop(data[1]))
+            except Exception as e:
+                LOG.exception(f"failed to handle {kind} from {self.plug_name} host: {e}")
+
+    def _forward_handler(self, event: str) -> Callable:
+        def handler(message: Message):
+            try:
+                self._send(("bus", message.serialize()))
+            except Exception as e:
+                LOG.debug(f"failed to forward {event} to {self.plug_name} host: {e}")
+
+        return handler
+
+    def _call(self, method: str, *args, timeout: float = None):
+        """
+        Call a plugin method in the host process
+        @return: the method result, None if it failed or timed out
+        """
+        timeout = timeout or self.timeout
+        generation = self._generation
+        call_id = next(self._ids)
+        call = self._calls[call_id] = [Event(), False, None, 0.0]
+        start = time.monotonic()
+        try:
+            self._send(("call", call_id, method, args))
+            finished = call[0].wait(timeout)
+        except Exception as e:
+            LOG.error(f"{self.plug_name}.{method} failed: {e}")
+            finished = False
+        finally:
+            self._calls.pop(call_id, None)
+        rtt = time.monotonic() - start
+        if not finished:
+            self._stats["timeouts"] += 1
+            LOG.error(f"{self.plug_name}.{method} did not return in {timeout}s")
+            Thread(target=self._restart, args=(generation, f"{method} timed out"),
+                   daemon=True).start()
+            return None
+        _, ok, result, runtime = call
+        self._record(rtt, runtime)
+        if not ok:
+            self._stats["errors"] += 1
+            LOG.error(f"{self.plug_name}.{method} failed: {result}")
+            return None
+        self._restarts = 0  # healthy again
+        return result
+
+    def _record(self, rtt: float, runtime: float):
+        stats = self._stats
+        stats["calls"] += 1
+        stats["avg_rtt"] += (rtt - stats["avg_rtt"]) / stats["calls"]
+        stats["avg_overhead"] += (rtt - runtime - stats["avg_overhead"]) / stats["calls"]
+        stats["max_rtt"] = max(stats["max_rtt"], rtt)
+
+    @property
+    def metrics(self) -> dict:
+        """
+        RPC stats, times in seconds
+        """
+        return dict(self._stats, pid=self._proc.pid if self._proc else None,
+                    alive=bool(self._proc and self._proc.is_alive()))
+
+    # MediaBackend
+    def supported_uris(self):
+        return self._uris
+
+    def load_track(self, uri):
+        self._now_playing = uri
+        LOG.debug(f"queuing for {self.plug_name} playback (isolated): {uri}")
+        self._call("load_track", uri)
+
+    def play(self):
+        self._call("play")
+
+    def stop(self):
+        return self._call("stop")
+
+    def pause(self):
+        self._call("pause")
+
+    def resume(self):
+        self._call("resume")
+
+    def lower_volume(self):
+        self._call("lower_volume")
+
+    def restore_volume(self):
+        self._call("restore_volume")
+
+    def get_track_length(self) -> int:
+        return self._call("get_track_length") or 0
+
+    def get_track_position(self) -> int:
+        return self._call("get_track_position") or 0
+
+    def set_track_position(self, milliseconds):
+        self._call("set_track_position", milliseconds)
+
+    def seek_forward(self, seconds=1):
+        self._call("seek_forward", seconds)
+
+    def seek_backward(self, seconds=1):
+        self._call("seek_backward", seconds)
+
+    def track_info(self):
+        return self._call("track_info") or super().track_info()
+
+    def warm_up(self):
+        # optional plugin method, prepares playback ahead of load_track
+        if self._can_warm_up:
+            self._call("warm_up", timeout=self.load_timeout)
+
+    def shutdown(self):
+        self._closing = True
+        if self._proc:
+            try:
+                self._call("shutdown")
+            except Exception:
+                pass
+            self._kill(self._proc, self._conn)
+        self._fail_pending()
+        for event, handler in self._forwarded.items():
+            self.bus.remove(event, handler)
+        self._forwarded = {}
+        self._events.put(None)
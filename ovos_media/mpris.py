@@ -1,6 +1,8 @@
 import asyncio
+import hashlib
+import json
 import os.path
-from threading import Thread, Event
+from threading import Thread, Event, Lock, Timer
 from time import sleep
 
 
@@ -47,7 +49,7 @@ patch_dbus_next()
 from dbus_next.aio import MessageBus as DbusMessageBus
 from dbus_next.constants import BusType
 from dbus_next.message import Message as DbusMessage, MessageType as DbusMessageType
-from dbus_next.service import ServiceInterface, method, dbus_property, PropertyAccess
+from dbus_next.service import ServiceInterface, method, dbus_property, signal, PropertyAccess
 
 from ovos_bus_client.message import Message
 from ovos_utils.log import LOG
@@ -64,7 +66,20 @@ class MprisPlayerCtl(Thread):
         eg, KDE connect will allow controlling OCP via the phone
     """
 
-    def __init__(self, player, config=None, daemonic=True, manage_players=False):
+    # MPRIS metadata fields that are applied to OCP without resetting now_playing
+    META_KEYS = ("artist", "album", "image", "bg_image", "length", "skill_icon")
+
+    def __init__(self, player, config=None, daemonic=True, manage_players=False,
+                 sync_debounce=0.25, props_batch_window=0.05):
+        """
+        @param player: OCPMediaPlayer to integrate with
+        @param config: MPRIS config, eg. "dbus_type"
+        @param daemonic: run as a daemon thread
+        @param manage_players: sync metadata and control external players
+        @param sync_debounce: seconds to coalesce bursts of external player updates
+        @param props_batch_window: seconds to collect OCP property changes
+                                   into a single PropertiesChanged signal
+        """
         super(MprisPlayerCtl, self).__init__()
         self.dbus = None
         self.config = config or {}
@@ -90,6 +105,16 @@ class MprisPlayerCtl(Thread):
         self.players = {}
         self.player_meta = {}
         self._player_fails = {}
+        self._meta_hashes = {}  # player -> hash of the last normalized metadata
+        self._synced = {}  # last data applied to OCP
+        self._sync_lock = Lock()
+        self._sync_timer = None
+        self.sync_debounce = sync_debounce
+        self.props_batch_window = props_batch_window
+        self._props_lock = Lock()
+        self._props_timer = None
+        self._pending_props = {}
+        self._pending_seek = None
         self.manage_players = True  # manage_players
         # TODO from ovos_media.conf
         self.ignored_players = [
@@ -111,73 +136,155 @@ class MprisPlayerCtl(Thread):
         await self.dbus.request_name('org.mpris.MediaPlayer2.OCP')
 
     def update_props(self, props):
-        self.mediaPlayer2PlayerInterface.emit_properties_changed(props)
+        """
+        Queue changed OCP properties, changes within `props_batch_window`
+        are emitted as a single PropertiesChanged signal
+        @param props: property name -> new value
+        """
+        with self._props_lock:
+            self._pending_props.update(props)
+            self._schedule_props_flush()
+
+    def seeked(self, position: int):
+        """
+        Emit the Seeked signal after a position discontinuity (seek, new track),
+        clients interpolate Position from PlaybackStatus and Rate in between
+        @param position: new position in milliseconds
+        """
+        with self._props_lock:
+            self._pending_seek = position
+            self._schedule_props_flush()
+
+    def _schedule_props_flush(self):
+        if self.props_batch_window <= 0:
+            Thread(target=self._flush_props, daemon=True).start()
+        elif not self._props_timer:
+            self._props_timer = Timer(self.props_batch_window, self._flush_props)
+            self._props_timer.daemon = True
+            self._props_timer.start()
+
+    def _flush_props(self):
+        with self._props_lock:
+            props, self._pending_props = self._pending_props, {}
+            seek, self._pending_seek = self._pending_seek, None
+            self._props_timer = None
+        try:
+            # Metadata before Seeked, clients resync position per track
+            if props:
+                self.mediaPlayer2PlayerInterface.emit_properties_changed(props)
+            if seek is not None:
+                self.mediaPlayer2PlayerInterface.Seeked(int(seek * 1000))
+        except Exception as e:
+            LOG.error(f"failed to emit MPRIS properties: {e}")
+
+    def _schedule_sync(self):
+        """ update OCP once a burst of external player updates settles """
+        if self.sync_debounce <= 0:
+            self._update_ocp()
+            return
+        with self._sync_lock:
+            if self._sync_timer:
+                self._sync_timer.cancel()
+            self._sync_timer = Timer(self.sync_debounce, self._update_ocp)
+            self._sync_timer.daemon = True
+            self._sync_timer.start()
 
     def _update_ocp(self):
         if self.stop_event.is_set() or not self.manage_players:
             return
 
-        if self._ocp_player and self.player_meta.get(self.main_player):
-            data = self.player_meta[self.main_player]
-
-            # reset ocp, it will display metadata of current track
-            render = False
-            if self._ocp_player.active_skill != self.main_player:
-                self._ocp_player.reset()
-                self._ocp_player.active_skill = self.main_player
-                render = True
-
-            # player state
-            state = data.get("state") or "Playing"
-            if state == "Paused":
-                self._ocp_player.set_player_state(PlayerState.PAUSED)
-                self._ocp_player.set_media_state(MediaState.BUFFERED_MEDIA)
-            elif state == "Playing":
-                self._ocp_player.set_player_state(PlayerState.PLAYING)
-                self._ocp_player.set_media_state(MediaState.BUFFERED_MEDIA)
-            else:
-                self._ocp_player.set_player_state(PlayerState.STOPPED)
-                self._ocp_player.set_media_state(MediaState.END_OF_MEDIA)
+        with self._sync_lock:
+            self._sync_timer = None
+            if self._ocp_player and self.player_meta.get(self.main_player):
+                # the player state is only changed by its command executor
+                self._ocp_player.executor.submit("mpris_sync", self._sync_ocp,
+                                                 dict(self.player_meta[self.main_player]))
 
-            state = data.get("loop_state") or 0
-            if state == 1:
-                self._ocp_player.loop_state = data["loop_state"] = LoopState.REPEAT
-            elif state == 2:
-                self._ocp_player.loop_state = data["loop_state"] = LoopState.REPEAT_TRACK
-            else:
-                self._ocp_player.loop_state = data["loop_state"] = LoopState.NONE
-
-            self._ocp_player.shuffle = data.get("shuffle") or self._ocp_player.shuffle
-            self._ocp_player.playback_type = PlaybackType.MPRIS
-
-            # update ocp metadata
-            data["skill_id"] = data["external_player"]
-            data["bg_image"] = data.get("image") or data.get("thumbnail")
-            data["playback"] = PlaybackType.MPRIS
-            data["status"] = TrackState.PLAYING_MPRIS
-            data["length"] = data.get("length", 0) / 1000
-            # dedicated icons for some common players
-            if self.main_player == 'org.mpris.MediaPlayer2.spotify':
-                data["skill_icon"] = f"{os.path.dirname(__file__)}/qt5/images/spotify.png"
-            elif self.main_player.startswith("org.mpris.MediaPlayer2.firefox"):
-                data["skill_icon"] = f"{os.path.dirname(__file__)}/qt5/images/firefox.png"
-            elif self.main_player.startswith("org.mpris.MediaPlayer2.chromium"):
-                data["skill_icon"] = f"{os.path.dirname(__file__)}/qt5/images/chromium.png"
-            elif self.main_player == "org.mpris.MediaPlayer2.vlc":
-                data["skill_icon"] = f"{os.path.dirname(__file__)}/qt5/images/vlc.png"
-            elif self.main_player == "org.mpris.MediaPlayer2.mpv":
-                data["skill_icon"] = f"{os.path.dirname(__file__)}/qt5/images/mpv.png"
-            elif self.main_player == "org.mpris.MediaPlayer2.audacious":
-                data["skill_icon"] = f"{os.path.dirname(__file__)}/qt5/images/audacious.png"
-            else:
-                data["skill_icon"] = f"{os.path.dirname(__file__)}/qt5/images/mpris.png"
+    def _sync_ocp(self, data: dict):
+        """
+        Apply external player data to OCP, only the fields that changed since
+        the last sync are pushed to now_playing and the GUI,
+        runs as an "mpris_sync" player command
+        @param data: normalized player metadata, see `_meta2dict`
+        """
+        # reset ocp, it will display metadata of current track
+        render = False
+        if self._ocp_player.active_skill != self.main_player:
+            self._ocp_player.reset()
+            self._ocp_player.active_skill = self.main_player
+            self._synced = {}
+            render = True
+
+        # player state
+        state = data.get("state") or "Playing"
+        if state == "Paused":
+            self._ocp_player.set_player_state(PlayerState.PAUSED)
+            self._ocp_player.set_media_state(MediaState.BUFFERED_MEDIA)
+        elif state == "Playing":
+            self._ocp_player.set_player_state(PlayerState.PLAYING)
+            self._ocp_player.set_media_state(MediaState.BUFFERED_MEDIA)
+        else:
+            self._ocp_player.set_player_state(PlayerState.STOPPED)
+            self._ocp_player.set_media_state(MediaState.END_OF_MEDIA)
+
+        state = data.get("loop_state") or 0
+        if state == 1:
+            self._ocp_player.loop_state = data["loop_state"] = LoopState.REPEAT
+        elif state == 2:
+            self._ocp_player.loop_state = data["loop_state"] = LoopState.REPEAT_TRACK
+        else:
+            self._ocp_player.loop_state = data["loop_state"] = LoopState.NONE
+
+        self._ocp_player.shuffle = data.get("shuffle") or self._ocp_player.shuffle
+        self._ocp_player.playback_type = PlaybackType.MPRIS
+
+        # update ocp metadata
+        data["skill_id"] = data["external_player"]
+        data["bg_image"] = data.get("image") or data.get("thumbnail")
+        data["playback"] = PlaybackType.MPRIS
+        data["status"] = TrackState.PLAYING_MPRIS
+        data["length"] = (data.get("length") or 0) / 1000
+        # dedicated icons for some common players
+        if self.main_player == 'org.mpris.MediaPlayer2.spotify':
+            data["skill_icon"] = f"{os.path.dirname(__file__)}/qt5/images/spotify.png"
+        elif self.main_player.startswith("org.mpris.MediaPlayer2.firefox"):
+            data["skill_icon"] = f"{os.path.dirname(__file__)}/qt5/images/firefox.png"
+        elif self.main_player.startswith("org.mpris.MediaPlayer2.chromium"):
+            data["skill_icon"] = f"{os.path.dirname(__file__)}/qt5/images/chromium.png"
+        elif self.main_player == "org.mpris.MediaPlayer2.vlc":
+            data["skill_icon"] = f"{os.path.dirname(__file__)}/qt5/images/vlc.png"
+        elif self.main_player == "org.mpris.MediaPlayer2.mpv":
+            data["skill_icon"] = f"{os.path.dirname(__file__)}/qt5/images/mpv.png"
+        elif self.main_player == "org.mpris.MediaPlayer2.audacious":
+            data["skill_icon"] = f"{os.path.dirname(__file__)}/qt5/images/audacious.png"
+        else:
+            data["skill_icon"] = f"{os.path.dirname(__file__)}/qt5/images/mpris.png"
 
+        changed = {k: v for k, v in data.items() if self._synced.get(k) != v}
+        if not changed:
+            return
+        synced, self._synced = self._synced, data
+        if render or not synced or \
+                self._ocp_player.now_playing.playback != PlaybackType.MPRIS or \
+                any(k not in self.META_KEYS + ("state", "loop_state", "shuffle")
+                    for k in changed):
+            # new track, replace now_playing and refresh the whole GUI
             self._ocp_player.set_now_playing(data)
             self._ocp_player.gui.prepare_gui_data()
-            if data["state"] == "Playing":
-                # move GUI to player page
-                if render:
-                    self._ocp_player.gui.render_player()
+        else:
+            meta = {k: v for k, v in changed.items() if k in self.META_KEYS}
+            if meta:
+                # late metadata for the same track (eg. artwork, length)
+                self._ocp_player.now_playing.update(meta)
+                self._ocp_player.gui.update_current_track()
+                self.update_props({"Metadata": self._ocp_player.now_playing.mpris_metadata})
+                self._ocp_player.notify_state_changed()
+            self._ocp_player.gui.update_buttons()
+
+        if data["state"] == "Playing":
+            # move GUI to player page
+            if render:
+                self._ocp_player.gui.render_player()
 
     async def handle_new_player(self, data):
         if data['name'] not in self._player_fails:
@@ -217,6 +324,7 @@ class MprisPlayerCtl(Thread):
         LOG.info(f"Lost MPRIS Player: {name}")
         if name in self.player_meta:
             self.player_meta.pop(name)
+        self._meta_hashes.pop(name, None)
         if name in self.players:
             self.players.pop(name)
 
@@ -224,7 +332,7 @@ class MprisPlayerCtl(Thread):
         if data.get("state") == 'Playing':
             await self._set_main_player(data["external_player"])
         elif data["external_player"] == self.main_player:
-            self._update_ocp()
+            self._schedule_sync()
 
     async def _set_main_player(self, name):
         self.main_player = name
@@ -233,7 +341,7 @@ class MprisPlayerCtl(Thread):
         # if there are multiple external players playing, stop the
         # previous ones!
         if self.manage_players:
-            self._update_ocp()
+            self._schedule_sync()
             for p, dta in self.players.items():
                 if p == name:
                     continue
@@ -475,11 +583,7 @@ class MprisPlayerCtl(Thread):
                             {"state": variant.value,
                              "external_player": player_name})
                 elif changed == "Metadata":
-                    ocp_data = self._meta2dict(name, variant.value)
-                    LOG.info(f"MPRIS info: {ocp_data}")
                     await self.update_player_meta(player_name, variant.value)
-                    if name == self.main_player:
-                        self._update_ocp()
                 elif changed == "Shuffle":
                     self.player_meta[player_name]["shuffle"] = variant.value
                     await self.handle_player_shuffle(variant.value)
@@ -521,10 +625,28 @@ class MprisPlayerCtl(Thread):
             ocp_data["state"] = "Playing"
         return ocp_data
 
+    @staticmethod
+    def _meta_hash(ocp_data: dict) -> str:
+        return hashlib.sha1(json.dumps(ocp_data, sort_keys=True,
+                                       default=str).encode("utf-8")).hexdigest()
+
     async def update_player_meta(self, name, meta):
+        # signals only carry the changed properties, keep the last known state
+        prev = self.player_meta.get(name) or {}
+        meta = dict(meta)
+        for k in ("state", "loop_state"):
+            if meta.get(k) is None and prev.get(k) is not None:
+                meta[k] = prev[k]
         ocp_data = self._meta2dict(name, meta)
-        if name not in self.player_meta:
-            LOG.info(f"MPRIS info: {ocp_data}")
+        if prev.get("shuffle") is not None:
+            ocp_data["shuffle"] = prev["shuffle"]
+
+        # polling and signal bursts re-send the same metadata, skip it
+        meta_hash = self._meta_hash(ocp_data)
+        if self._meta_hashes.get(name) == meta_hash:
+            return
+        self._meta_hashes[name] = meta_hash
+        LOG.info(f"MPRIS info: {ocp_data}")
         self.player_meta[name] = ocp_data
         if self.main_player is None and ocp_data.get("state", "") == "Playing":
             LOG.info(f"Active MPRIS player: {name}")
@@ -671,6 +793,12 @@ class MprisPlayerCtl(Thread):
     def shutdown(self):
         self.stop()
         self.shutdown_event.set()
+        with self._sync_lock:
+            if self._sync_timer:
+                self._sync_timer.cancel()
+        with self._props_lock:
+            if self._props_timer:
+                self._props_timer.cancel()
         self.loop.stop()
         while self.loop.is_running():
             sleep(0.2)
@@ -797,11 +925,12 @@ class _MediaPlayer2PlayerInterface(ServiceInterface):
 
     @dbus_property(access=PropertyAccess.READ)
     def Rate(self) -> 'd':
-        return 1
+        return float(self._ocp_player.now_playing.clock.rate)
 
     @dbus_property(access=PropertyAccess.READ)
-    def Position(self) -> 'd':
-        return 1  # TODO from ocp_player
+    def Position(self) -> 'x':
+        # microseconds, interpolated locally, no round trip to the backend
+        return int(self._ocp_player.now_playing.position * 1000)
 
     @dbus_property(access=PropertyAccess.READ)
     def CanPlay(self) -> 'b':
@@ -813,7 +942,8 @@ class _MediaPlayer2PlayerInterface(ServiceInterface):
 
     @dbus_property(access=PropertyAccess.READ)
     def CanSeek(self) -> 'b':
-        return False
+        return self._ocp_player.playback_type in [PlaybackType.AUDIO,
+                                                  PlaybackType.VIDEO]
 
     @dbus_property(access=PropertyAccess.READ)
     def CanGoNext(self) -> 'b':
@@ -827,28 +957,50 @@ class _MediaPlayer2PlayerInterface(ServiceInterface):
     def CanControl(self) -> 'b':
         return True
 
+    @signal()
+    def Seeked(self, position) -> 'x':
+        return position
+
+    # commands go through the player executor, ordered with bus and GUI
+    # commands and superseded by stop like them
+    def _submit(self, name: str, func, *args):
+        self._ocp_player.executor.submit(name, func, *args)
+
+    @method()
+    def Seek(self, offset: 'x'):
+        position = self._ocp_player.now_playing.position + offset // 1000
+        self._submit("seek", self._ocp_player.seek, max(position, 0))
+
+    @method()
+    def SetPosition(self, track_id: 'o', position: 'x'):
+        if position >= 0:
+            self._submit("seek", self._ocp_player.seek, position // 1000)
+
     @method()
     def Previous(self):
-        self._ocp_player.play_prev()
+        self._submit("prev", self._ocp_player.play_prev)
 
     @method()
     def Next(self):
-        self._ocp_player.play_next()
+        self._submit("next", self._ocp_player.play_next)
 
     @method()
     def Stop(self):
-        self._ocp_player.pause()
+        self._submit("pause", self._ocp_player.pause)
 
     @method()
     def Play(self):
-        self._ocp_player.resume()
+        self._submit("resume", self._ocp_player.resume)
 
     @method()
     def Pause(self):
-        self._ocp_player.pause()
+        self._submit("pause", self._ocp_player.pause)
 
     @method()
     def PlayPause(self):
+        self._submit("pause_toggle", self._play_pause)
+
+    def _play_pause(self):
         if self._ocp_player.state == PlayerState.PAUSED:
             self._ocp_player.resume()
         else:
@@ -0,0 +1,359 @@
+import dataclasses
+import json
+import os
+import time
+from threading import Event, Lock, Thread, Timer
+from typing import Callable, List, Optional
+
+from json_database import JsonStorageXDG
+
+from ovos_config.meta import get_xdg_base
+from ovos_utils.log import LOG
+from ovos_utils.ocp import MediaEntry
+from ovos_utils.xdg_utils import xdg_state_home
+
+_ENTRY_FIELDS = {f.name for f in dataclasses.fields(MediaEntry)}
+
+
+def fast_dict2entry(data: dict):
+    """
+    Deserialize a stored track, skipping the per-entry signature inspection
+    done by MediaEntry.from_dict for plain media entries
+    @param data: dict representation of a MediaEntry or Playlist
+    """
+    if data.get("playlist") or not data.get("uri"):
+        return MediaEntry.from_dict(data)
+    return MediaEntry(**{k: v for k, v in data.items() if k in _ENTRY_FIELDS})
+
+
+class PlayerSnapshotStore:
+    """ Debounced snapshots of OCP player state in the XDG state directory
+
+    state is split in two files so writes are incremental:
+        - "cursor": now playing, position, shuffle/loop, playlist positions
+        - "queue": full playlist and search results, only written when marked dirty
+    """
+
+    def __init__(self, snapshot_getter: Callable[[bool], dict],
+                 debounce: float = 2.0, name: str = "OCP_session"):
+        """
+        @param snapshot_getter: callable returning the snapshot dict, receives
+                                True if the queue should be included
+        @param debounce: seconds to wait before writing, changes during this
+                         window are coalesced into a single write
+        @param name: file name, the queue is stored in "{name}_queue"
+        """
+        self.snapshot_getter = snapshot_getter
+        self.debounce = debounce
+        self.cursor = JsonStorageXDG(name, xdg_folder=xdg_state_home(),
+                                     subfolder=get_xdg_base())
+        self.queue = JsonStorageXDG(f"{name}_queue", xdg_folder=xdg_state_home(),
+                                    subfolder=get_xdg_base())
+        self._lock = Lock()
+        self._timer: Optional[Timer] = None
+        self._queue_dirty = False
+        self._closed = False
+
+    def mark_dirty(self, queue: bool = False):
+        """
+        Schedule a snapshot, if one is already pending it will include this change
+        @param queue: if True the playlist/search results also changed
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._queue_dirty = self._queue_dirty or queue
+            if self._timer is None:
+                self._timer = Timer(self.debounce, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """
+        Write any pending changes to disk immediately
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            include_queue = self._queue_dirty
+            self._queue_dirty = False
+        try:
+            snapshot = self.snapshot_getter(include_queue)
+        except Exception as e:
+            LOG.error(f"Failed to snapshot player state: {e}")
+            return
+        queue = snapshot.pop("queue", None)
+        if queue is not None:
+            self.queue.clear()
+            self.queue.update(queue)
+            self.queue.store()
+        if snapshot != dict(self.cursor):  # skip unchanged cursor
+            self.cursor.clear()
+            self.cursor.update(snapshot)
+            self.cursor.store()
+
+    def close(self):
+        """
+        Cancel pending writes and stop accepting new ones
+        """
+        with self._lock:
+            self._closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def delete(self):
+        """
+        Stop writing and remove the stored files, used when a zone is discarded
+        """
+        self.close()
+        self.cursor.remove()
+        self.queue.remove()
+
+    def load(self) -> dict:
+        """
+        Return the last stored snapshot, with the queue entries deserialized
+        """
+        if not self.cursor.get("now_playing") and not self.queue.get("playlist"):
+            return {}
+        start = time.monotonic()
+        snapshot = dict(self.cursor)
+        snapshot["playlist"] = self._load_entries(self.queue.get("playlist", []))
+        snapshot["search_playlist"] = self._load_entries(self.queue.get("search_playlist", []))
+        LOG.debug(f"Loaded session snapshot with {len(snapshot['playlist'])} "
+                  f"queued tracks in {time.monotonic() - start:.3f}s")
+        return snapshot
+
+    @staticmethod
+    def _load_entries(entries: List[dict]) -> list:
+        loaded = []
+        for data in entries:
+            try:
+                loaded.append(fast_dict2entry(data))
+            except Exception as e:
+                LOG.warning(f"Skipping invalid stored track: {e}")
+        return loaded
+
+
+class FailedURICache:
+    """ Negative cache of URIs that recently failed to play
+
+    entries expire after `ttl` seconds, doubled for every repeated failure
+    up to `max_ttl`, the least recently failed entries are evicted once
+    `max_size` is reached
+    """
+
+    def __init__(self, ttl: float = 600, max_ttl: float = 86400, max_size: int = 500):
+        """
+        @param ttl: seconds a URI is skipped after its first failure
+        @param max_ttl: upper bound for the expiration of repeated failures
+        @param max_size: max number of URIs to remember
+        """
+        self.ttl = ttl
+        self.max_ttl = max_ttl
+        self.max_size = max_size
+        self.db = JsonStorageXDG("OCP_failed_uris", xdg_folder=xdg_state_home(),
+                                 subfolder=get_xdg_base())
+        self._lock = Lock()
+        self.prune()
+
+    @staticmethod
+    def _uri(entry) -> Optional[str]:
+        if isinstance(entry, str):
+            return entry
+        if isinstance(entry, dict):
+            return entry.get("uri")
+        return getattr(entry, "uri", None)
+
+    def add(self, entry, reason: str = ""):
+        """
+        Record a playback failure
+        @param entry: uri, dict or MediaEntry that failed to play
+        @param reason: failure description
+        """
+        uri = self._uri(entry)
+        if not uri:
+            return
+        now = time.time()
+        with self._lock:
+            count = self.db.get(uri, {}).get("count", 0) + 1
+            ttl = min(self.ttl * 2 ** (count - 1), self.max_ttl)
+            self.db[uri] = {"count": count,
+                            "reason": reason,
+                            "failed_at": now,
+                            "expires": now + ttl}
+            if len(self.db) > self.max_size:
+                for k in sorted(self.db, key=lambda k: self.db[k]["failed_at"])[
+                         :len(self.db) - self.max_size]:
+                    self.db.pop(k)
+            self.db.store()
+        LOG.debug(f"Skipping {uri} for {ttl}s after {count} failures: {reason}")
+
+    def remove(self, entry):
+        """
+        Forget a URI, eg. after it played successfully
+        @param entry: uri, dict or MediaEntry
+        """
+        uri = self._uri(entry)
+        with self._lock:
+            if uri in self.db:
+                self.db.pop(uri)
+                self.db.store()
+
+    def is_failed(self, entry) -> bool:
+        """
+        @param entry: uri, dict or MediaEntry
+        @return: True if the URI failed recently and should be skipped
+        """
+        uri = self._uri(entry)
+        data = self.db.get(uri) if uri else None
+        return bool(data) and data["expires"] > time.time()
+
+    def __contains__(self, entry) -> bool:
+        return self.is_failed(entry)
+
+    def prune(self):
+        """
+        Drop expired entries
+        """
+        now = time.time()
+        with self._lock:
+            expired = [k for k, v in self.db.items() if v.get("expires", 0) <= now]
+            for k in expired:
+                self.db.pop(k)
+            if expired:
+                self.db.store()
+
+
+class ResumePositionStore:
+    """ Last playback position of long media, so it can resume where it stopped
+
+    uri -> [position ms, length ms, updated timestamp], the least recently
+    updated entries are evicted once `max_size` is reached
+
+    updates only change memory, they are written to disk in the background
+    at most every `save_interval` seconds, playback never waits for a write
+    """
+
+    def __init__(self, min_length: float = 600, max_size: int = 200,
+                 save_interval: float = 30, sample_interval: float = 15,
+                 position_getter: Callable[[], Optional[tuple]] = None,
+                 name: str = "OCP_resume_positions"):
+        """
+        @param min_length: seconds, shorter media always starts from the beginning
+        @param max_size: max number of URIs to remember
+        @param save_interval: seconds between writes, updates in between are batched
+        @param sample_interval: seconds between `position_getter` samples
+        @param position_getter: callable returning (uri, position, length) of
+                                the playing media, or None if nothing is playing
+        @param name: file name in the XDG state directory
+        """
+        self.min_length = min_length * 1000
+        self.max_size = max_size
+        self.save_interval = save_interval
+        self.sample_interval = sample_interval
+        self.position_getter = position_getter
+        self.db = JsonStorageXDG(name, xdg_folder=xdg_state_home(),
+                                 subfolder=get_xdg_base())
+        self._lock = Lock()
+        self._write_lock = Lock()
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._stop = Event()
+        self._thread = None
+        if self.position_getter:
+            self._thread = Thread(target=self._run, daemon=True, name="OCPResumePositions")
+            self._thread.start()
+
+    def update(self, uri: str, position: int, length: int):
+        """
+        Record the position of a track, ignored for media shorter than `min_length`
+        @param uri: original uri of the track
+        @param position: milliseconds
+        @param length: track length in milliseconds
+        """
+        if not uri or not length or length < self.min_length or position is None:
+            return
+        with self._lock:
+            self.db.pop(uri, None)  # re-insert, dict order is the LRU order
+            self.db[uri] = [int(position), int(length), int(time.time())]
+            while len(self.db) > self.max_size:
+                self.db.pop(next(iter(self.db)))
+            self._dirty = True
+
+    def get(self, uri: str) -> int:
+        """
+        @param uri: original uri of the track
+        @return: milliseconds to resume at, 0 to start from the beginning
+                 (unknown, barely started or finished)
+        """
+        data = self.db.get(uri) if uri else None
+        if not data:
+            return 0
+        position, length, _ = data
+        # close to the end counts as finished, a sample may be
+        # up to `sample_interval` seconds behind the real end
+        if position < 5000 or position > length - max(30000, length * 0.05):
+            return 0
+        return position
+
+    def remove(self, uri: str):
+        with self._lock:
+            if self.db.pop(uri, None) is not None:
+                self._dirty = True
+
+    def sample(self):
+        """
+        Record the position reported by `position_getter` now
+        """
+        current = self.position_getter() if self.position_getter else None
+        if current:
+            self.update(*current)
+
+    def flush(self):
+        """
+        Write pending changes to disk
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._last_save = time.monotonic()
+            data = dict(self.db)
+        # written outside the lock, updates do not wait for the disk
+        tmp = f"{self.db.path}.tmp"
+        with self._write_lock:
+            try:
+                os.makedirs(os.path.dirname(self.db.path), exist_ok=True)
+                with open(tmp, "w") as f:
+                    json.dump(data, f, separators=(",", ":"))
+                os.replace(tmp, self.db.path)
+            except Exception as e:
+                LOG.error(f"Failed to store resume positions: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.sample_interval):
+            try:
+                self.sample()
+                if time.monotonic() - self._last_save >= self.save_interval:
+                    self.flush()
+            except Exception as e:
+                LOG.error(f"Failed to sample playback position: {e}")
+
+    def close(self):
+        """
+        Stop sampling and write pending changes
+        """
+        self._stop.set()
+        self.flush()
+
+    def delete(self):
+        """
+        Stop sampling and remove the stored file, used when a zone is discarded
+        """
+        self._stop.set()
+        with self._lock:
+            self._dirty = False
+        with self._write_lock:
+            self.db.remove()
@@ -1,162 +1,114 @@
 import random
 import time
 from os.path import join, dirname
-from threading import RLock
-from typing import List, Union
-
-from json_database import JsonStorageXDG
+from threading import Thread, Timer
+from typing import TYPE_CHECKING, Callable, List, Union
+from weakref import WeakSet
 
 from ovos_config import Configuration
-from ovos_config.meta import get_xdg_base
 from ovos_media.gui import OCPGUIInterface, OCPGUIState
 from ovos_media.media_backends import AudioService, VideoService, WebService
-from ovos_media.mpris import MprisPlayerCtl
+from ovos_media.media_backends.base import BaseMediaService
+from ovos_media.artwork import ArtworkCache
+from ovos_media.executor import CommandCancelled, PlayerCommandExecutor
+from ovos_media.idle import IdleReclaimer
+from ovos_media.persistence import PlayerSnapshotStore, FailedURICache, ResumePositionStore, \
+    fast_dict2entry
+from ovos_media.probe import StreamProber
+from ovos_media.status import StatusPublisher
+from ovos_media.utils import PositionClock, MessageSourceFilter, MediaStateDispatcher, PlaybackPhase
+from ovos_media.zones import DEFAULT_ZONE
 from ovos_plugin_manager.ocp import load_stream_extractors
 from ovos_plugin_manager.templates.media import MediaBackend
-from ovos_utils.gui import is_gui_connected, is_gui_running
 from ovos_utils.log import LOG
 from ovos_utils.messagebus import Message
 from ovos_utils.ocp import MediaType, Playlist
 from ovos_utils.ocp import OCP_ID, PlayerState, LoopState, PlaybackType, PlaybackMode, TrackState, MediaState, \
     MediaEntry
 from ovos_workshop import OVOSAbstractApplication
-from ovos_workshop.decorators.ocp import ocp_search
-from ovos_workshop.skills.common_play import OVOSCommonPlaybackSkill
-
-
-class OCPMediaCatalog(OVOSCommonPlaybackSkill):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.skill_icon = f"{dirname(__file__)}/qt5/images/liked.svg"
-
-        self.liked_songs = JsonStorageXDG("OCP_liked_songs",
-                                          subfolder=get_xdg_base())
-        LOG.debug(f"Liked songs playlist loaded: {self.liked_songs.path}")
-        self.search_playlist = Playlist()
-        self.ocp_skills = {}
-        self.featured_skills = {}
-        self.search_lock = RLock()
-        self.add_event("ovos.common_play.skills.detach", self.handle_ocp_skill_detach)
-        self.add_event("ovos.common_play.announce", self.handle_skill_announce)
-
-        # TODO - add search results clear/replace events
-
-        # register keywords
-        def norm_name(n):
-            return n.split("|")[0].split("(")[0].split("[")[0].split("{")[0].split("-")[0].strip()
-
-        self.register_ocp_keyword(MediaType.MUSIC, "song_name",
-                                  [norm_name(n["title"]) for n in self.liked_songs.values()])
-        self.register_ocp_keyword(MediaType.MUSIC, "playlist_name",
-                                  ["favorite", "liked", "favorites",
-                                   "favorite songs", "favorite tracks",
-                                   "favorite music", "my favorite songs",
-                                   "my favorite tracks", "my favorite music",
-                                   "liked songs", "liked tracks", "liked music",
-                                   "my liked songs", "my liked tracks", "my liked music"])
-
-    @ocp_search()
-    def search_db(self, phrase, media_type):
-        base_score = 15 if media_type == MediaType.MUSIC else 0
-        entities = self.ocp_voc_match(phrase)
-        base_score += 30 * len(entities)
-
-        if entities.get("playlist_name"):
-            if phrase.lower() == entities["playlist_name"]:
-                base_score = 100
-            yield {
-                "match_confidence": min(base_score + 35, 100),
-                "media_type": MediaType.MUSIC,
-                "playback": PlaybackType.AUDIO,
-                "playlist": self.liked_songs_playlist,  # return full playlist result
-                "skill_icon": self.skill_icon,
-                "title": "Liked Songs",
-                "skill_id": self.skill_id
-            }
-
-        if entities.get("song_name"):
-            title = entities["song_name"]
-            candidates = [song for song in self.liked_songs_playlist
-                          if title.lower() in song["title"].lower()]
-            for c in candidates:
-                c["match_confidence"] = min(base_score + 40, 100)
-                c["media_type"] = MediaType.MUSIC
-                c["playback"] = PlaybackType.AUDIO
-                c["skill_id"] = self.skill_id
-                c["skill_icon"] = self.skill_icon
-                yield c
 
-    @property
-    def liked_songs_playlist(self):
-        pl = list(self.liked_songs.values())
-        for idx, p in enumerate(pl):
-            pl[idx]["media_type"] = MediaType.MUSIC
-            pl[idx]["playback"] = PlaybackType.AUDIO
-            # HACK to allow sort_by_conf to work once this is in a Playlist object
-            pl[idx]["match_confidence"] = p.get("play_count", 0) + 50
-        return sorted(pl, key=lambda k: k.get("play_count", 0), reverse=True)
-
-    def handle_skill_announce(self, message):
-        skill_id = message.data.get("skill_id")
-        skill_name = message.data.get("skill_name") or skill_id
-        img = message.data.get("image") or message.data.get("thumbnail")
-        has_featured = bool(message.data.get("featured_tracks"))
-        media_types = message.data.get("media_types") or \
-                      message.data.get("media_type") or \
-                      [MediaType.GENERIC]
-
-        if skill_id not in self.ocp_skills:
-            LOG.debug(f"Registered {skill_id}")
-            self.ocp_skills[skill_id] = []
-
-        if has_featured:
-            LOG.debug(f"Found skill with featured media: {skill_id}")
-            self.featured_skills[skill_id] = {
-                "skill_id": skill_id,
-                "skill_name": skill_name,
-                "image": img,
-                "media_types": media_types
-            }
+if TYPE_CHECKING:
+    from ovos_media.catalog import OCPMediaCatalog
+    from ovos_media.library import LocalMediaLibrary
+    from ovos_media.mpris import MprisPlayerCtl
 
-    def handle_ocp_skill_detach(self, message):
-        skill_id = message.data["skill_id"]
-        if skill_id in self.ocp_skills:
-            self.ocp_skills.pop(skill_id)
-        if skill_id in self.featured_skills:
-            self.featured_skills.pop(skill_id)
 
-    def get_featured_skills(self, adult=False):
-        # trigger a presence announcement from all loaded ocp skills
-        self.bus.emit(Message("ovos.common_play.skills.get"))
-        time.sleep(0.2)
-        skills = list(self.featured_skills.values())
-        if adult:
-            return skills
-        return [s for s in skills
-                if MediaType.ADULT not in s["media_types"] and
-                MediaType.HENTAI not in s["media_types"]]
+def __getattr__(name):
+    # OCPMediaCatalog moved to ovos_media.catalog, imported on demand
+    # since ovos_workshop.skills.common_play is slow to import
+    if name == "OCPMediaCatalog":
+        from ovos_media.catalog import OCPMediaCatalog
+        return OCPMediaCatalog
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    def clear(self):
-        self.search_playlist.clear()
 
-    def replace(self, playlist):
-        self.search_playlist.replace(playlist)
+def release_stream_extractors():
+    """
+    Shut down the loaded OCP stream extractor plugins, the next
+    `load_stream_extractors()` call loads them again
+    """
+    if not load_stream_extractors.cache_info().currsize:
+        return  # not loaded
+    xtract = load_stream_extractors()
+    for name, plugin in xtract.extractors.items():
+        try:
+            if hasattr(plugin, "shutdown"):
+                plugin.shutdown()
+        except Exception as e:
+            LOG.error(f"failed to shutdown stream extractor {name}: {e}")
+    load_stream_extractors.cache_clear()
 
 
 class NowPlaying(MediaEntry):
     """ Live Tracking of currently playing media via bus events """
+    # backend position reports further than this (ms) from the interpolated
+    # position are a discontinuity (seek, buffering) and reported to `on_seeked`
+    SEEK_THRESHOLD = 1000
 
-    def __init__(self, bus, *args, **kwargs):
+    def __init__(self, bus, *args, state_dispatcher: MediaStateDispatcher = None,
+                 artwork: ArtworkCache = None, reclaimer: IdleReclaimer = None,
+                 on_seeked: Callable[[int], None] = None, **kwargs):
         self.bus = bus
-        self.stream_xtract = load_stream_extractors()
-        self.position = 0
+        self.reclaimer = reclaimer
+        self.on_seeked = on_seeked
+        self.clock = PositionClock()
+        self.state_dispatcher = state_dispatcher
+        self.artwork = artwork
         super().__init__(*args, **kwargs)
         self.original_uri = self.uri
         self.bus.on("ovos.common_play.track.state", self.handle_track_state_change)
-        self.bus.on("ovos.common_play.media.state", self.handle_media_state_change)
+        if self.state_dispatcher:
+            self.state_dispatcher.subscribe(self.handle_media_state_change,
+                                            MediaStateDispatcher.NOW_PLAYING)
+        else:
+            self.bus.on("ovos.common_play.media.state", self.handle_media_state_change)
+        self.bus.on("ovos.common_play.player.state", self.handle_player_state_change)
         self.bus.on("ovos.common_play.play", self.handle_external_play)
         self.bus.on("ovos.common_play.playback_time", self.handle_sync_seekbar)
 
+    @property
+    def position(self) -> int:
+        """
+        Current playback position in milliseconds, interpolated locally
+        between reports from the media backend
+        """
+        return self.clock.position
+
+    @position.setter
+    def position(self, val: int):
+        self.clock.sync(val)
+
+    @property
+    def mpris_metadata(self) -> dict:
+        """
+        Return dict data used by MPRIS, artwork points to the local cache
+        """
+        meta = super().mpris_metadata
+        if self.artwork and "mpris:artUrl" in meta:
+            from dbus_next.service import Variant
+            meta["mpris:artUrl"] = Variant('s', self.artwork.get(self.image))
+        return meta
+
     def as_entry(self) -> MediaEntry:
         """
         Return a MediaEntry representation of this object
@@ -184,7 +136,11 @@ class NowPlaying(MediaEntry):
         Remove NowPlaying events from the MessageBusClient
         """
         self.bus.remove("ovos.common_play.track.state", self.handle_track_state_change)
-        self.bus.remove("ovos.common_play.media.state", self.handle_media_state_change)
+        if self.state_dispatcher:
+            self.state_dispatcher.unsubscribe(self.handle_media_state_change)
+        else:
+            self.bus.remove("ovos.common_play.media.state", self.handle_media_state_change)
+        self.bus.remove("ovos.common_play.player.state", self.handle_player_state_change)
         self.bus.remove('ovos.common_play.play', self.handle_external_play)
         self.bus.remove('ovos.common_play.playback_time', self.handle_sync_seekbar)
 
@@ -195,7 +151,7 @@ class NowPlaying(MediaEntry):
         self.title = ""
         self.artist = ""
         self.skill_id = ""
-        self.position = 0
+        self.clock.reset()
         self.length = 0
         self.javascript = ""
         self.playback = PlaybackType.UNDEFINED
@@ -218,6 +174,15 @@ class NowPlaying(MediaEntry):
         if newonly and entry.get("uri"):
             super().update({"uri": entry["uri"]})
 
+    @property
+    def stream_xtract(self):
+        """
+        OCP stream extractors, loaded again if released while idle
+        """
+        if self.reclaimer:
+            self.reclaimer.touch("stream_extractors")
+        return load_stream_extractors()  # @lru_cache, its a lazy loaded singleton
+
     def extract_stream(self):
         """
         Get metadata from ocp_plugins and add it to this MediaEntry
@@ -225,16 +190,31 @@ class NowPlaying(MediaEntry):
         uri = self.uri
         if not uri:
             raise ValueError("No URI to extract stream from")
-        if self.playback == PlaybackType.VIDEO:
-            video = True
-        else:
-            video = False
-        meta = self.stream_xtract.extract_stream(uri, video)
+        self.original_uri = uri
+        meta = self.fetch_stream(uri, self.playback == PlaybackType.VIDEO)
+        self.apply_stream(uri, meta)
+
+    def fetch_stream(self, uri: str, video: bool = False) -> dict:
+        """
+        Get metadata for `uri` from ocp_plugins, may block on the network,
+        this MediaEntry is not changed
+        @param uri: uri or SEI to extract the stream from
+        @param video: prefer a video stream
+        @return: extracted metadata
+        """
+        return self.stream_xtract.extract_stream(uri, video)
+
+    def apply_stream(self, uri: str, meta: dict):
+        """
+        Add metadata returned by `fetch_stream` to this MediaEntry
+        @param uri: the uri it was extracted from
+        @param meta: extracted metadata
+        """
+        self.original_uri = uri
         # update media entry with new data
         if meta:
             LOG.info(f"OCP plugins metadata: {meta}")
             self.update(meta, newonly=True)
-            self.original_uri = uri
 
         # validate extracted uri
         if not any((self.uri.startswith(s) for s in ["http", "file", "/"])):
@@ -315,13 +295,29 @@ class NowPlaying(MediaEntry):
             # playback ended, allow next track to change metadata again
             self.reset()
 
+    def handle_player_state_change(self, message):
+        """
+        Handle 'ovos.common_play.player.state' Messages. Start or freeze the
+        position clock
+        @param message: Message with updated PlayerState
+        """
+        state = message.data.get("state")
+        if state is None:
+            raise ValueError(f"Got state update message with no state: "
+                             f"{message}")
+        self.clock.set_running(state == PlayerState.PLAYING)
+
     def handle_sync_seekbar(self, message):
         """
         Handle 'ovos.common_play.playback_time' Messages sent by audio backend
-        @param message: Message with 'length' and 'position' data
+        backends only need to report on discontinuities (seek, buffering),
+        the position is interpolated in between
+        @param message: Message with 'length' and 'position' data, optionally 'rate'
         """
         self.length = message.data["length"]
-        self.position = message.data["position"]
+        drift = self.clock.sync(message.data["position"], rate=message.data.get("rate"))
+        if abs(drift) > self.SEEK_THRESHOLD and self.on_seeked:
+            self.on_seeked(message.data["position"])
 
     def handle_sync_trackinfo(self, message):
         """
@@ -340,29 +336,65 @@ class OCPMediaPlayer(OVOSAbstractApplication):
     "now playing" is tracked and managed by this interface
     """
 
-    def __init__(self, bus=None, config=None, resources_dir=None, skill_id=OCP_ID, **kwargs):
+    def __init__(self, bus=None, config=None, resources_dir=None, skill_id=OCP_ID,
+                 source_filter: MessageSourceFilter = None, zone: str = DEFAULT_ZONE,
+                 shared: 'OCPMediaPlayer' = None, **kwargs):
+        """
+        @param source_filter: shared MessageSourceFilter for the media services
+        @param zone: playback zone this player serves
+        @param shared: player whose caches and liked songs are reused,
+                       used by additional zones in the same process
+        """
         resources_dir = resources_dir or join(dirname(__file__), "res")
         self.ocp_config = config or Configuration().get("OCP", {})
+        self.source_filter = source_filter or MessageSourceFilter()
+        self.zone = zone
+        self.shared = shared
+        # every player using the resources owned by this one, itself included
+        self.zone_players: WeakSet = WeakSet([self])
+        if shared:
+            shared.zone_players.add(self)
 
         self.state: PlayerState = PlayerState.STOPPED
         self.loop_state: LoopState = LoopState.NONE
         self.media_state: MediaState = MediaState.NO_MEDIA
         self.playlist: Playlist = Playlist()
         self.shuffle: bool = False
-        self.track_history = {}  # Dict of track URI to play count
+        self.track_history = {}  # Dict of original track URI to play count
 
         # Define things referenced in `bind`
         self.now_playing: NowPlaying = None
-        self.playlist: Playlist = Playlist("Search Results",
-                                           skill_id="")  # TODO icon
-        self.media: OCPMediaCatalog = None
+        self.media: 'OCPMediaCatalog' = None
         self.audio_service = None
         self.video_service = None
         self.web_service = None
         self.current: MediaBackend = None
-        self.mpris: MprisPlayerCtl = None
+        self.mpris: 'MprisPlayerCtl' = None
+        self.session_store: PlayerSnapshotStore = None
+        self.failed_uris: FailedURICache = None
+        self.resume_positions: ResumePositionStore = None
+        self.stream_prober: StreamProber = None
+        self.artwork: ArtworkCache = None
+        self.status_publisher: StatusPublisher = None
+        self.reclaimer: IdleReclaimer = None
+        self.library: 'LocalMediaLibrary' = None
 
         self._paused_on_duck = False
+        self._session_restored = False  # restored queue, nothing loaded yet
+        self._pending_seek = 0  # milliseconds to seek once media loads
+        self._media_state_playback = PlaybackType.UNDEFINED  # see _capture_media_state
+        self._resume_track = None  # (uri, length) as requested, recorded for resume
+        self._playback_errors = 0  # consecutive failures, reset on success
+        self.playback_phase = PlaybackPhase.IDLE
+        self._searching = False  # between search.start and search.end
+        # progressive search ingestion
+        self._search_phrase = None
+        self._search_stale = False  # results belong to a previous search
+        self._search_view_shown = False
+        self._search_render_timer: Timer = None
+        self._import_generation = 0  # bumped to abandon a playlist import
+        # bus commands that change player state run in order on this worker
+        self.executor = PlayerCommandExecutor()
         super().__init__(skill_id=skill_id, bus=bus, resources_dir=resources_dir, **kwargs)
 
     def bind(self, bus=None):
@@ -372,11 +404,77 @@ class OCPMediaPlayer(OVOSAbstractApplication):
         @param bus: MessageBusClient object to register events on
         """
         super(OCPMediaPlayer, self).bind(bus)
-        self.now_playing = NowPlaying(bus)
+        # receives every media state update once and fans it out in order
+        self.state_dispatcher = MediaStateDispatcher(self.bus)
+        if self.shared:
+            self.reclaimer = self.shared.reclaimer
+        elif self.ocp_config.get("idle_unload_timeout", 0):
+            # unload backends and stream extractors that were not used for a while
+            self.reclaimer = IdleReclaimer(self.ocp_config["idle_unload_timeout"])
+            # extractors are shared, any zone may be extracting a stream
+            self.reclaimer.register("stream_extractors", release_stream_extractors,
+                                    in_use=lambda: any(p.playback_phase == PlaybackPhase.RESOLVE
+                                                       for p in list(self.zone_players)))
+        if self.shared:
+            self.artwork = self.shared.artwork
+        elif self.ocp_config.get("artwork_cache", True):
+            self.artwork = ArtworkCache(
+                max_size=self.ocp_config.get("artwork_max_size", 512),
+                max_cache_size=self.ocp_config.get("artwork_cache_size", 50) * 1024 * 1024,
+                on_update=self._on_artwork_ready)
+        self.now_playing = NowPlaying(bus, state_dispatcher=self.state_dispatcher,
+                                      artwork=self.artwork, reclaimer=self.reclaimer,
+                                      on_seeked=self._on_seeked)
+        # NOTE: imported here, pulls in the slow ovos_workshop common play skill
+        from ovos_media.catalog import OCPMediaCatalog
         self.media = OCPMediaCatalog(bus=self.bus, skill_id=OCP_ID + ".favorites")
-        self.audio_service = AudioService(self.bus)
-        self.video_service = VideoService(self.bus)
-        self.web_service = WebService(self.bus)
+        # ties between equally confident results go to the most played
+        self.media.search_playlist.play_count = self.track_history.get
+        if self.shared:
+            self.library = self.shared.library
+        elif self.ocp_config.get("library_folders"):
+            # local media files, searched by the catalog
+            from ovos_media.library import LocalMediaLibrary
+            self.library = LocalMediaLibrary(
+                self.ocp_config["library_folders"],
+                workers=self.ocp_config.get("library_scan_workers"),
+                rescan_interval=self.ocp_config.get("library_rescan_interval", 3600))
+        self.media.library = self.library
+        if self.shared:
+            # one copy of the on disk state per process
+            self.media.liked_songs = self.shared.media.liked_songs
+            self.failed_uris = self.shared.failed_uris
+        else:
+            self.failed_uris = FailedURICache(
+                ttl=self.ocp_config.get("failed_uri_ttl", 600),
+                max_ttl=self.ocp_config.get("failed_uri_max_ttl", 86400),
+                max_size=self.ocp_config.get("failed_uri_cache_size", 500))
+        if self.ocp_config.get("resume_positions", True):
+            # podcasts, audiobooks and long videos continue where they stopped
+            self.resume_positions = ResumePositionStore(
+                min_length=self.ocp_config.get("resume_min_length", 600),
+                max_size=self.ocp_config.get("resume_positions_size", 200),
+                position_getter=self._get_resume_position,
+                name="OCP_resume_positions" if self.zone == DEFAULT_ZONE
+                else f"OCP_resume_positions_{self.zone}")
+        if self.ocp_config.get("probe_streams", False):
+            self.stream_prober = StreamProber(
+                top_n=self.ocp_config.get("probe_top_n", 3),
+                timeout=self.ocp_config.get("probe_timeout", 2),
+                resolver=self._resolve_stream if self.ocp_config.get("probe_resolve_sei", False) else None,
+                on_complete=self._on_probe_complete)
+        self.audio_service = AudioService(self.bus, source_filter=self.source_filter,
+                                          state_dispatcher=self.state_dispatcher,
+                                          reclaimer=self.reclaimer)
+        self.video_service = VideoService(self.bus, source_filter=self.source_filter,
+                                          state_dispatcher=self.state_dispatcher,
+                                          reclaimer=self.reclaimer)
+        self.web_service = WebService(self.bus, source_filter=self.source_filter,
+                                      state_dispatcher=self.state_dispatcher,
+                                      reclaimer=self.reclaimer)
+        self.status_publisher = StatusPublisher(
+            self.bus, self.get_status,
+            coalesce_window=self.ocp_config.get("status_coalesce_window", 0.05))
         self.register_bus_handlers()
         # mpris settings
         manage_players = self.ocp_config.get("manage_external_players", False)
@@ -384,52 +482,100 @@ class OCPMediaPlayer(OVOSAbstractApplication):
             LOG.info("MPRIS integration is disabled")
             self.mpris = None
         else:
-            self.mpris = MprisPlayerCtl(self, manage_players=manage_players)
+            # NOTE: dbus_next is only imported if MPRIS is enabled
+            from ovos_media.mpris import MprisPlayerCtl
+            self.mpris = MprisPlayerCtl(self, manage_players=manage_players,
+                                        sync_debounce=self.ocp_config.get("mpris_sync_debounce", 0.25))
 
         self.gui = OCPGUIInterface()
         self.gui.bind(self)
         # TODO - update gui for no-media in now_playing page
 
+        if self.ocp_config.get("persist_session", True):
+            name = "OCP_session" if self.zone == DEFAULT_ZONE else f"OCP_session_{self.zone}"
+            self.session_store = PlayerSnapshotStore(
+                self._take_session_snapshot,
+                debounce=self.ocp_config.get("session_save_interval", 5),
+                name=name)
+            self.restore_session()
+
     def register_bus_handlers(self):
         # ovos common play bus api
-        self.add_event('ovos.common_play.player.state', self.handle_player_state_update)
-        self.add_event('ovos.common_play.media.state', self.handle_player_media_update)
-        self.add_event('ovos.common_play.play', self.handle_play_request)
-        self.add_event('ovos.common_play.pause', self.handle_pause_request)
-        self.add_event('ovos.common_play.play_pause', self.handle_pause_toggle_request)
-        self.add_event('ovos.common_play.resume', self.handle_resume_request)
-        self.add_event('ovos.common_play.stop', self.handle_stop_request)
-        self.add_event('ovos.common_play.next', self.handle_next_request)
-        self.add_event('ovos.common_play.previous', self.handle_prev_request)
-        self.add_event('ovos.common_play.seek', self.handle_seek_request)
+        self.add_event('ovos.common_play.player.state',
+                       self.executor.wrap(self.handle_player_state_update, "player_state"))
+        self.state_dispatcher.subscribe(self._capture_media_state,
+                                        MediaStateDispatcher.CAPTURE)
+        self.state_dispatcher.subscribe(self._queue_media_state,
+                                        MediaStateDispatcher.PLAYER)
+        self.add_event('ovos.common_play.play',
+                       self.executor.wrap(self.handle_play_request, "play"))
+        self.add_event('ovos.common_play.pause',
+                       self.executor.wrap(self.handle_pause_request, "pause"))
+        self.add_event('ovos.common_play.play_pause',
+                       self.executor.wrap(self.handle_pause_toggle_request, "pause_toggle"))
+        self.add_event('ovos.common_play.resume',
+                       self.executor.wrap(self.handle_resume_request, "resume"))
+        self.add_event('ovos.common_play.stop',
+                       self.executor.wrap(self.handle_stop_request, "stop"))
+        self.add_event('ovos.common_play.next',
+                       self.executor.wrap(self.handle_next_request, "next"))
+        self.add_event('ovos.common_play.previous',
+                       self.executor.wrap(self.handle_prev_request, "prev"))
+        self.add_event('ovos.common_play.seek',
+                       self.executor.wrap(self.handle_seek_request, "seek"))
         self.add_event('ovos.common_play.get_track_length', self.handle_track_length_request)
-        self.add_event('ovos.common_play.set_track_position', self.handle_set_track_position_request)
+        self.add_event('ovos.common_play.set_track_position',
+                       self.executor.wrap(self.handle_set_track_position_request, "seek"))
         self.add_event('ovos.common_play.get_track_position', self.handle_track_position_request)
         self.add_event('ovos.common_play.track_info', self.handle_track_info_request)
         self.add_event('ovos.common_play.list_backends', self.handle_list_backends_request)
-        self.add_event('ovos.common_play.playlist.set', self.handle_playlist_set_request)
-        self.add_event('ovos.common_play.playlist.clear', self.handle_playlist_clear_request)
-        self.add_event('ovos.common_play.playlist.queue', self.handle_playlist_queue_request)
-        self.add_event('ovos.common_play.duck', self.handle_duck_request)
-        self.add_event('ovos.common_play.unduck', self.handle_unduck_request)
-        self.add_event('ovos.common_play.cork', self.handle_cork_request)
-        self.add_event('ovos.common_play.uncork', self.handle_uncork_request)
-        self.add_event('ovos.common_play.shuffle.toggle', self.handle_shuffle_toggle_request)
-        self.add_event('ovos.common_play.shuffle.set', self.handle_set_shuffle)
-        self.add_event('ovos.common_play.shuffle.unset', self.handle_unset_shuffle)
-        self.add_event('ovos.common_play.repeat.toggle', self.handle_repeat_toggle_request)
-        self.add_event('ovos.common_play.repeat.set', self.handle_set_repeat)
-        self.add_event('ovos.common_play.repeat.unset', self.handle_unset_repeat)
+        self.add_event('ovos.common_play.playlist.set',
+                       self.executor.wrap(self.handle_playlist_set_request, "playlist"))
+        self.add_event('ovos.common_play.playlist.clear',
+                       self.executor.wrap(self.handle_playlist_clear_request, "playlist"))
+        self.add_event('ovos.common_play.playlist.queue',
+                       self.executor.wrap(self.handle_playlist_queue_request, "playlist"))
+        self.add_event('ovos.common_play.playlist.import',
+                       self.executor.wrap(self.handle_playlist_import_request, "playlist"))
+        self.add_event('ovos.common_play.duck',
+                       self.executor.wrap(self.handle_duck_request, "duck"))
+        self.add_event('ovos.common_play.unduck',
+                       self.executor.wrap(self.handle_unduck_request, "duck"))
+        self.add_event('ovos.common_play.cork',
+                       self.executor.wrap(self.handle_cork_request, "cork"))
+        self.add_event('ovos.common_play.uncork',
+                       self.executor.wrap(self.handle_uncork_request, "cork"))
+        self.add_event('ovos.common_play.shuffle.toggle',
+                       self.executor.wrap(self.handle_shuffle_toggle_request, "shuffle"))
+        self.add_event('ovos.common_play.shuffle.set',
+                       self.executor.wrap(self.handle_set_shuffle, "shuffle"))
+        self.add_event('ovos.common_play.shuffle.unset',
+                       self.executor.wrap(self.handle_unset_shuffle, "shuffle"))
+        self.add_event('ovos.common_play.repeat.toggle',
+                       self.executor.wrap(self.handle_repeat_toggle_request, "repeat"))
+        self.add_event('ovos.common_play.repeat.set',
+                       self.executor.wrap(self.handle_set_repeat, "repeat"))
+        self.add_event('ovos.common_play.repeat.unset',
+                       self.executor.wrap(self.handle_unset_repeat, "repeat"))
         self.add_event('ovos.common_play.SEI.get', self.handle_get_SEIs)
         self.add_event('ovos.common_play.search.start', self.handle_search_start)
+        self.add_event('ovos.common_play.search.end', self.handle_search_end)
+        self.add_event('ovos.common_play.query', self.handle_search_query)
+        self.add_event('ovos.common_play.query.response',
+                       self.executor.wrap(self.handle_search_results, "search_results"))
         self.add_event("ovos.common_play.like", self.handle_like)
         self.add_event("ovos.common_play.unlike", self.handle_unlike)
         self.add_event("ovos.common_play.status", self.handle_status)
+        self.add_event("ovos.common_play.metrics", self.handle_metrics)
+        self.add_event("ovos.common_play.library.rescan", self.handle_library_rescan)
         self.handle_get_SEIs(Message("ovos.common_play.SEI.get"))  # report to ovos-core
-        self.handle_status(Message("ovos.common_play.status"))  # report to ovos-core
+        self.status_publisher.flush()  # report to ovos-core
 
-    def handle_status(self, message):
-        self.bus.emit(message.response({
+    def get_status(self) -> dict:
+        """
+        Return the full player status reported to ovos-core
+        """
+        return {
             "playback_type": self.playback_type,
             "media_type": self.now_playing.media_type,
             "player_state": self.state,
@@ -441,7 +587,24 @@ class OCPMediaPlayer(OVOSAbstractApplication):
             "title": self.now_playing.title,
             "artist": self.now_playing.artist,
             "image": self.now_playing.image
-        }))
+        }
+
+    def handle_status(self, message):
+        self.status_publisher.flush(message)
+
+    def handle_metrics(self, message):
+        metrics = self.executor.metrics
+        metrics["backends"] = {s.namespace: s.backend_metrics()
+                               for s in (self.audio_service, self.video_service, self.web_service)}
+        if self.reclaimer:
+            metrics["idle"] = self.reclaimer.metrics
+        if self.library:
+            metrics["library"] = self.library.metrics
+        self.bus.emit(message.response(metrics))
+
+    def handle_library_rescan(self, message):
+        if self.library:
+            self.library.rescan()
 
     def handle_like(self, message):
         # sent from GUI or intent
@@ -467,8 +630,59 @@ class OCPMediaPlayer(OVOSAbstractApplication):
             LOG.info(f"unliked song: {uri}")
 
     def handle_search_start(self, message):
+        self._searching = True
         self.gui.manage_display(OCPGUIState.SPINNER)
 
+    def handle_search_end(self, message):
+        self._searching = False
+
+    def handle_search_query(self, message):
+        """
+        Handle 'ovos.common_play.query', a new search started and results
+        for it will be ingested as the skills report them
+        """
+        self._searching = True
+        self._search_phrase = message.data.get("phrase")
+        self._search_stale = True
+        self._search_view_shown = False
+
+    def handle_search_results(self, message):
+        """
+        Handle 'ovos.common_play.query.response', merge a batch of results
+        from a single skill into the search results as soon as it arrives
+        """
+        if not self.ocp_config.get("progressive_search", True):
+            return
+        results = message.data.get("results")
+        if not results or message.data.get("phrase") != self._search_phrase:
+            return  # skill still searching or late reply to an old search
+        if self._search_stale:
+            # first results of a new search replace the old ones
+            self._search_stale = False
+            self.media.search_playlist.clear()
+        self.media.search_playlist.merge([r for r in results
+                                          if r not in self.failed_uris])
+        LOG.debug(f"{message.data.get('skill_id')} returned {len(results)} results, "
+                  f"{len(self.media.search_playlist)} total")
+        if self._search_render_timer is None:
+            # coalesce GUI updates when many skills reply at once
+            self._search_render_timer = Timer(
+                self.ocp_config.get("search_render_interval", 0.3),
+                self._render_search_results)
+            self._search_render_timer.daemon = True
+            self._search_render_timer.start()
+
+    def _render_search_results(self):
+        self._search_render_timer = None
+        if not self.gui.presence.connected:
+            return
+        if self._search_view_shown or self.state == PlayerState.PLAYING:
+            # only refresh the model, don't take over the screen
+            self.gui.update_search_results()
+        else:
+            self._search_view_shown = True
+            self.gui.manage_display(OCPGUIState.DISAMBIGUATION)
+
     @property
     def active_skill(self) -> str:
         """
@@ -552,8 +766,12 @@ class OCPMediaPlayer(OVOSAbstractApplication):
             raise TypeError(f"Expected MediaState and got: {state}")
         if state == self.media_state:
             return
-        self.bus.emit(Message("ovos.common_play.media.state",
-                              {"state": self.media_state}))
+        self.media_state = state
+        playback = self.playback_type  # before END_OF_MEDIA resets now_playing
+        message = Message("ovos.common_play.media.state", {"state": state})
+        self.bus.emit(message)
+        # the echo of this message is ignored, the state is already set
+        self._media_state_changed(state, message, playback)
 
     def set_player_state(self, state: PlayerState):
         """
@@ -565,16 +783,11 @@ class OCPMediaPlayer(OVOSAbstractApplication):
             raise TypeError(f"Expected PlayerState and got: {state}")
         if state == self.state:
             return
+        self.state = state
         self.bus.emit(Message("ovos.common_play.player.state",
-                              {"state": self.state}))
-        state2str = {PlayerState.PLAYING: "Playing",
-                     PlayerState.PAUSED: "Paused",
-                     PlayerState.STOPPED: "Stopped"}
-        if self.mpris:
-            self.mpris.update_props({"CanPause": self.state == PlayerState.PLAYING,
-                                     "CanPlay": self.state == PlayerState.PAUSED,
-                                     "PlaybackStatus": state2str[state]})
-        self.handle_status(Message("ovos.common_play.status"))  # report full status to ovos-core
+                              {"state": state}))
+        # the echo of this message is ignored, the state is already set
+        self._player_state_changed(state)
 
     def set_now_playing(self, track: Union[dict, MediaEntry, Playlist]):
         """
@@ -592,6 +805,9 @@ class OCPMediaPlayer(OVOSAbstractApplication):
                 track.playback != PlaybackType.MPRIS:
             self.playlist.clear()
 
+        self._save_resume_position()  # track being replaced
+        self._resume_track = None
+        self._pending_seek = 0  # belonged to the previous track
         self.now_playing.reset()  # reset now_playing to remove old metadata
         if isinstance(track, MediaEntry):
             # single track entry (MediaEntry)
@@ -616,24 +832,154 @@ class OCPMediaPlayer(OVOSAbstractApplication):
             self.mpris.update_props(
                 {"Metadata": self.now_playing.mpris_metadata}
             )
-        self.handle_status(Message("ovos.common_play.status"))  # report full status to ovos-core
+            self.mpris.seeked(self.now_playing.position)  # new track
+        self.notify_state_changed(queue=True)
+
+    def notify_state_changed(self, queue: bool = False):
+        """
+        Report a player state change to ovos-core and schedule a session snapshot
+        @param queue: True if the playlist or search results changed
+        """
+        if self.status_publisher:
+            self.status_publisher.request_update()
+        self.save_session(queue=queue)
+
+    # session persistence
+    def save_session(self, queue: bool = False):
+        """
+        Schedule a debounced snapshot of the player state
+        @param queue: True if the playlist or search results changed
+        """
+        if self.session_store:
+            self.session_store.mark_dirty(queue=queue)
+
+    def get_session_snapshot(self, include_queue: bool = True) -> dict:
+        """
+        Return a serializable snapshot of the player state
+        @param include_queue: include the playlist and search results
+        """
+        now_playing = self.now_playing.as_dict
+        now_playing["original_uri"] = self.now_playing.original_uri
+        now_playing["position"] = self.now_playing.position
+        snapshot = {"now_playing": now_playing,
+                    "shuffle": self.shuffle,
+                    "loop_state": self.loop_state,
+                    "playlist_position": self.playlist.position,
+                    "search_position": self.media.search_playlist.position}
+        if include_queue:
+            snapshot["queue"] = {
+                "playlist": [e if isinstance(e, dict) else e.as_dict
+                             for e in self.playlist],
+                "search_playlist": [e if isinstance(e, dict) else e.as_dict
+                                    for e in self.media.search_playlist]
+            }
+        return snapshot
+
+    def _take_session_snapshot(self, include_queue: bool) -> dict:
+        # called from the snapshot timer, read the playlists on the command
+        # thread so they are not modified while being serialized
+        return self.executor.call("session", self.get_session_snapshot, include_queue,
+                                  timeout=10)
+
+    def restore_session(self):
+        """
+        Restore the queue and now playing track from the last stored snapshot,
+        playback can then be resumed at the last known position
+        """
+        start = time.monotonic()
+        snapshot = self.session_store.load()
+        if not snapshot:
+            return
+        # Playlist is a list subclass, extend directly instead of add_entry per track
+        self.playlist.clear()
+        self.playlist.extend(snapshot["playlist"])
+        if 0 <= snapshot.get("playlist_position", 0) < len(self.playlist):
+            self.playlist.position = snapshot["playlist_position"]
+        self.media.search_playlist.clear()
+        self.media.search_playlist.extend(snapshot["search_playlist"])
+        if 0 <= snapshot.get("search_position", 0) < len(self.media.search_playlist):
+            self.media.search_playlist.position = snapshot["search_position"]
+        self.shuffle = snapshot.get("shuffle", False)
+        self.loop_state = LoopState(snapshot.get("loop_state", LoopState.NONE))
+
+        now_playing = snapshot.get("now_playing") or {}
+        if now_playing.get("uri") and now_playing.get("playback") != PlaybackType.MPRIS:
+            self.now_playing.update(now_playing)
+            self.now_playing.playback = PlaybackType(self.now_playing.playback)
+            self._pending_seek = now_playing.get("position") or 0
+            self._session_restored = True
+
+        elapsed = time.monotonic() - start
+        LOG.info(f"Restored session with {len(self.playlist)} queued tracks in {elapsed:.3f}s")
+        if elapsed > self.ocp_config.get("session_restore_budget", 1.0):
+            LOG.warning(f"Session restore took {elapsed:.3f}s, over budget")
+
+    # resume positions
+    def _get_resume_position(self):
+        """
+        @return: (uri, position, length) of the playing track, sampled by
+                 the resume position store, None if not playing
+        """
+        if self.state != PlayerState.PLAYING:
+            return None
+        return self._resume_entry()
+
+    def _resume_entry(self):
+        if not self._resume_track or \
+                self.now_playing.playback not in [PlaybackType.AUDIO, PlaybackType.VIDEO]:
+            return None  # nothing played or can't seek
+        uri, length = self._resume_track
+        # requested length first, metadata of the next track may already be in now_playing
+        return uri, self.now_playing.position, length or self.now_playing.length
+
+    def _save_resume_position(self):
+        """
+        Record where the current track is, before it is paused, stopped or replaced
+        """
+        if self.resume_positions:
+            entry = self._resume_entry()
+            if entry and entry[1]:
+                self.resume_positions.update(*entry)
+
+    def _apply_pending_seek(self):
+        """
+        Seek to a position requested before the media was loaded (eg. resume)
+        """
+        if self._pending_seek:
+            position, self._pending_seek = self._pending_seek, 0
+            LOG.info(f"Resuming playback at {position}ms")
+            self.seek(position)
 
     # stream handling
     def validate_stream(self) -> bool:
         """
         Validate that self.now_playing is playable and update the GUI if it is
         @return: True if the `now_playing` stream can be handled
+        @raise CommandCancelled: the play request was superseded while extracting
         """
         if self.playback_type not in [PlaybackType.SKILL,
                                       PlaybackType.UNDEFINED,
                                       PlaybackType.MPRIS]:
+            uri = self.now_playing.uri
+            self.now_playing.original_uri = uri
             try:
-                self.now_playing.extract_stream()
+                if not uri:
+                    raise ValueError("No URI to extract stream from")
+                # only the extraction runs on the helper thread, if this play
+                # is superseded its late outcome is dropped, now_playing and
+                # failed_uris already belong to the next track
+                meta = self.executor.run_cancellable(
+                    "resolve", self.now_playing.fetch_stream, uri,
+                    self.playback_type == PlaybackType.VIDEO)
+                self.now_playing.apply_stream(uri, meta)
+            except CommandCancelled:
+                raise
             except Exception as e:
                 LOG.exception(e)
+                self.failed_uris.add(uri, f"extraction failed: {e}")
                 return False
-            # check for is_gui_running is much faster as it doesnt need bus messages back and forth
-            has_gui = is_gui_running() or is_gui_connected(self.bus)
+            # cached presence, no bus round trip per track
+            has_gui = self.gui.presence.connected
             if not has_gui or self.ocp_config.get("force_audioservice", False) or \
                     self.ocp_config.get("playback_mode") == PlaybackMode.FORCE_AUDIO:
                 # No gui, so lets force playback to use audio only
@@ -655,18 +1001,87 @@ class OCPMediaPlayer(OVOSAbstractApplication):
         eg. for the youtube plugin a skill can return
           "youtube//https://youtube.com/watch?v=wChqNkd6F24"
         """
-        xtract = load_stream_extractors()  # @lru_cache, its a lazy loaded singleton
+        xtract = self.now_playing.stream_xtract
         self.bus.emit(message.response({"SEI": xtract.supported_seis}))
 
+    def _is_known_bad(self, entry) -> bool:
+        """
+        @param entry: dict or MediaEntry
+        @return: True if the entry recently failed to play or was probed unreachable
+        """
+        if entry in self.failed_uris:
+            return True
+        return bool(self.stream_prober) and self.stream_prober.is_reachable(entry) is False
+
+    def _goto_fastest_search_result(self):
+        """
+        Among the search results ranked the same as the current one, move to
+        the one whose stream answered the probe fastest
+        """
+        if not self.stream_prober:
+            return
+        results = self.media.search_playlist
+        candidates = [(idx, t) for idx, t in results.ties(results.position)
+                      if t not in self.playlist and not self._is_known_bad(t)]
+        best = self.stream_prober.fastest([t for _, t in candidates])
+        for idx, t in candidates:
+            if t is best:
+                results.set_position(idx)
+                break
+
+    def _resolve_stream(self, uri: str) -> str:
+        """
+        Resolve a SEI into the stream uri for reachability probing
+        """
+        xtract = self.now_playing.stream_xtract
+        meta = xtract.extract_stream(uri, video=False) or {}
+        return meta.get("uri") or uri
+
+    def get_artwork(self, url: str) -> str:
+        """
+        @param url: remote artwork url
+        @return: file:// uri of the cached thumbnail if available, else url
+        """
+        return self.artwork.get(url) if self.artwork else url
+
+    def _on_artwork_ready(self, url: str):
+        if url != self.now_playing.image:
+            return  # other cards pick it up on next render
+        if self.gui.presence.connected:
+            self.gui.update_current_track()
+        if self.mpris:
+            self.mpris.update_props({"Metadata": self.now_playing.mpris_metadata})
+
+    def _on_probe_complete(self):
+        if self.gui.presence.connected:
+            self.gui.update_search_results()
+
     def on_invalid_stream(self):
         """
-        Handle media playback errors. Show an error and play the next track.
+        Handle media playback errors. Show an error and schedule playing the
+        next track, the delay doubles with every consecutive failure and
+        playback stops after `max_playback_errors` failures in a row
         """
         self.bus.emit(Message("mycroft.audio.play_sound", {"uri": "snd/error.mp3"}))
         self.gui.manage_display(OCPGUIState.PLAYBACK_ERROR)
         LOG.warning(f"Failed to play: {self.now_playing}")
-        time.sleep(3)  # let the user process that playback failed before moving on
-        self.play_next()
+        self._playback_errors += 1
+        max_errors = self.ocp_config.get("max_playback_errors", 5)
+        if self._playback_errors >= max_errors:
+            LOG.error(f"{self._playback_errors} consecutive playback errors, giving up")
+            self.bus.emit(Message("ovos.common_play.playback_error",
+                                  {"uri": self.now_playing.original_uri or self.now_playing.uri,
+                                   "errors": self._playback_errors}))
+            self._playback_errors = 0
+            self.stop()
+            return
+        # let the user process that playback failed before moving on,
+        # any new command cancels the skip
+        delay = min(self.ocp_config.get("playback_error_delay", 3) *
+                    2 ** (self._playback_errors - 1),
+                    self.ocp_config.get("playback_error_max_delay", 30))
+        LOG.debug(f"Skipping to next track in {delay} seconds")
+        self.executor.schedule(delay, "recover", self.play_next)
 
     # media controls
     def play_media(self, track: Union[dict, MediaEntry],
@@ -681,6 +1096,7 @@ class OCPMediaPlayer(OVOSAbstractApplication):
         if isinstance(track, dict):
             track = MediaEntry.from_dict(track)
             LOG.debug(f"deserialized: {track}")
+        self._playback_errors = 0  # new user request
 
         if isinstance(track, Playlist):
             playlist = track
@@ -692,9 +1108,13 @@ class OCPMediaPlayer(OVOSAbstractApplication):
             self.mpris.stop()
 
         if disambiguation:
-            self.media.search_playlist.replace([t for t in disambiguation
-                                                if t not in self.media.search_playlist])
-            self.media.search_playlist.sort_by_conf()
+            # hashed merge keeps the results ranked, known dead streams are skipped
+            self.media.search_playlist.merge([t for t in disambiguation
+                                              if t not in self.failed_uris])
+            if self.stream_prober:
+                # check the next best candidates while the requested track loads
+                self.stream_prober.probe([t for t in self.media.search_playlist
+                                          if t != track])
         if playlist:
             self.playlist.replace(playlist)
         if track in self.playlist:
@@ -711,6 +1131,12 @@ class OCPMediaPlayer(OVOSAbstractApplication):
         # stop any external media players
         if self.mpris and not self.mpris.stop_event.is_set():
             self.mpris.stop()
+        self._session_restored = False
+        if self.resume_positions:
+            self._resume_track = (self.now_playing.uri, self.now_playing.length)
+            if not self._pending_seek:
+                # applied once the media is loaded, like a restored session
+                self._pending_seek = self.resume_positions.get(self.now_playing.uri)
 
         # track play count
         if self.now_playing.uri in self.media.liked_songs:
@@ -719,21 +1145,41 @@ class OCPMediaPlayer(OVOSAbstractApplication):
             self.media.liked_songs[self.now_playing.uri]["play_count"] += 1
             self.media.liked_songs.store()
 
+        # every phase can be interrupted by a newer command (eg. stop),
+        # blocking steps are abandoned instead of waited for
+        try:
+            self._play_phases()
+        except CommandCancelled:
+            LOG.info(f"Playback request cancelled during {self.playback_phase.name}: "
+                     f"{self.now_playing.uri}")
+            self.playback_phase = PlaybackPhase.IDLE
+
+    def _set_phase(self, phase: PlaybackPhase):
+        if self.executor.cancelled:
+            raise CommandCancelled(phase.name)
+        LOG.debug(f"playback phase: {phase.name}")
+        self.playback_phase = phase
+
+    def _play_phases(self):
         # validate new stream
+        self._set_phase(PlaybackPhase.RESOLVE)
         if not self.validate_stream():
             LOG.warning("Stream Validation Failed")
+            self.playback_phase = PlaybackPhase.IDLE
             self.on_invalid_stream()
             return
 
+        self._set_phase(PlaybackPhase.LOAD)
         self.gui.manage_display(OCPGUIState.PLAYER)
 
-        self.track_history.setdefault(self.now_playing.uri, 0)
-        self.track_history[self.now_playing.uri] += 1
+        # keyed by the uri search results carry, not the extracted stream
+        played = self.now_playing.original_uri or self.now_playing.uri
+        self.track_history[played] = self.track_history.get(played, 0) + 1
 
         if self.playback_type == PlaybackType.AUDIO:
             LOG.debug("Requesting playback: PlaybackType.AUDIO")
             # TODO - get preferred service and pass to self.play
-            self.audio_service.play(self.now_playing.uri)
+            self._load(self.audio_service)
 
         elif self.playback_type == PlaybackType.SKILL:
             # skill wants to handle playback
@@ -742,26 +1188,39 @@ class OCPMediaPlayer(OVOSAbstractApplication):
                                   self.now_playing.infocard))
             self.bus.emit(Message("ovos.common_play.track.state",
                                   {"state": TrackState.PLAYING_SKILL}))
+            self._playback_errors = 0
 
         elif self.playback_type == PlaybackType.VIDEO:
             LOG.debug("Requesting playback: PlaybackType.VIDEO")
             # TODO - get preferred service and pass to self.play
-            self.video_service.play(self.now_playing.uri)
+            self._load(self.video_service)
 
         elif self.playback_type == PlaybackType.WEBVIEW:
             LOG.debug("Requesting playback: PlaybackType.WEBVIEW")
             # TODO - get preferred service and pass to self.play
-            self.web_service.play(self.now_playing.uri)
+            self._load(self.web_service)
 
         else:
             raise ValueError("invalid playback request")
 
+        self._set_phase(PlaybackPhase.START)
         if self.mpris:
             self.mpris.update_props({"CanGoNext": self.can_next})
             self.mpris.update_props({"CanGoPrevious": self.can_prev})
 
         self.set_player_state(PlayerState.PLAYING)
         self.gui.update_buttons()  # pause/play icon
+        self.playback_phase = PlaybackPhase.PLAYING
+
+    def _load(self, service: BaseMediaService):
+        """
+        Hand the `now_playing` stream to a media service, if stop arrives
+        while the backend is still loading the late load is stopped again
+        """
+        # the backend reports LOADED_MEDIA again, a pending seek is applied then
+        self.set_media_state(MediaState.LOADING_MEDIA)
+        self.executor.run_cancellable("load", service.play, self.now_playing.uri,
+                                      on_abandoned=lambda _: service.stop())
 
     def play_shuffle(self):
         """
@@ -769,12 +1228,19 @@ class OCPMediaPlayer(OVOSAbstractApplication):
         'now_playing` (does NOT call 'play').
         """
         LOG.debug("Shuffle == True")
-        if len(self.playlist) > 1 and not self.playlist.is_last_track:
+        # skip tracks that recently failed to play
+        candidates = [idx for idx, t in enumerate(self.playlist)
+                      if not self._is_known_bad(t)]
+        if len(self.playlist) > 1 and not self.playlist.is_last_track and candidates:
             # TODO: does the 'last track' matter in this case?
-            self.playlist.set_position(random.randint(0, len(self.playlist)))
+            self.playlist.set_position(random.choice(candidates))
             self.set_now_playing(self.playlist.current_track)
         else:
             self.media.search_playlist.next_track()
+            while self._is_known_bad(self.media.search_playlist.current_track) and \
+                    not self.media.search_playlist.is_last_track:
+                self.media.search_playlist.next_track()
+            self._goto_fastest_search_result()
             self.set_now_playing(self.media.search_playlist.current_track)
 
     def play_next(self):
@@ -799,13 +1265,21 @@ class OCPMediaPlayer(OVOSAbstractApplication):
             self.play_shuffle()
         elif not self.playlist.is_last_track:
             self.playlist.next_track()
+            while self._is_known_bad(self.playlist.current_track) and \
+                    not self.playlist.is_last_track:
+                LOG.debug(f"Skipping known bad track: {self.playlist.current_track}")
+                self.playlist.next_track()
             self.set_now_playing(self.playlist.current_track)
             LOG.info(f"Next track index: {self.playlist.position}")
         elif not self.media.search_playlist.is_last_track and \
                 self.ocp_config.get("merge_search", True):
-            while self.media.search_playlist.current_track in self.playlist:
+            while (self.media.search_playlist.current_track in self.playlist or
+                   self._is_known_bad(self.media.search_playlist.current_track)) and \
+                    not self.media.search_playlist.is_last_track:
                 # Don't play media already played from the playlist
+                # or that is known to be unplayable
                 self.media.search_playlist.next_track()
+            self._goto_fastest_search_result()
             self.set_now_playing(self.media.search_playlist.current_track)
             LOG.info(f"Next search index: "
                      f"{self.media.search_playlist.position}")
@@ -849,6 +1323,7 @@ class OCPMediaPlayer(OVOSAbstractApplication):
         Ask the current playback to pause.
         """
         LOG.debug(f"Pausing playback: {self.playback_type}")
+        self._save_resume_position()
         if self.playback_type in [PlaybackType.AUDIO,
                                   PlaybackType.UNDEFINED]:
             self.audio_service.pause()
@@ -868,6 +1343,11 @@ class OCPMediaPlayer(OVOSAbstractApplication):
         """
         Ask any paused or stopped playback to resume.
         """
+        if self._session_restored:
+            # nothing loaded in the backends yet, start at the last known position
+            LOG.debug("Resuming restored session")
+            self.play()
+            return
         LOG.debug(f"Resuming playback: {self.playback_type}")
         if self.playback_type in [PlaybackType.AUDIO,
                                   PlaybackType.UNDEFINED]:
@@ -893,27 +1373,47 @@ class OCPMediaPlayer(OVOSAbstractApplication):
         """
         if self.playback_type in [PlaybackType.AUDIO,
                                   PlaybackType.UNDEFINED]:
-            self.audio_service.set_track_position(position / 1000)
+            self.audio_service.set_track_position(position)
+        elif self.playback_type == PlaybackType.VIDEO:
+            self.video_service.set_track_position(position)
+        self.now_playing.position = position
+        self._on_seeked(position)
+
+    def _on_seeked(self, position: int):
+        """
+        Playback position jumped, let MPRIS clients resync their position
+        @param position: new position in milliseconds
+        """
+        if self.mpris:
+            self.mpris.seeked(position)
 
     def stop(self):
         """
         Request stopping current playback and searching
         """
-        # stop any search still happening
-        self.bus.emit(Message("ovos.common_play.search.stop"))
-
-        LOG.debug("Stopping playback")
-        if self.playback_type in [PlaybackType.AUDIO,
-                                  PlaybackType.UNDEFINED]:
+        if self._searching:
+            # stop any search still happening
+            self._searching = False
+            self.bus.emit(Message("ovos.common_play.search.stop"))
+
+        LOG.debug(f"Stopping playback ({self.playback_phase.name})")
+        if self.playback_phase == PlaybackPhase.PLAYING:
+            self._save_resume_position()
+        self.playback_phase = PlaybackPhase.IDLE
+        # only the paths that may be playing, an unknown playback type
+        # checks which media service has an active backend
+        undefined = self.playback_type == PlaybackType.UNDEFINED
+        if self.playback_type == PlaybackType.AUDIO or \
+                (undefined and self.audio_service.current):
             self.audio_service.stop()
-        if self.playback_type in [PlaybackType.SKILL,
-                                  PlaybackType.UNDEFINED]:
+        if self.playback_type == PlaybackType.SKILL or \
+                (undefined and self.active_skill not in (None, OCP_ID)):
             self.stop_skill()
-        if self.playback_type in [PlaybackType.VIDEO,
-                                  PlaybackType.UNDEFINED]:
+        if self.playback_type == PlaybackType.VIDEO or \
+                (undefined and self.video_service.current):
             self.video_service.stop()
-        if self.playback_type in [PlaybackType.WEBVIEW,
-                                  PlaybackType.UNDEFINED]:
+        if self.playback_type == PlaybackType.WEBVIEW or \
+                (undefined and self.web_service.current):
             self.web_service.stop()
         if self.mpris and self.playback_type in [PlaybackType.MPRIS]:
             self.mpris.pause()
@@ -938,6 +1438,7 @@ class OCPMediaPlayer(OVOSAbstractApplication):
         """
         Reset this instance to clear any media or settings
         """
+        self._import_generation += 1  # abandon any playlist still importing
         self.now_playing.reset()
         self.playlist.clear()
         self.media.clear()
@@ -946,15 +1447,41 @@ class OCPMediaPlayer(OVOSAbstractApplication):
         self.shuffle = False
         self.loop_state = LoopState.NONE
         self.state: PlayerState = PlayerState.STOPPED
+        self._session_restored = False
+        self._pending_seek = 0
+        self.notify_state_changed(queue=True)
 
     def shutdown(self):
         """
         Shutdown this instance and its spawned objects. Remove events.
         """
+        if self.shared:
+            self.shared.zone_players.discard(self)
+        if self.session_store:
+            self.session_store.close()
+        if self.resume_positions:
+            self._save_resume_position()
+            self.resume_positions.close()
+        self.executor.shutdown()
+        self.status_publisher.shutdown()
+        if self.stream_prober:
+            self.stream_prober.shutdown()
+        if self.artwork and not self.shared:
+            self.artwork.shutdown()
+        if self._search_render_timer:
+            self._search_render_timer.cancel()
+        if self.reclaimer and not self.shared:
+            self.reclaimer.shutdown()
+        if self.library and not self.shared:
+            self.library.shutdown()
         self.stop()
+        for service in (self.audio_service, self.video_service, self.web_service):
+            service.shutdown()
         if self.mpris:
             self.mpris.shutdown()
+        self.gui.presence.shutdown()
         self.now_playing.shutdown()
+        self.state_dispatcher.shutdown()
         self.media.shutdown()
 
     # player -> common play
@@ -974,13 +1501,14 @@ class OCPMediaPlayer(OVOSAbstractApplication):
         if state == self.state:
             return
         LOG.info(f"PlayerState changed: {repr(self.state)} -> {repr(state)}")
-        if state == PlayerState.PLAYING:
-            self.state = PlayerState.PLAYING
-        elif state == PlayerState.PAUSED:
-            self.state = PlayerState.PAUSED
-        elif state == PlayerState.STOPPED:
-            self.state = PlayerState.STOPPED
+        self.state = state
+        self._player_state_changed(state)
 
+    def _player_state_changed(self, state: PlayerState):
+        """
+        React to a new PlayerState, set by the player or reported on the bus
+        @param state: the new self.state
+        """
         if self.mpris:
             state2str = {PlayerState.PLAYING: "Playing",
                          PlayerState.PAUSED: "Paused",
@@ -989,11 +1517,23 @@ class OCPMediaPlayer(OVOSAbstractApplication):
                                      "CanPlay": state == PlayerState.PAUSED,
                                      "PlaybackStatus": state2str[state]})
         self.gui.update_buttons()  # update icons
+        self.notify_state_changed()
+
+    def _capture_media_state(self, message):
+        # runs before NowPlaying resets on END_OF_MEDIA, remember what was
+        # playing for the player handler queued after it
+        self._media_state_playback = self.playback_type
+
+    def _queue_media_state(self, message):
+        self.executor.submit("media_state", self.handle_player_media_update,
+                             message, self._media_state_playback)
 
-    def handle_player_media_update(self, message):
+    def handle_player_media_update(self, message, playback: PlaybackType = None):
         """
         Handles 'ovos.common_play.media.state' messages with media state updates
         @param message: Message providing new "state" data
+        @param playback: PlaybackType when the message was received, now_playing
+                         is reset on END_OF_MEDIA before this runs
         """
         state = message.data.get("state")
         if state is None:
@@ -1007,24 +1547,53 @@ class OCPMediaPlayer(OVOSAbstractApplication):
             return
         LOG.info(f"MediaState changed: {repr(self.media_state)} -> {repr(state)}")
         self.media_state = state
-        if state == MediaState.END_OF_MEDIA:
-            self.handle_playback_ended(message)
+        self._media_state_changed(state, message, playback)
+
+    def _media_state_changed(self, state: MediaState, message,
+                             playback: PlaybackType = None):
+        """
+        React to a new MediaState, set by the player or reported on the bus
+        @param state: the new self.media_state
+        @param message: Message announcing the state
+        @param playback: PlaybackType when the state changed
+        """
+        if state in [MediaState.LOADED_MEDIA, MediaState.BUFFERING_MEDIA,
+                     MediaState.BUFFERED_MEDIA]:
+            self._playback_errors = 0
+            self.failed_uris.remove(self.now_playing.original_uri)
+            self._apply_pending_seek()
+        elif state == MediaState.END_OF_MEDIA:
+            self.handle_playback_ended(message, playback)
         elif state == MediaState.INVALID_MEDIA:
-            self.handle_invalid_media(message)
+            self.failed_uris.add(self.now_playing.original_uri or self.now_playing.uri,
+                                 "invalid media")
             if self.ocp_config.get("autoplay", True):
-                self.play_next()
+                self.on_invalid_stream()
+            else:
+                self.handle_invalid_media(message)
         self.gui.update_buttons()  # update icons
+        self.notify_state_changed()
 
     def handle_invalid_media(self, message):
         self.gui.manage_display(OCPGUIState.PLAYBACK_ERROR)
 
-    def handle_playback_ended(self, message):
+    def handle_playback_ended(self, message, playback: PlaybackType = None):
+        """
+        Play the next track if autoplay is enabled, else show the search results
+        @param message: END_OF_MEDIA Message
+        @param playback: PlaybackType of the track that ended, now_playing
+                         is already reset when this runs
+        """
+        playback = playback or self.playback_type
         if len(self.playlist) and self.ocp_config.get("autoplay", True) and \
-                self.playback_type not in [PlaybackType.MPRIS, PlaybackType.UNDEFINED]:
-            # PlaybackType.UNDEFINED -> no media loaded, eg stop called explicitly
+                self.playback_phase == PlaybackPhase.PLAYING and \
+                playback not in [PlaybackType.MPRIS, PlaybackType.UNDEFINED]:
+            # PlaybackType.UNDEFINED -> no media loaded
             # PlaybackType.MPRIS -> can't load media in MPRIS players
+            # not PLAYING -> stop called explicitly, the backend reports the end
             LOG.debug(f"Playing next track")
-            self.play_next()
+            # a play command like any other, stop cancels it
+            self.executor.submit("play", self.play_next)
             return
 
         LOG.info("Playback ended")
@@ -1034,6 +1603,7 @@ class OCPMediaPlayer(OVOSAbstractApplication):
     # ovos common play bus api requests
     def handle_play_request(self, message):
         LOG.debug("Received OCP playback request")
+        self._import_generation += 1  # replaces any playlist still importing
         repeat = message.data.get("repeat", False)
         if repeat:
             self.loop_state = LoopState.REPEAT
@@ -1076,11 +1646,7 @@ class OCPMediaPlayer(OVOSAbstractApplication):
         # from audio player GUI
         position = message.data.get("seekValue")
         if not position:
-            position = self.now_playing.position or 0
-            if self.playback_type in [PlaybackType.AUDIO,
-                                      PlaybackType.UNDEFINED]:
-                position = self.audio_service.get_track_position() or position
-            position += miliseconds
+            position = self.now_playing.position + miliseconds
         self.seek(position)
 
     def handle_next_request(self, message):
@@ -1094,24 +1660,28 @@ class OCPMediaPlayer(OVOSAbstractApplication):
         # if mpris, wait for its status report instead to avoid flickering
         if not self.mpris:
             self.gui.update_buttons()  # update icon
+        self.notify_state_changed()
 
     def handle_unset_shuffle(self, message):
         self.shuffle = False
         # if mpris, wait for its status report instead to avoid flickering
         if not self.mpris:
             self.gui.update_buttons()  # update icon
+        self.notify_state_changed()
 
     def handle_set_repeat(self, message):
         self.loop_state = LoopState.REPEAT
         # if mpris, wait for its status report instead to avoid flickering
         if not self.mpris:
             self.gui.update_buttons()  # update icon
+        self.notify_state_changed()
 
     def handle_unset_repeat(self, message):
         self.loop_state = LoopState.NONE
         # if mpris, wait for its status report instead to avoid flickering
         if not self.mpris:
             self.gui.update_buttons()  # update icon
+        self.notify_state_changed()
 
     # playlist control bus api
     def handle_repeat_toggle_request(self, message):
@@ -1126,6 +1696,7 @@ class OCPMediaPlayer(OVOSAbstractApplication):
             self.mpris.toggle_repeat()
         else:  # if mpris, wait for its status report instead to avoid flickering
             self.gui.update_buttons()  # update icon
+        self.notify_state_changed()
 
     def handle_shuffle_toggle_request(self, message):
         self.shuffle = not self.shuffle
@@ -1134,17 +1705,94 @@ class OCPMediaPlayer(OVOSAbstractApplication):
             self.mpris.toggle_shuffle()
         else:  # if mpris, wait for its status report instead to avoid flickering
             self.gui.update_buttons()  # update icon
+        self.notify_state_changed()
 
     def handle_playlist_set_request(self, message):
+        self._import_generation += 1
         self.playlist.clear()
         self.handle_playlist_queue_request(message)
 
     def handle_playlist_queue_request(self, message):
         for track in message.data["tracks"]:
             self.playlist.add_entry(track)
+        self.notify_state_changed(queue=True)
+
+    def handle_playlist_import_request(self, message):
+        uri = message.data.get("uri")
+        if not uri:
+            LOG.error(f"playlist import request without uri: {message.data}")
+            return
+        # track defaults for entries that do not specify them
+        defaults = {k: message.data[k] for k in ("playback", "media_type", "skill_id",
+                                                 "skill_icon", "image")
+                    if k in message.data}
+        self.import_playlist(uri, play=message.data.get("play", True),
+                             replace=message.data.get("replace", True), defaults=defaults)
+
+    def import_playlist(self, uri: str, play: bool = True, replace: bool = True,
+                        defaults: dict = None, batch_size: int = 500):
+        """
+        Parse a m3u/pls/xspf playlist in the background and queue its entries
+        as they are parsed, playback starts with the first entry
+        @param uri: local path or url of the playlist file
+        @param play: start playing the first entry
+        @param replace: replace the current playlist instead of appending
+        @param defaults: track data for entries that do not define it
+        @param batch_size: entries queued per player command
+        """
+        self._import_generation += 1
+        Thread(target=self._import_playlist, daemon=True, name="OCPPlaylistImport",
+               args=(uri, self._import_generation, play, replace, defaults or {},
+                     batch_size)).start()
+
+    def _import_playlist(self, uri: str, generation: int, play: bool, replace: bool,
+                         defaults: dict, batch_size: int):
+        # NOTE: runs in its own thread, the playlist is only touched from
+        # player commands, in order with any other request
+        from ovos_media.playlist_parser import iter_playlist
+
+        defaults = dict({"playback": PlaybackType.AUDIO, "media_type": MediaType.MUSIC},
+                        **defaults)
+        start = time.monotonic()
+        batch, first, count = [], True, 0
+        try:
+            for entry in iter_playlist(uri):
+                batch.append(fast_dict2entry(dict(defaults, **entry)))
+                # the first entry is queued alone so playback starts right away
+                if first or len(batch) >= batch_size:
+                    if generation != self._import_generation:
+                        LOG.info(f"playlist import abandoned: {uri}")
+                        return
+                    self.executor.submit("play" if first and play else "playlist",
+                                         self._queue_imported, generation, batch,
+                                         first and replace, first and play)
+                    count += len(batch)
+                    batch, first = [], False
+        except Exception as e:
+            LOG.error(f"failed to import playlist {uri}: {e}")
+        if batch and generation == self._import_generation:
+            self.executor.submit("playlist", self._queue_imported, generation, batch,
+                                 first and replace, first and play)
+            count += len(batch)
+        LOG.info(f"imported {count} entries in {time.monotonic() - start:.2f}s: {uri}")
+
+    def _queue_imported(self, generation: int, entries: List[MediaEntry],
+                        replace: bool, play: bool):
+        if generation != self._import_generation:
+            return  # a newer request replaced this playlist
+        if replace:
+            self.playlist.clear()
+        if play:
+            self.play_media(entries[0], playlist=self.playlist + entries)
+            return
+        for entry in entries:
+            self.playlist.add_entry(entry)
+        self.notify_state_changed(queue=True)
 
     def handle_playlist_clear_request(self, message):
+        self._import_generation += 1
         self.playlist.clear()
+        self.notify_state_changed(queue=True)
 
     # audio ducking - NB: we distinguish ducking vs corking  (lower volume vs pause)
     def handle_cork_request(self, message):
@@ -1192,16 +1840,15 @@ class OCPMediaPlayer(OVOSAbstractApplication):
     # track data
     def handle_track_length_request(self, message):
         l = self.now_playing.length
-        if self.playback_type == PlaybackType.AUDIO:
-            l = self.audio_service.get_track_length() or l
+        if not l and self.playback_type == PlaybackType.AUDIO:
+            # only ask the backend while the length is unknown
+            l = self.now_playing.length = self.audio_service.get_track_length() or l
         data = {"length": l}
         self.bus.emit(message.response(data))
 
     def handle_track_position_request(self, message):
-        pos = self.now_playing.position
-        if self.playback_type == PlaybackType.AUDIO:
-            pos = self.audio_service.get_track_position() or pos
-        data = {"position": pos}
+        # interpolated locally, no round trip to the backend
+        data = {"position": self.now_playing.position}
         self.bus.emit(message.response(data))
 
     def handle_set_track_position_request(self, message):
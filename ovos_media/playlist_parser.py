@@ -0,0 +1,166 @@
+import io
+import os
+import re
+from typing import BinaryIO, Iterator, Optional
+from urllib.parse import urljoin, urlparse
+from urllib.request import Request, urlopen
+from xml.etree.ElementTree import iterparse
+
+from ovos_utils.log import LOG
+
+PLAYLIST_EXTENSIONS = (".m3u", ".m3u8", ".pls", ".xspf")
+
+_EXTINF = re.compile(r'#EXTINF:\s*(-?[\d.]+)?([^,]*),(.*)')
+_ATTR = re.compile(r'([\w-]+)="([^"]*)"')
+_PLS = re.compile(r'(file|title|length)(\d+)=(.*)', re.IGNORECASE)
+
+
+def is_playlist(uri: str) -> bool:
+    """
+    @return: True if `uri` looks like a m3u, pls or xspf playlist
+    """
+    return urlparse(uri).path.lower().endswith(PLAYLIST_EXTENSIONS)
+
+
+def _open(uri: str, timeout: float) -> BinaryIO:
+    if uri.startswith(("http://", "https://")):
+        return urlopen(Request(uri, headers={"User-Agent": "ovos-media"}), timeout=timeout)
+    path = uri[7:] if uri.startswith("file://") else uri
+    return open(os.path.expanduser(path), "rb")
+
+
+def _resolve(location: str, base: str) -> str:
+    """ relative entries are relative to the playlist location """
+    location = location.strip()
+    scheme = urlparse(location).scheme
+    if location.startswith("file://") or len(scheme) > 1:
+        return location  # absolute uri, single letter schemes are windows drives
+    if base.startswith(("http://", "https://")):
+        return urljoin(base, location)
+    base = base[7:] if base.startswith("file://") else base
+    path = os.path.join(os.path.dirname(os.path.expanduser(base)), location)
+    return f"file://{os.path.normpath(path)}"
+
+
+def _detect(uri: str, f) -> str:
+    ext = os.path.splitext(urlparse(uri).path.lower())[1]
+    if ext in PLAYLIST_EXTENSIONS:
+        return ext.lstrip(".").replace("m3u8", "m3u")
+    head = f.peek(512)[:512].lstrip().lower()
+    if head.startswith(b"[playlist]"):
+        return "pls"
+    if head.startswith(b"<?xml") or head.startswith(b"<playlist"):
+        return "xspf"
+    return "m3u"
+
+
+def iter_playlist(uri: str, timeout: float = 10) -> Iterator[dict]:
+    """
+    Parse a m3u/m3u8, pls or xspf playlist file or url entry by entry
+
+    the playlist is read as a stream, only the current entry is kept in
+    memory, so the first entries are available before a long playlist is
+    fully downloaded or parsed
+    @param uri: local path, file:// or http(s):// url of the playlist
+    @param timeout: seconds to wait for a remote playlist
+    @return: iterator of track dicts ("uri", "title" and if known "artist",
+             "album", "image", "length" in milliseconds)
+    """
+    with _open(uri, timeout) as f:
+        if not hasattr(f, "peek"):
+            f = io.BufferedReader(f)
+        kind = _detect(uri, f)
+        LOG.debug(f"parsing {kind} playlist: {uri}")
+        if kind == "xspf":
+            yield from _iter_xspf(f, uri)
+            return
+        lines = io.TextIOWrapper(f, encoding="utf-8-sig", errors="replace")
+        if kind == "pls":
+            yield from _iter_pls(lines, uri)
+        else:
+            yield from _iter_m3u(lines, uri)
+
+
+def _iter_m3u(lines, base: str) -> Iterator[dict]:
+    info: Optional[dict] = None
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#EXT-X-"):
+            # HLS media playlist, this is a single stream not a list of tracks
+            yield {"uri": base, "title": os.path.basename(urlparse(base).path)}
+            return
+        if line.startswith("#EXTINF"):
+            match = _EXTINF.match(line)
+            if match:
+                duration, attrs, title = match.groups()
+                attrs = dict(_ATTR.findall(attrs))
+                artist, _, name = title.strip().rpartition(" - ")
+                info = {"title": name or title.strip()}
+                if artist:
+                    info["artist"] = artist
+                if duration and float(duration) > 0:
+                    info["length"] = int(float(duration) * 1000)
+                if attrs.get("tvg-logo"):
+                    info["image"] = attrs["tvg-logo"]
+            continue
+        if line.startswith("#"):
+            continue
+        entry = {"uri": _resolve(line, base)}
+        entry.update(info or {"title": os.path.basename(urlparse(line).path) or line})
+        info = None
+        yield entry
+
+
+def _iter_pls(lines, base: str) -> Iterator[dict]:
+    # entries are usually grouped (File1, Title1, Length1, File2...), emit
+    # each one as soon as the next index starts
+    current, entry = None, {}
+    for line in lines:
+        match = _PLS.match(line.strip())
+        if not match:
+            continue
+        key, idx, value = match.groups()
+        if idx != current:
+            if entry.get("uri"):
+                yield entry
+            current, entry = idx, {}
+        key = key.lower()
+        if key == "file":
+            entry["uri"] = _resolve(value, base)
+            entry.setdefault("title", os.path.basename(urlparse(value).path) or value)
+        elif key == "title" and value.strip():
+            entry["title"] = value.strip()
+        elif key == "length" and value.strip().lstrip("-").isdigit() and int(value) > 0:
+            entry["length"] = int(value) * 1000
+    if entry.get("uri"):
+        yield entry
+
+
+def _iter_xspf(f, base: str) -> Iterator[dict]:
+    fields = {"location": "uri", "title": "title", "creator": "artist",
+              "album": "album", "image": "image", "duration": "length"}
+    track_list = None
+    for event, elem in iterparse(f, events=("start", "end")):
+        tag = elem.tag.rsplit("}", 1)[-1]
+        if event == "start":
+            if tag == "trackList":
+                track_list = elem
+            continue
+        if tag != "track":
+            continue
+        entry = {}
+        for child in elem:
+            key = fields.get(child.tag.rsplit("}", 1)[-1])
+            if key and child.text and key not in entry:
+                entry[key] = child.text.strip()
+        if entry.get("uri"):
+            entry["uri"] = _resolve(entry["uri"], base)
+            entry.setdefault("title", os.path.basename(urlparse(entry["uri"]).path))
+            if "length" in entry:
+                entry["length"] = int(entry["length"]) if entry["length"].isdigit() else 0
+            yield entry
+        # drop parsed tracks, memory stays flat for long playlists
+        if track_list is not None:
+            track_list.clear()
@@ -0,0 +1,175 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, Thread
+from typing import Callable, List, Optional
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from ovos_utils.log import LOG
+
+
+class StreamProber:
+    """ Checks in the background if the top search results can be reached
+
+    http(s) streams get a HEAD request, falling back to a small range
+    request for servers that reject HEAD, results are kept per uri with
+    the request latency so the player can prefer known good entries
+    """
+
+    def __init__(self, top_n: int = 3, timeout: float = 2.0, ttl: float = 300,
+                 resolver: Callable[[str], str] = None,
+                 on_complete: Callable[[], None] = None):
+        """
+        @param top_n: how many candidates to probe per batch
+        @param timeout: seconds before a candidate is considered unreachable
+        @param ttl: seconds a probe result is reused
+        @param resolver: callable turning a SEI into a playable uri,
+                         entries that are not http(s) are skipped if not set
+        @param on_complete: called when a batch finished probing
+        """
+        self.top_n = top_n
+        self.timeout = timeout
+        self.ttl = ttl
+        self.resolver = resolver
+        self.on_complete = on_complete
+        self.results = {}  # uri -> {"reachable", "latency", "checked"}
+        self._lock = Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(top_n, 1),
+                                        thread_name_prefix="OCPStreamProber")
+
+    @staticmethod
+    def _uri(entry) -> Optional[str]:
+        if isinstance(entry, str):
+            return entry
+        if isinstance(entry, dict):
+            return entry.get("uri")
+        return getattr(entry, "uri", None)
+
+    def probe(self, entries: List) -> int:
+        """
+        Probe the first `top_n` entries that have no recent result, returns
+        immediately, results are available once `on_complete` is called
+        @param entries: uris, MediaEntry or dicts, sorted by preference
+        @return: number of entries being probed
+        """
+        now = time.monotonic()
+        uris = []
+        for entry in entries:
+            uri = self._uri(entry)
+            if not uri or uri in uris:
+                continue
+            cached = self.results.get(uri)
+            if cached and now - cached["checked"] < self.ttl:
+                continue
+            uris.append(uri)
+            if len(uris) >= self.top_n:
+                break
+        if uris:
+            Thread(target=self._probe_batch, args=(uris,), daemon=True).start()
+        return len(uris)
+
+    def _probe_batch(self, uris: List[str]):
+        futures = [self._pool.submit(self._probe_uri, uri) for uri in uris]
+        for f in futures:
+            try:
+                f.result()
+            except Exception as e:
+                LOG.debug(f"stream probe failed: {e}")
+        if self.on_complete:
+            try:
+                self.on_complete()
+            except Exception as e:
+                LOG.error(f"stream probe callback failed: {e}")
+
+    def _probe_uri(self, uri: str):
+        start = time.monotonic()
+        stream = uri
+        if not stream.startswith("http"):
+            if not self.resolver:
+                return
+            try:
+                stream = self.resolver(uri)
+            except Exception as e:
+                LOG.debug(f"failed to resolve {uri}: {e}")
+                stream = None
+            if stream and not stream.startswith("http"):
+                return  # local file, nothing to probe
+        reachable = bool(stream) and self._is_reachable(stream)
+        latency = time.monotonic() - start
+        with self._lock:
+            self.results[uri] = {"reachable": reachable,
+                                 "latency": latency,
+                                 "checked": time.monotonic()}
+        LOG.debug(f"probed {uri}: reachable={reachable} latency={latency:.3f}s")
+
+    def _is_reachable(self, url: str) -> bool:
+        try:
+            with urlopen(Request(url, method="HEAD"), timeout=self.timeout) as r:
+                return r.status < 400
+        except HTTPError as e:
+            if e.code not in (403, 405, 501):
+                return False
+        except Exception:
+            return False
+        # HEAD not supported, ask for the first bytes only
+        try:
+            req = Request(url, headers={"Range": "bytes=0-1023"})
+            with urlopen(req, timeout=self.timeout) as r:
+                return r.status < 400
+        except Exception:
+            return False
+
+    def is_reachable(self, entry) -> Optional[bool]:
+        """
+        @param entry: uri, dict or MediaEntry
+        @return: probe result, None if it was not probed (recently)
+        """
+        uri = self._uri(entry)
+        data = self.results.get(uri)
+        if not data or time.monotonic() - data["checked"] >= self.ttl:
+            return None
+        return data["reachable"]
+
+    def latency(self, entry) -> Optional[float]:
+        """
+        @param entry: uri, dict or MediaEntry
+        @return: seconds the last probe took, None if not (recently)
+                 probed or unreachable
+        """
+        uri = self._uri(entry)
+        data = self.results.get(uri)
+        if not data or not data["reachable"] or \
+                time.monotonic() - data["checked"] >= self.ttl:
+            return None
+        return data["latency"]
+
+    def fastest(self, entries: List):
+        """
+        @param entries: uris, dicts or MediaEntry, sorted by preference
+        @return: the reachable entry that answered fastest, the first entry
+                 if none of them was probed
+        """
+        best, best_latency = None, None
+        for entry in entries:
+            latency = self.latency(entry)
+            if latency is not None and (best_latency is None or latency < best_latency):
+                best, best_latency = entry, latency
+        if best is None and entries:
+            return entries[0]
+        return best
+
+    def annotate(self, entry, data: dict) -> dict:
+        """
+        Add probe results to GUI/status data for an entry
+        @param entry: uri, dict or MediaEntry
+        @param data: dict to update
+        """
+        uri = self._uri(entry)
+        result = self.results.get(uri)
+        if result:
+            data["reachable"] = result["reachable"]
+            data["latency"] = round(result["latency"], 3)
+        return data
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
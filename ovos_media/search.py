@@ -0,0 +1,175 @@
+import heapq
+from typing import Callable, List, Optional, Union
+
+from ovos_media.persistence import fast_dict2entry
+from ovos_utils.ocp import MediaEntry, Playlist
+
+
+def normalize_uri(uri: str) -> str:
+    """
+    Normalize a uri for duplicate detection
+    @param uri: media uri or SEI
+    """
+    return (uri or "").strip().rstrip("/")
+
+
+class SearchResults(Playlist):
+    """ Search results playlist, deduplicated and ranked
+
+    entries are indexed by normalized uri (playlists by title) so membership
+    tests and lookups are O(1), and kept sorted by `match_confidence`, ties
+    are broken by play count, so the top-k or a page is a slice
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._index = {}
+        self.play_count: Callable[[str], int] = None
+        self._reindex()
+
+    @staticmethod
+    def _key(entry: Union[MediaEntry, Playlist]) -> str:
+        if isinstance(entry, MediaEntry):
+            return normalize_uri(entry.uri)
+        return "playlist:" + entry.title
+
+    def _rank(self, entry: Union[MediaEntry, Playlist]) -> tuple:
+        plays = 0
+        if self.play_count and isinstance(entry, MediaEntry):
+            plays = self.play_count(entry.uri) or 0
+        return -entry.match_confidence, -plays
+
+    def _reindex(self):
+        self._index = {self._key(e): e for e in self
+                       if isinstance(e, (MediaEntry, Playlist))}
+
+    @staticmethod
+    def _as_entry(entry: Union[dict, MediaEntry, Playlist]) -> Union[MediaEntry, Playlist]:
+        if isinstance(entry, dict):
+            return fast_dict2entry(entry)
+        return entry
+
+    def merge(self, entries: List[Union[dict, MediaEntry, Playlist]]):
+        """
+        Add new results, duplicates keep the highest confidence version,
+        the current position keeps pointing at the same entry
+        @param entries: results to merge
+        """
+        current = self[self.position] if 0 <= self.position < len(self) else None
+        new = {}
+        for e in entries:
+            e = self._as_entry(e)
+            if not isinstance(e, (MediaEntry, Playlist)):
+                continue
+            key = self._key(e)
+            old = new.get(key) or self._index.get(key)
+            if old is not None and old.match_confidence >= e.match_confidence:
+                continue
+            new[key] = e
+        if not new:
+            return
+        replaced = {id(self._index[k]) for k in new if k in self._index}
+        kept = [e for e in self if id(e) not in replaced] if replaced else list(self)
+        # play counts change after insertion and extend() does not sort,
+        # restore the order first, O(n) when it still holds
+        kept.sort(key=self._rank)
+        added = sorted(new.values(), key=self._rank)
+        # both lists are sorted, merge in O(n + m)
+        merged = list(heapq.merge(kept, added, key=self._rank))
+        list.clear(self)
+        list.extend(self, merged)
+        self._index.update(new)
+        self.position = 0
+        if current is not None:
+            current = self._index.get(self._key(current), current)
+            self.position = self.index_of(current)
+
+    def index_of(self, entry) -> int:
+        """
+        @return: index of the entry, 0 if not present
+        """
+        entry = self.find(entry)
+        for idx, e in enumerate(self):
+            if e is entry:
+                return idx
+        return 0
+
+    def find(self, entry: Union[str, dict, MediaEntry, Playlist]) -> Optional[Union[MediaEntry, Playlist]]:
+        """
+        @param entry: uri, dict, MediaEntry or Playlist to look up
+        @return: the stored entry or None
+        """
+        if isinstance(entry, str):
+            return self._index.get(normalize_uri(entry))
+        if isinstance(entry, dict):
+            if entry.get("uri"):
+                return self._index.get(normalize_uri(entry["uri"]))
+            return self._index.get("playlist:" + entry.get("title", entry.get("track", "")))
+        if isinstance(entry, (MediaEntry, Playlist)):
+            return self._index.get(self._key(entry))
+        return None
+
+    def ties(self, position: int) -> list:
+        """
+        @param position: index of a result
+        @return: (index, entry) of the results from `position` onwards that
+                 are ranked the same as it
+        """
+        if not 0 <= position < len(self):
+            return []
+        rank = self._rank(self[position])
+        tied = []
+        for idx in range(position, len(self)):
+            if self._rank(self[idx]) != rank:
+                break
+            tied.append((idx, self[idx]))
+        return tied
+
+    def top(self, k: int) -> list:
+        """
+        @return: the k best results
+        """
+        return self[:k]
+
+    def page(self, page: int, size: int = 20) -> list:
+        """
+        @param page: page number, starting at 0
+        @param size: results per page
+        """
+        return self[page * size:(page + 1) * size]
+
+    # keep the index in sync with Playlist operations
+    def sort_by_conf(self):
+        """
+        Sort the results by `match_confidence`, ties broken by play count
+        """
+        self.sort(key=self._rank)
+
+    def add_entry(self, entry: Union[dict, MediaEntry, Playlist], index: int = -1) -> None:
+        entry = self._as_entry(entry)
+        super().add_entry(entry, index)
+        self._index[self._key(entry)] = entry
+
+    def extend(self, entries) -> None:
+        super().extend(self._as_entry(e) for e in entries)
+        self._reindex()
+
+    def replace(self, new_list: List[Union[dict, MediaEntry, Playlist]]) -> None:
+        self.clear()
+        self.merge(new_list)
+
+    def remove_entry(self, entry: Union[int, dict, MediaEntry]) -> None:
+        super().remove_entry(entry)
+        self._reindex()
+
+    def pop(self, *args):
+        e = super().pop(*args)
+        self._reindex()
+        return e
+
+    def clear(self) -> None:
+        super().clear()
+        self._index = {}
+
+    def __contains__(self, item) -> bool:
+        return self.find(item) is not None
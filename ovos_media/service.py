@@ -1,12 +1,18 @@
-from threading import Thread
+from functools import partial
+from threading import Lock, Thread
+from typing import Optional
 
 from ovos_bus_client import Message, MessageBusClient
 from ovos_utils.log import LOG
+from ovos_utils.ocp import PlayerState
 from ovos_utils.process_utils import ProcessStatus, StatusCallbackMap
 
 from ovos_config.config import Configuration
+from ovos_media.idle import IdleReclaimer
 from ovos_media.player import OCPMediaPlayer
 from ovos_media.gui import OCPGUIState
+from ovos_media.utils import MessageSourceFilter, PlaybackPhase
+from ovos_media.zones import DEFAULT_ZONE, ZoneBus, get_message_zone
 
 
 def on_ready():
@@ -47,6 +53,8 @@ class MediaService(Thread):
 
         self.config = Configuration().get("media", {})
         self.native_sources = self.config.get("native_sources", ["debug_cli", "audio"]) or []
+        # shared by all media services, rebuilt on config changes
+        self.source_filter = MessageSourceFilter()
 
         self.validate_source = validate_source
 
@@ -56,8 +64,23 @@ class MediaService(Thread):
         self.bus = bus
         self.status.bind(self.bus)
         self.status.set_alive()
+        self.zones = {}  # zone -> OCPMediaPlayer
+        self._pending_zones = {}  # zone -> play messages received while it is created
+        self._zones_lock = Lock()
+        self.zone_reclaimer: IdleReclaimer = None
         self.init_messagebus()
-        self.ocp = OCPMediaPlayer(self.bus)
+        self.ocp_config = Configuration().get("OCP", {})
+        self.multi_zone = self.ocp_config.get("multi_zone", False)
+        if self.multi_zone:
+            # extra zones are shut down once stopped for this long
+            self.zone_reclaimer = IdleReclaimer(self.ocp_config.get("zone_idle_timeout", 1800))
+            # one player per zone, all sharing this process and bus connection
+            self.ocp = OCPMediaPlayer(ZoneBus(self.bus, DEFAULT_ZONE),
+                                      source_filter=self.source_filter)
+            self.bus.on("ovos.common_play.play", self.handle_zone_play)
+        else:
+            self.ocp = OCPMediaPlayer(self.bus, source_filter=self.source_filter)
+        self.zones = {DEFAULT_ZONE: self.ocp}
         self.ocp.add_event('ovos.common_play.home', self.handle_home)
         self.ocp.add_event("ovos.common_play.ping", self.handle_ping)
         self.ocp.add_event("ovos.common_play.search.start", self.handle_search_start)
@@ -81,6 +104,97 @@ class MediaService(Thread):
         """remove search spinner"""
         self.ocp.gui.remove_search_spinner()
 
+    def handle_zone_play(self, message):
+        """
+        Create the player for a new zone on its first play request, at
+        `max_zones` the least recently used stopped zone is replaced, if all
+        zones are busy the request is played in the default zone
+        @param message: ovos.common_play.play message
+        """
+        zone = get_message_zone(message)
+        evicted = None
+        with self._zones_lock:
+            if zone in self.zones:
+                self.zone_reclaimer.touch(f"zone:{zone}")
+                return  # handled by the zone player
+            if zone in self._pending_zones:
+                self._pending_zones[zone].append(message)
+                return
+            if len(self.zones) + len(self._pending_zones) >= self.ocp_config.get("max_zones", 8):
+                key = self.zone_reclaimer.least_recently_used("zone:")
+                evicted = key and key[len("zone:"):]
+                if not evicted:
+                    LOG.warning(f"max zones reached, playing zone {zone} in the default zone")
+                    self.ocp.executor.submit("play", self.ocp.handle_play_request, message)
+                    return
+                evicted = (evicted, self._pop_zone(evicted))
+            self._pending_zones[zone] = [message]
+        # loading a player and its plugins is slow, keep it off the bus thread
+        Thread(target=self._create_zone, args=(zone, evicted),
+               daemon=True, name=f"OCPZone-{zone}").start()
+
+    def _create_zone(self, zone: str, evicted: tuple = None):
+        """
+        @param zone: zone to create a player for
+        @param evicted: (zone, OCPMediaPlayer) replaced by the new zone
+        """
+        if evicted:
+            self._discard_zone(*evicted)
+        LOG.info(f"creating player for zone: {zone}")
+        try:
+            # zone players are headless, the default zone owns GUI and MPRIS
+            config = dict(self.ocp_config, disable_mpris=True, disable_gui=True)
+            player = OCPMediaPlayer(ZoneBus(self.bus, zone), config=config, zone=zone,
+                                    shared=self.ocp, source_filter=self.source_filter)
+        except Exception as e:
+            LOG.exception(f"failed to create player for zone {zone}: {e}")
+            with self._zones_lock:
+                self._pending_zones.pop(zone, None)
+            return
+        with self._zones_lock:
+            messages = self._pending_zones.pop(zone, [])
+            self.zones[zone] = player
+            self.zone_reclaimer.register(f"zone:{zone}", partial(self.remove_zone, zone),
+                                         in_use=partial(self._zone_in_use, player))
+        # the new player was not listening yet when these messages were emitted
+        for message in messages:
+            player.executor.submit("play", player.handle_play_request, message)
+
+    @staticmethod
+    def _zone_in_use(player: OCPMediaPlayer) -> bool:
+        return player.state != PlayerState.STOPPED or \
+            player.playback_phase != PlaybackPhase.IDLE
+
+    def _pop_zone(self, zone: str) -> Optional[OCPMediaPlayer]:
+        # called with self._zones_lock held
+        self.zone_reclaimer.unregister(f"zone:{zone}")
+        if zone == DEFAULT_ZONE:
+            return None
+        return self.zones.pop(zone, None)
+
+    def remove_zone(self, zone: str):
+        """
+        Shut down the player of a zone and delete its stored session,
+        the zone is created again on its next play request
+        @param zone: zone to remove, the default zone is never removed
+        """
+        with self._zones_lock:
+            player = self._pop_zone(zone)
+        self._discard_zone(zone, player)
+
+    @staticmethod
+    def _discard_zone(zone: str, player: Optional[OCPMediaPlayer]):
+        if player is None:
+            return
+        LOG.info(f"removing player for zone: {zone}")
+        player.shutdown()
+        # session ids are not reused, the stored state would never be read again
+        if player.session_store:
+            player.session_store.delete()
+        if player.resume_positions:
+            player.resume_positions.delete()
+        player.bus.close()
+
     def run(self):
         self.status.set_ready()
 
@@ -90,8 +204,20 @@ class MediaService(Thread):
         Stop any playing audio and make sure threads are joined correctly.
         """
         # TODO - update gui for no-media in now_playing page
-        self.ocp.reset()
+        if self.multi_zone:
+            self.bus.remove("ovos.common_play.play", self.handle_zone_play)
+            self.zone_reclaimer.shutdown()
+        for player in list(self.zones.values()):
+            if player.session_store:
+                # persist the session before reset wipes it
+                player.session_store.flush()
+                player.session_store.close()
+            player.reset()
         self.status.set_stopping()
+        # the default zone owns the shared caches, shut it down last
+        for zone, player in list(self.zones.items()):
+            if zone != DEFAULT_ZONE:
+                player.shutdown()
         self.ocp.shutdown()
 
     def init_messagebus(self):
@@ -99,3 +225,18 @@ class MediaService(Thread):
         Start speech related handlers.
         """
         Configuration.set_config_update_handlers(self.bus)
+        Configuration.set_config_watcher(self.handle_config_change)
+        self.bus.on("configuration.updated", self.handle_config_change)
+        self.bus.on("configuration.patch", self.handle_config_change)
+
+    def handle_config_change(self, message=None):
+        """
+        Refresh state derived from configuration
+        """
+        self.config = Configuration().get("media", {})
+        self.native_sources = self.config.get("native_sources", ["debug_cli", "audio"]) or []
+        self.source_filter.reload()
+        # load/unload/reload changed media players, playback is not interrupted
+        for player in list(self.zones.values()):
+            for service in (player.audio_service, player.video_service, player.web_service):
+                service.reload_config(self.config)
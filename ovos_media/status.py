@@ -0,0 +1,84 @@
+from threading import Lock, Timer
+from typing import Callable, Optional
+
+from ovos_bus_client.message import Message
+from ovos_utils.log import LOG
+
+
+class StatusPublisher:
+    """ Single source of 'ovos.common_play.status' reports
+
+    - every distinct snapshot gets a monotonically increasing version
+    - unchanged snapshots are not emitted
+    - update requests within a short window are coalesced into one emission
+    - 'ovos.common_play.status.delta' carries only the keys that changed
+    """
+
+    def __init__(self, bus, snapshot_getter: Callable[[], dict],
+                 coalesce_window: float = 0.05):
+        """
+        @param bus: MessageBusClient to emit status messages on
+        @param snapshot_getter: callable returning the full status dict
+        @param coalesce_window: seconds to wait for more changes before emitting
+        """
+        self.bus = bus
+        self.snapshot_getter = snapshot_getter
+        self.coalesce_window = coalesce_window
+        self.version = 0
+        self._last = {}
+        self._lock = Lock()
+        self._timer: Optional[Timer] = None
+
+    def request_update(self):
+        """
+        Schedule a status report, changes until it fires are coalesced
+        """
+        with self._lock:
+            if self._timer is None:
+                self._timer = Timer(self.coalesce_window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self, message: Message = None):
+        """
+        Emit the current status now if it changed since the last report
+        @param message: status request to reply to, replies are always sent
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        try:
+            snapshot = self.snapshot_getter()
+        except Exception as e:
+            LOG.error(f"Failed to build OCP status: {e}")
+            return
+        with self._lock:
+            changes = {k: v for k, v in snapshot.items()
+                       if k not in self._last or self._last[k] != v}
+            base_version = self.version
+            if changes:
+                self.version += 1
+                self._last = snapshot
+            version = self.version
+
+        if changes:
+            self.bus.emit(Message("ovos.common_play.status.delta",
+                                  {"version": version,
+                                   "base_version": base_version,
+                                   "changes": changes}))
+        if changes or message:
+            data = dict(snapshot, version=version)
+            if message:
+                self.bus.emit(message.response(data))
+            else:
+                self.bus.emit(Message("ovos.common_play.status.response", data))
+
+    def shutdown(self):
+        """
+        Cancel any pending report
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
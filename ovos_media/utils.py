@@ -10,8 +10,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import time
+from enum import IntEnum
+from threading import Lock
+from typing import Callable
 
 from ovos_config import Configuration
+from ovos_utils.log import LOG
+from ovos_utils.ocp import MediaState
 
 
 def validate_message_context(message, native_sources=None):
@@ -29,3 +35,196 @@ def validate_message_context(message, native_sources=None):
         return False
     # broadcast for everyone
     return True
+
+
+class MessageSourceFilter:
+    """ Decides if a message is meant for the media services
+
+    native sources are read from config once and only re-read on
+    configuration changes, classification results are memoized per
+    destination so the per message cost is a dict lookup
+    """
+
+    def __init__(self, native_sources: list = None, max_cache: int = 256):
+        """
+        @param native_sources: override the configured native sources
+        @param max_cache: max number of memoized destinations
+        """
+        self._override = native_sources
+        self.max_cache = max_cache
+        self.native_sources = []
+        self._cache = {}
+        self.reload()
+
+    def reload(self):
+        """
+        Re-read native sources from configuration, call on config changes
+        """
+        config = Configuration()
+        # moved to global config level, used to be in "Audio" subsection
+        self.native_sources = self._override or \
+                              config.get("media", {}).get("native_sources") or \
+                              config.get("native_sources") or \
+                              config.get("Audio", {}).get("native_sources") or \
+                              ["debug_cli", "audio"]
+        self._cache = {}
+
+    def validate(self, message) -> bool:
+        """
+        @param message: Message to check
+        @return: True if the message should be handled
+        """
+        destination = message.context.get("destination")
+        if not destination:
+            # broadcast for everyone
+            return True
+        key = destination if isinstance(destination, str) else tuple(destination)
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        # request from device, external requests are not handled
+        is_native = any(s in destination for s in self.native_sources)
+        if len(self._cache) >= self.max_cache:
+            self._cache = {}
+        self._cache[key] = is_native
+        return is_native
+
+
+class MediaStateDispatcher:
+    """ Single bus subscriber for 'ovos.common_play.media.state'
+
+    the state is parsed and validated once per message, then handed to the
+    internal subscribers in priority order (lowest first), a failing
+    subscriber does not prevent the others from running
+    """
+    # default priorities, metadata is cleared before the backends react
+    # and the player decides what to do next only after both,
+    # CAPTURE subscribers read the state before any of them changes it
+    CAPTURE = -10
+    NOW_PLAYING = 0
+    BACKEND = 10
+    PLAYER = 20
+
+    def __init__(self, bus):
+        """
+        @param bus: MessageBusClient to receive media state messages from
+        """
+        self.bus = bus
+        self._subscribers = []
+        self._lock = Lock()
+        self.bus.on("ovos.common_play.media.state", self.handle_media_state)
+
+    def subscribe(self, handler: Callable, priority: int = PLAYER):
+        """
+        @param handler: callable receiving the Message, its "state" is
+                        guaranteed to be a MediaState
+        @param priority: handlers with lower values are called first,
+                         equal priorities run in subscription order
+        """
+        with self._lock:
+            subscribers = self._subscribers + [(priority, handler)]
+            # stable sort keeps subscription order within a priority
+            self._subscribers = sorted(subscribers, key=lambda s: s[0])
+
+    def unsubscribe(self, handler: Callable):
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s[1] != handler]
+
+    def handle_media_state(self, message):
+        """
+        Handle 'ovos.common_play.media.state' Messages
+        @param message: Message with updated MediaState
+        """
+        state = message.data.get("state")
+        try:
+            state = MediaState(state)
+        except ValueError:
+            LOG.error(f"Ignoring invalid media state update: {message.data}")
+            return
+        message.data["state"] = state
+        for _, handler in self._subscribers:
+            try:
+                handler(message)
+            except Exception as e:
+                LOG.exception(f"Media state subscriber {handler} failed: {e}")
+
+    def shutdown(self):
+        self.bus.remove("ovos.common_play.media.state", self.handle_media_state)
+        with self._lock:
+            self._subscribers = []
+
+
+class PlaybackPhase(IntEnum):
+    """ steps of a play request, stop may interrupt any of them """
+    IDLE = 0
+    RESOLVE = 1  # extracting the stream from the uri/SEI
+    LOAD = 2  # media backend loading the stream
+    START = 3  # updating state and GUI
+    PLAYING = 4
+
+
+class PositionClock:
+    """ Playback position interpolated from sparse authoritative updates
+
+    records (position, monotonic time, rate, running) on every update and
+    extrapolates the current position locally, so queries do not need to
+    round trip to the media backend
+    """
+
+    def __init__(self, position: int = 0, rate: float = 1.0):
+        self._lock = Lock()
+        self._position = position  # milliseconds at self._timestamp
+        self._timestamp = time.monotonic()
+        self.rate = rate
+        self.running = False
+
+    @property
+    def position(self) -> int:
+        """
+        Current position in milliseconds
+        """
+        with self._lock:
+            return self._interpolate(time.monotonic())
+
+    def _interpolate(self, now: float) -> int:
+        if not self.running:
+            return int(self._position)
+        return int(self._position + (now - self._timestamp) * 1000 * self.rate)
+
+    def sync(self, position: int, running: bool = None, rate: float = None) -> int:
+        """
+        Record an authoritative position report
+        @param position: position in milliseconds
+        @param running: True if playback is advancing, None to keep current
+        @param rate: playback rate, None to keep current
+        @return: milliseconds between the report and the interpolated position,
+                 large values mean playback jumped (eg. seek)
+        """
+        with self._lock:
+            now = time.monotonic()
+            drift = (position or 0) - self._interpolate(now)
+            self._position = position or 0
+            self._timestamp = now
+            if running is not None:
+                self.running = running
+            if rate is not None:
+                self.rate = rate
+            return drift
+
+    def set_running(self, running: bool):
+        """
+        Start or freeze the clock at the current interpolated position
+        @param running: True if playback is advancing
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._position = self._interpolate(now)
+            self._timestamp = now
+            self.running = running
+
+    def reset(self):
+        """
+        Stop the clock and go back to the start
+        """
+        self.sync(0, running=False, rate=1.0)
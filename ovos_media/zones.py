@@ -0,0 +1,92 @@
+from typing import Callable
+
+from ovos_bus_client import MessageBusClient
+from ovos_bus_client.message import Message
+
+DEFAULT_ZONE = "default"
+
+
+def get_message_zone(message: Message) -> str:
+    """
+    Return the playback zone a message belongs to, messages emitted by a zone
+    player are tagged with "ocp_zone", other messages use their session id
+    @param message: bus message
+    """
+    context = getattr(message, "context", None) or {}
+    return context.get("ocp_zone") or \
+        (context.get("session") or {}).get("session_id") or \
+        DEFAULT_ZONE
+
+
+class ZoneBus(MessageBusClient):
+    """ View of a shared MessageBusClient scoped to a single playback zone
+
+    handlers only receive messages of their zone and emitted messages are
+    tagged with the zone, so every component of a player (backends, GUI,
+    status...) can be reused per zone without a connection of its own
+    """
+
+    def __init__(self, bus: MessageBusClient, zone: str = DEFAULT_ZONE):
+        # NOTE: MessageBusClient.__init__ is not called, nothing connects here
+        self._bus = bus
+        self.zone = zone
+        self._wrappers = {}  # (event, handler) -> [zone filtered handlers]
+
+    def __getattr__(self, item):
+        if item.startswith("__") or item in ("_bus", "_wrappers", "zone"):
+            raise AttributeError(item)
+        return getattr(self._bus, item)
+
+    def _tag(self, message: Message) -> Message:
+        if isinstance(message, Message):
+            message.context = message.context or {}
+            message.context.setdefault("ocp_zone", self.zone)
+        return message
+
+    def _wrap(self, event: str, handler: Callable) -> Callable:
+        def zone_handler(*args, **kwargs):
+            if args and hasattr(args[0], "context") and \
+                    get_message_zone(args[0]) != self.zone:
+                return
+            return handler(*args, **kwargs)
+
+        self._wrappers.setdefault((event, handler), []).append(zone_handler)
+        return zone_handler
+
+    def emit(self, message: Message):
+        self._bus.emit(self._tag(message))
+
+    def on(self, event_name: str, func: Callable):
+        self._bus.on(event_name, self._wrap(event_name, func))
+
+    def once(self, event_name: str, func: Callable):
+        self._bus.once(event_name, self._wrap(event_name, func))
+
+    def remove(self, event_name: str, func: Callable):
+        wrappers = self._wrappers.get((event_name, func))
+        if not wrappers:
+            return
+        self._bus.remove(event_name, wrappers.pop())
+        if not wrappers:
+            self._wrappers.pop((event_name, func))
+
+    def remove_all_listeners(self, event_name: str):
+        for (event, func) in list(self._wrappers):
+            if event == event_name:
+                while (event, func) in self._wrappers:
+                    self.remove(event, func)
+
+    def wait_for_message(self, message_type: str, timeout: float = 3.0):
+        return self._bus.wait_for_message(message_type, timeout)
+
+    def wait_for_response(self, message: Message, reply_type: str = None,
+                          timeout: float = 3.0):
+        return self._bus.wait_for_response(self._tag(message), reply_type, timeout)
+
+    def close(self):
+        """
+        Remove the zone handlers, the shared connection stays open
+        """
+        for (event, func) in list(self._wrappers):
+            while (event, func) in self._wrappers:
+                self.remove(event, func)
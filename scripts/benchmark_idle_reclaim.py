@@ -0,0 +1,77 @@
+"""
+Measure the memory released by unloading idle media backends and stream
+extractors, using the "media" section of mycroft.conf
+
+usage: python scripts/benchmark_idle_reclaim.py
+"""
+import gc
+import multiprocessing
+import os
+import time
+
+from ovos_utils.messagebus import FakeBus
+
+from ovos_media.idle import IdleReclaimer
+from ovos_media.media_backends import AudioService, VideoService, WebService
+from ovos_media.media_backends.base import UnloadedBackend
+from ovos_media.player import release_stream_extractors
+from ovos_plugin_manager.ocp import load_stream_extractors
+
+
+def rss_mb(pid="self") -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def total_rss_mb() -> float:
+    """ this process plus backend host subprocesses """
+    total = rss_mb()
+    for child in multiprocessing.active_children():
+        try:
+            total += rss_mb(child.pid)
+        except OSError:
+            pass
+    return total
+
+
+def report(label: str, start: float):
+    gc.collect()
+    time.sleep(0.5)  # let killed hosts exit
+    print(f"{label:<28} {total_rss_mb():8.1f} MB  (process {rss_mb():.1f} MB, "
+          f"{time.monotonic() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    bus = FakeBus()
+    report("baseline", time.monotonic())
+
+    t = time.monotonic()
+    reclaimer = IdleReclaimer(timeout=3600)
+    reclaimer.register("stream_extractors", release_stream_extractors)
+    services = [cls(bus, reclaimer=reclaimer) for cls in (AudioService, VideoService, WebService)]
+    xtract = load_stream_extractors()
+    print(f"loaded backends: {[s.name for svc in services for s in svc.services]}")
+    print(f"loaded extractors: {list(xtract.extractors)}")
+    del xtract
+    report("backends + extractors", t)
+
+    t = time.monotonic()
+    released = reclaimer.reclaim(timeout=0)
+    print(f"released: {released}")
+    report("after idle release", t)
+
+    t = time.monotonic()
+    for svc in services:
+        for s in list(svc.services):
+            if isinstance(s, UnloadedBackend):
+                svc._reload_service(s)
+    load_stream_extractors()
+    report("after reload", t)
+
+    for svc in services:
+        svc.shutdown()
+    reclaimer.shutdown()
+    os._exit(0)  # don't wait on plugin threads
@@ -0,0 +1,38 @@
+"""
+Measure the per message cost of deciding if a bus message is meant for the
+media services, reading native_sources from config on every message versus
+the shared MessageSourceFilter
+
+usage: python scripts/benchmark_source_filter.py [iterations]
+"""
+import sys
+import timeit
+
+from ovos_bus_client.message import Message
+
+from ovos_media.utils import MessageSourceFilter, validate_message_context
+
+MESSAGES = {
+    "broadcast": Message("ovos.common_play.play"),
+    "native": Message("ovos.common_play.play", context={"destination": ["audio"]}),
+    "external": Message("ovos.common_play.play", context={"destination": ["hivemind"]}),
+    "multiple": Message("ovos.common_play.play",
+                        context={"destination": ["skills", "debug_cli"]}),
+}
+
+
+def report(label: str, func, number: int):
+    runs = timeit.repeat(func, number=number, repeat=5)
+    print(f"{label:<32} {min(runs) / number * 1e6:10.3f} us/message")
+
+
+if __name__ == "__main__":
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    source_filter = MessageSourceFilter()
+    print(f"native sources: {source_filter.native_sources}")
+    for name, message in MESSAGES.items():
+        assert validate_message_context(message) == source_filter.validate(message)
+        report(f"{name} config lookup", lambda: validate_message_context(message),
+               max(number // 100, 10))
+        report(f"{name} MessageSourceFilter", lambda: source_filter.validate(message),
+               number)
@@ -0,0 +1,50 @@
+"""
+Fail if importing the ovos-media entry point got slower than the budget
+or pulls in modules that should only be imported on demand
+
+usage: python scripts/check_import_time.py [budget_ms] [runs]
+"""
+import subprocess
+import sys
+
+MODULE = "ovos_media.__main__"
+BUDGET_MS = 1500
+# heavy modules imported lazily, only when the feature is used
+LAZY = ["dbus_next", "ovos_workshop.skills.common_play", "ovos_classifiers", "PIL"]
+
+
+def import_times(module: str) -> dict:
+    """ cumulative import time in microseconds per module, via -X importtime """
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         capture_output=True, text=True, check=True).stderr
+    times = {}
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+budget = float(sys.argv[1]) if len(sys.argv) > 1 else BUDGET_MS
+runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+# best of N runs, the first one also pays for cold .pyc/disk caches
+results = [import_times(MODULE) for _ in range(runs)]
+best = min(results, key=lambda t: t[MODULE])
+total = best[MODULE] / 1000
+
+print(f"{MODULE} imported in {total:.0f}ms (budget {budget:.0f}ms)")
+for name, us in sorted(best.items(), key=lambda i: -i[1])[1:11]:
+    print(f"  {us / 1000:8.1f}ms  {name}")
+
+failed = False
+eager = [m for m in LAZY if m in best]
+if eager:
+    print(f"FAIL: imported at startup, should be lazy: {eager}")
+    failed = True
+if total > budget:
+    print(f"FAIL: import time over budget by {total - budget:.0f}ms")
+    failed = True
+sys.exit(1 if failed else 0)
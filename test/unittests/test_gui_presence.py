@@ -0,0 +1,50 @@
+import unittest
+
+from ovos_bus_client.message import Message
+from ovos_utils.messagebus import FakeBus
+
+from ovos_media.gui import GUIPresenceTracker
+
+
+class TestGUIPresenceTracker(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = FakeBus()
+        self.tracker = GUIPresenceTracker(self.bus, refresh_interval=3600)
+        self.tracker._set_connected(False)
+        self.changes = []
+        self.tracker.on_change(self.changes.append)
+
+    def tearDown(self):
+        self.tracker.shutdown()
+
+    def test_connect_disconnect_reconnect(self):
+        self.bus.emit(Message("mycroft.gui.connected"))
+        self.assertTrue(self.tracker.connected)
+        self.bus.emit(Message("mycroft.gui.disconnected"))
+        self.assertFalse(self.tracker.connected)
+        self.bus.emit(Message("mycroft.gui.available"))
+        self.assertTrue(self.tracker.connected)
+        self.assertEqual(self.changes, [True, False, True])
+
+    def test_unavailable_and_status_response(self):
+        self.bus.emit(Message("gui.status.request.response", {"connected": True}))
+        self.assertTrue(self.tracker.connected)
+        self.bus.emit(Message("mycroft.gui.unavailable"))
+        self.assertFalse(self.tracker.connected)
+        self.bus.emit(Message("gui.status.request.response", {"connected": False}))
+        self.assertEqual(self.changes, [True, False])
+
+    def test_repeated_events_notify_once(self):
+        for _ in range(3):
+            self.bus.emit(Message("mycroft.gui.connected"))
+        self.assertEqual(self.changes, [True])
+
+    def test_disabled_ignores_events(self):
+        tracker = GUIPresenceTracker(self.bus, enabled=False)
+        self.bus.emit(Message("mycroft.gui.connected"))
+        self.assertFalse(tracker.connected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from threading import Timer
+
+from ovos_bus_client.message import Message
+from ovos_plugin_manager.templates.media import AudioPlayerBackend
+from ovos_utils.messagebus import FakeBus
+
+from ovos_media.media_backends.isolated import IsolatedMediaBackend
+
+
+class WaitingBackend(AudioPlayerBackend):
+    """ uses the blocking bus client API from inside plugin methods """
+
+    def __init__(self, config=None, bus=None):
+        super().__init__(config or {}, bus)
+        self.replies = []
+
+    def supported_uris(self):
+        return ["file"]
+
+    def load_track(self, uri):
+        reply = self.bus.wait_for_response(Message("test.ping", {"uri": uri}),
+                                           "test.pong", timeout=2)
+        self.replies.append(reply.data["uri"] if reply else None)
+
+    def track_info(self):
+        return {"replies": self.replies}
+
+    def seek_forward(self, seconds=1):
+        message = self.bus.wait_for_message("test.tick", timeout=seconds)
+        self.replies.append(message.data["tick"] if message else None)
+
+    def play(self):
+        pass
+
+    def stop(self):
+        return True
+
+    def pause(self):
+        pass
+
+    def resume(self):
+        pass
+
+    def lower_volume(self):
+        pass
+
+    def restore_volume(self):
+        pass
+
+    def get_track_length(self):
+        return 0
+
+    def get_track_position(self):
+        return 0
+
+    def set_track_position(self, milliseconds):
+        pass
+
+
+def _loader():
+    # runs in the backend host process
+    return {"waiting": WaitingBackend}
+
+
+class TestIsolatedHostBus(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.bus = FakeBus()
+        cls.bus.on("test.ping", lambda m: cls.bus.emit(m.reply("test.pong", m.data)))
+        cls.backend = IsolatedMediaBackend({}, cls.bus, _loader, "waiting", timeout=5)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.backend.shutdown()
+
+    def test_wait_for_response_and_message(self):
+        self.backend.load_track("file:///tmp/a.mp3")
+        self.assertEqual(self.backend.track_info()["replies"], ["file:///tmp/a.mp3"])
+        # emitted while the plugin is waiting inside seek_forward
+        tick = Timer(0.5, self.bus.emit, (Message("test.tick", {"tick": 1}),))
+        tick.start()
+        self.backend.seek_forward(3)
+        tick.join()
+        self.assertEqual(self.backend.track_info()["replies"][-1], 1)
+        # nothing answers, the plugin gets None instead of hanging the host
+        self.backend.seek_forward(0.5)
+        self.assertEqual(self.backend.track_info()["replies"][-1], None)
+        self.assertEqual(self.backend.metrics["timeouts"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import time
+import unittest
+from threading import Event
+from unittest.mock import patch
+
+# keep the player state stores out of the user's XDG dirs
+_XDG = tempfile.mkdtemp()
+for _var in ("XDG_STATE_HOME", "XDG_CACHE_HOME", "XDG_DATA_HOME"):
+    os.environ[_var] = os.path.join(_XDG, _var.lower())
+
+from ovos_utils.messagebus import FakeBus
+from ovos_utils.ocp import PlaybackType, PlayerState
+
+from ovos_media.mpris import MprisPlayerCtl
+from ovos_media.player import OCPMediaPlayer
+
+VLC = "org.mpris.MediaPlayer2.vlc"
+
+
+class TestMprisSync(unittest.TestCase):
+
+    def setUp(self):
+        self.player = OCPMediaPlayer(FakeBus(), config={"disable_mpris": True,
+                                                        "persist_session": False,
+                                                        "resume_positions": False})
+        # no dbus session here, only the OCP side of the sync is tested
+        with patch.object(MprisPlayerCtl, "start"):
+            self.mpris = MprisPlayerCtl(self.player, manage_players=True, sync_debounce=0)
+        self.mpris.main_player = VLC
+        self.mpris.player_meta[VLC] = {"external_player": VLC, "title": "external",
+                                       "uri": "file:///tmp/external.mp3",
+                                       "state": "Playing", "length": 100000}
+        # hold the command thread, as if a play/stop command was in flight
+        self.release = Event()
+        self.player.executor.submit("play", self.release.wait, 5)
+
+    def tearDown(self):
+        self.release.set()
+        self.player.shutdown()
+
+    def wait_idle(self):
+        done = Event()
+        self.player.executor.submit("test", done.set)
+        self.assertTrue(done.wait(5))
+
+    def test_sync_runs_on_the_command_thread(self):
+        self.mpris._update_ocp()
+        time.sleep(0.1)
+        # the in-flight command still owns the player state
+        self.assertNotEqual(self.player.now_playing.title, "external")
+        self.release.set()
+        self.wait_idle()
+        self.assertEqual(self.player.now_playing.title, "external")
+        self.assertEqual(self.player.playback_type, PlaybackType.MPRIS)
+        self.assertEqual(self.player.state, PlayerState.PLAYING)
+
+    def test_local_play_supersedes_queued_sync(self):
+        self.mpris._update_ocp()
+        self.player.executor.submit("play", lambda: None)
+        self.release.set()
+        self.wait_idle()
+        self.assertNotEqual(self.player.now_playing.title, "external")
+
+
+if __name__ == "__main__":
+    unittest.main()
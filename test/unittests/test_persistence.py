@@ -0,0 +1,75 @@
+import os
+import tempfile
+import time
+import unittest
+
+# keep the player state stores out of the user's XDG dirs
+_XDG = tempfile.mkdtemp()
+for _var in ("XDG_STATE_HOME", "XDG_CACHE_HOME", "XDG_DATA_HOME"):
+    os.environ[_var] = os.path.join(_XDG, _var.lower())
+
+from ovos_utils.ocp import MediaEntry, PlaybackType
+
+from ovos_media.persistence import PlayerSnapshotStore
+
+QUEUE_SIZE = 10000
+RESTORE_BUDGET = 1.0  # seconds, default "session_restore_budget"
+
+
+def _entry(idx: int) -> dict:
+    return {"uri": f"https://example.com/track_{idx}.mp3",
+            "title": f"track {idx}",
+            "artist": f"artist {idx % 100}",
+            "album": f"album {idx % 1000}",
+            "image": f"https://example.com/cover_{idx % 1000}.jpg",
+            "length": 180000 + idx,
+            "match_confidence": idx % 100,
+            "playback": int(PlaybackType.AUDIO)}
+
+
+class TestSessionRestore(unittest.TestCase):
+
+    def setUp(self):
+        self.name = f"test_session_{self.id().rsplit('.', 1)[-1]}"
+        self.snapshot = {
+            "now_playing": dict(_entry(42), position=61000),
+            "shuffle": False,
+            "loop_state": 0,
+            "playlist_position": 42,
+            "search_position": 0,
+            "queue": {"playlist": [_entry(i) for i in range(QUEUE_SIZE)],
+                      "search_playlist": [_entry(i) for i in range(100)]}}
+        writer = PlayerSnapshotStore(lambda include_queue: dict(self.snapshot),
+                                     debounce=0, name=self.name)
+        writer.mark_dirty(queue=True)
+        writer.flush()
+        writer.close()
+
+    def test_restore_10k_queue_within_budget(self):
+        start = time.monotonic()
+        store = PlayerSnapshotStore(lambda include_queue: {}, name=self.name)
+        snapshot = store.load()
+        elapsed = time.monotonic() - start
+        self.assertLess(elapsed, RESTORE_BUDGET)
+        self.assertEqual(len(snapshot["playlist"]), QUEUE_SIZE)
+        self.assertEqual(len(snapshot["search_playlist"]), 100)
+        self.assertIsInstance(snapshot["playlist"][0], MediaEntry)
+        self.assertEqual(snapshot["playlist"][QUEUE_SIZE - 1].uri,
+                         f"https://example.com/track_{QUEUE_SIZE - 1}.mp3")
+        self.assertEqual(snapshot["playlist_position"], 42)
+        self.assertEqual(snapshot["now_playing"]["position"], 61000)
+
+    def test_unchanged_cursor_is_not_rewritten(self):
+        store = PlayerSnapshotStore(lambda include_queue: dict(self.snapshot),
+                                    debounce=0, name=self.name)
+        mtime = os.stat(store.cursor.path).st_mtime_ns
+        time.sleep(0.01)
+        self.snapshot.pop("queue")
+        store.mark_dirty()
+        store.flush()
+        self.assertEqual(os.stat(store.cursor.path).st_mtime_ns, mtime)
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
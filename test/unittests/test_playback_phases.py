@@ -0,0 +1,236 @@
+import os
+import tempfile
+import time
+import unittest
+from threading import Event
+from unittest.mock import patch
+
+# keep the player state stores out of the user's XDG dirs
+_XDG = tempfile.mkdtemp()
+for _var in ("XDG_STATE_HOME", "XDG_CACHE_HOME", "XDG_DATA_HOME"):
+    os.environ[_var] = os.path.join(_XDG, _var.lower())
+
+from ovos_bus_client.message import Message
+from ovos_plugin_manager.templates.media import AudioPlayerBackend
+from ovos_utils.messagebus import FakeBus
+from ovos_utils.ocp import MediaState, PlaybackType, PlayerState
+
+from ovos_media.player import OCPMediaPlayer
+from ovos_media.utils import PlaybackPhase
+
+SLOW = 3  # seconds a slow step takes, stop must not wait for it
+MAX_STOP_LATENCY = 1
+
+
+class SlowBackend(AudioPlayerBackend):
+    """ audio backend taking `load_delay` seconds to load a track """
+
+    def __init__(self, config=None, bus=None):
+        super().__init__(config or {}, bus)
+        self.name = "slow"
+        self.aliases = []
+        self.load_delay = 0
+        self.loaded = []
+        self.stops = 0
+
+    def supported_uris(self):
+        return ["file", "http"]
+
+    def load_track(self, uri):
+        time.sleep(self.load_delay)
+        self.loaded.append(uri)
+        super().load_track(uri)
+
+    def play(self):
+        pass
+
+    def stop(self):
+        self.stops += 1
+        return True
+
+    def pause(self):
+        pass
+
+    def resume(self):
+        pass
+
+    def lower_volume(self):
+        pass
+
+    def restore_volume(self):
+        pass
+
+    def get_track_length(self):
+        return 0
+
+    def get_track_position(self):
+        return 0
+
+    def set_track_position(self, milliseconds):
+        pass
+
+
+def _track(name: str) -> dict:
+    return {"uri": f"file:///tmp/{name}.mp3", "title": name,
+            "playback": int(PlaybackType.AUDIO)}
+
+
+class TestStopDuringPlay(unittest.TestCase):
+    """ stop latency while a play request is in each of its phases """
+
+    def setUp(self):
+        self.bus = FakeBus()
+        self.player = OCPMediaPlayer(self.bus, config={"disable_mpris": True,
+                                                       "persist_session": False,
+                                                       "resume_positions": False})
+        self.backend = SlowBackend(bus=self.bus)
+        self.backend.set_track_start_callback(self.player.audio_service.track_start)
+        self.player.audio_service._set_services([self.backend])
+        self.resolve_delay = 0
+        self.resolve_error = {}
+        fetch = self.player.now_playing.fetch_stream
+
+        def slow_fetch(uri, video=False):
+            time.sleep(self.resolve_delay)
+            if uri in self.resolve_error:
+                raise self.resolve_error[uri]
+            return fetch(uri, video)
+
+        self.player.now_playing.fetch_stream = slow_fetch
+
+    def tearDown(self):
+        self.player.shutdown()
+
+    def wait_for(self, condition, timeout: float = 5):
+        start = time.monotonic()
+        while not condition():
+            if time.monotonic() - start > timeout:
+                self.fail("timed out waiting for the player")
+            time.sleep(0.005)
+
+    def play_and_stop(self, phase: PlaybackPhase) -> float:
+        """
+        @return: seconds from stop until the player is stopped
+        """
+        self.bus.emit(Message("ovos.common_play.play", {"media": _track("a")}))
+        self.wait_for(lambda: self.player.playback_phase == phase)
+        start = time.monotonic()
+        self.bus.emit(Message("ovos.common_play.stop"))
+        self.wait_for(lambda: self.player.state == PlayerState.STOPPED and
+                              self.player.playback_phase == PlaybackPhase.IDLE)
+        return time.monotonic() - start
+
+    def test_stop_during_resolve(self):
+        self.resolve_delay = SLOW
+        latency = self.play_and_stop(PlaybackPhase.RESOLVE)
+        self.assertLess(latency, MAX_STOP_LATENCY)
+        time.sleep(SLOW)  # let the abandoned extraction finish
+        self.assertEqual(self.backend.loaded, [])
+        self.assertEqual(self.player.state, PlayerState.STOPPED)
+
+    def test_stop_during_load(self):
+        self.backend.load_delay = SLOW
+        latency = self.play_and_stop(PlaybackPhase.LOAD)
+        self.assertLess(latency, MAX_STOP_LATENCY)
+        time.sleep(SLOW)  # let the abandoned load finish
+        # the late load is stopped again
+        self.assertEqual(self.backend.loaded, ["file:///tmp/a.mp3"])
+        self.assertGreaterEqual(self.backend.stops, 1)
+        self.assertIsNone(self.player.audio_service.current)
+        self.assertEqual(self.player.state, PlayerState.STOPPED)
+
+    def test_stop_during_start(self):
+        started = Event()
+        update_buttons = self.player.gui.update_buttons
+
+        def slow_update_buttons():
+            if self.player.playback_phase == PlaybackPhase.START:
+                started.set()
+                time.sleep(0.2)
+            update_buttons()
+
+        self.player.gui.update_buttons = slow_update_buttons
+        latency = self.play_and_stop(PlaybackPhase.START)
+        self.assertTrue(started.is_set())
+        self.assertLess(latency, MAX_STOP_LATENCY)
+        self.assertGreaterEqual(self.backend.stops, 1)
+        self.assertEqual(self.player.state, PlayerState.STOPPED)
+
+    def test_abandoned_resolve_does_not_touch_next_track(self):
+        a, b = _track("a"), _track("b")
+        self.resolve_error[a["uri"]] = RuntimeError("extraction failed")
+        self.resolve_delay = 1
+        self.bus.emit(Message("ovos.common_play.play", {"media": a}))
+        self.wait_for(lambda: self.player.playback_phase == PlaybackPhase.RESOLVE)
+        self.resolve_delay = 0  # "a" is still extracting
+        self.bus.emit(Message("ovos.common_play.play", {"media": b}))
+        self.wait_for(lambda: self.player.playback_phase == PlaybackPhase.PLAYING)
+        time.sleep(1.5)  # "a" fails after "b" started
+        self.assertEqual(self.player.now_playing.uri, b["uri"])
+        self.assertFalse(self.player.failed_uris.is_failed(b["uri"]))
+        self.assertFalse(self.player.failed_uris.is_failed(a["uri"]))
+
+    def test_stop_cancels_autoplay(self):
+        tracks = [_track("a"), _track("b")]
+        self.bus.emit(Message("ovos.common_play.play",
+                              {"media": tracks[0], "playlist": tracks}))
+        self.wait_for(lambda: self.player.playback_phase == PlaybackPhase.PLAYING)
+        self.backend.load_delay = SLOW
+        self.bus.emit(Message("ovos.common_play.media.state",
+                              {"state": int(MediaState.END_OF_MEDIA)}))
+        self.wait_for(lambda: self.player.playback_phase == PlaybackPhase.LOAD)
+        start = time.monotonic()
+        self.bus.emit(Message("ovos.common_play.stop"))
+        self.wait_for(lambda: self.player.state == PlayerState.STOPPED and
+                              self.player.playback_phase == PlaybackPhase.IDLE)
+        self.assertLess(time.monotonic() - start, MAX_STOP_LATENCY)
+
+    def test_end_of_media_autoplays_without_touching_message(self):
+        tracks = [_track("a"), _track("b")]
+        self.bus.emit(Message("ovos.common_play.play",
+                              {"media": tracks[0], "playlist": tracks}))
+        self.wait_for(lambda: self.player.playback_phase == PlaybackPhase.PLAYING)
+        ended = Message("ovos.common_play.media.state",
+                        {"state": int(MediaState.END_OF_MEDIA)})
+        self.bus.emit(ended)
+        self.wait_for(lambda: self.player.now_playing.uri == tracks[1]["uri"] and
+                              self.player.playback_phase == PlaybackPhase.PLAYING)
+        self.assertEqual(list(ended.data), ["state"])
+
+    def test_play_history_breaks_ties_for_extracted_streams(self):
+        a, b = _track("a"), _track("b")
+        self.player.now_playing.fetch_stream = \
+            lambda uri, video=False: {"uri": uri.replace("/tmp/", "/tmp/stream_")}
+        self.bus.emit(Message("ovos.common_play.play", {"media": b}))
+        self.wait_for(lambda: self.player.playback_phase == PlaybackPhase.PLAYING)
+        self.assertEqual(self.player.now_playing.uri, "file:///tmp/stream_b.mp3")
+        results = self.player.media.search_playlist
+        results.clear()
+        results.merge([dict(a, match_confidence=70), dict(b, match_confidence=70)])
+        self.assertEqual([r.uri for r in results], [b["uri"], a["uri"]])
+
+    def test_stop_during_playlist_import(self):
+        done = Event()
+
+        def slow_playlist(uri, timeout=10):
+            try:
+                for idx in range(1500):
+                    time.sleep(0.001)
+                    yield _track(f"imported_{idx}")
+            finally:  # finished or abandoned by the import
+                done.set()
+
+        with patch("ovos_media.playlist_parser.iter_playlist", slow_playlist):
+            self.bus.emit(Message("ovos.common_play.playlist.import",
+                                  {"uri": "/tmp/slow.m3u"}))
+            self.wait_for(lambda: self.player.playback_phase == PlaybackPhase.PLAYING)
+            self.bus.emit(Message("ovos.common_play.stop"))
+            self.wait_for(lambda: self.player.state == PlayerState.STOPPED and
+                                  self.player.playback_phase == PlaybackPhase.IDLE)
+            self.assertTrue(done.wait(10))
+            time.sleep(0.5)  # let any late batch reach the command thread
+        self.assertEqual(len(self.player.playlist), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import socket
+import tempfile
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Event, Thread
+
+# keep the player state stores out of the user's XDG dirs
+_XDG = tempfile.mkdtemp()
+for _var in ("XDG_STATE_HOME", "XDG_CACHE_HOME", "XDG_DATA_HOME"):
+    os.environ[_var] = os.path.join(_XDG, _var.lower())
+
+from ovos_utils.messagebus import FakeBus
+from ovos_utils.ocp import MediaEntry, PlaybackType
+
+from ovos_media.player import OCPMediaPlayer
+from ovos_media.probe import StreamProber
+
+SLOW_DELAY = 0.3
+
+
+class _StreamHandler(BaseHTTPRequestHandler):
+
+    def do_HEAD(self):
+        if self.path.startswith("/slow"):
+            time.sleep(SLOW_DELAY)
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def _dead_url() -> str:
+    # a port nothing listens on
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}/dead.mp3"
+
+
+class TestStreamProber(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _StreamHandler)
+        Thread(target=cls.server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.fast = f"{base}/fast.mp3"
+        cls.slow = f"{base}/slow.mp3"
+        cls.dead = _dead_url()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def probe(self, prober: StreamProber, uris: list):
+        done = Event()
+        prober.on_complete = done.set
+        self.assertEqual(prober.probe(uris), len(uris))
+        self.assertTrue(done.wait(5))
+
+    def test_reachability_and_latency(self):
+        prober = StreamProber(top_n=3, timeout=2)
+        self.addCleanup(prober.shutdown)
+        self.probe(prober, [self.slow, self.dead, self.fast])
+        self.assertTrue(prober.is_reachable(self.fast))
+        self.assertTrue(prober.is_reachable(self.slow))
+        self.assertFalse(prober.is_reachable(self.dead))
+        self.assertIsNone(prober.latency(self.dead))
+        self.assertLess(prober.latency(self.fast), prober.latency(self.slow))
+        self.assertEqual(prober.fastest([self.dead, self.slow, self.fast]), self.fast)
+        # nothing probed, keep the ranking
+        self.assertEqual(prober.fastest(["http://unprobed/a", "http://unprobed/b"]),
+                         "http://unprobed/a")
+
+    def test_player_prefers_fastest_of_equal_results(self):
+        player = OCPMediaPlayer(FakeBus(), config={"disable_mpris": True,
+                                                   "persist_session": False,
+                                                   "resume_positions": False,
+                                                   "probe_streams": True})
+        self.addCleanup(player.shutdown)
+        results = [MediaEntry(uri=uri, title=uri, match_confidence=80,
+                              playback=PlaybackType.AUDIO)
+                   for uri in (self.dead, self.slow, self.fast)]
+        results.append(MediaEntry(uri="http://127.0.0.1:1/best.mp3", title="best",
+                                  match_confidence=90, playback=PlaybackType.AUDIO))
+        player.media.search_playlist.merge(results)
+        self.probe(player.stream_prober, [self.dead, self.slow, self.fast])
+        # the best match comes first, the tie below it is decided by latency
+        player.media.search_playlist.set_position(1)
+        player._goto_fastest_search_result()
+        self.assertEqual(player.media.search_playlist.current_track.uri, self.fast)
+        # a higher ranked entry is not skipped for a faster one
+        player.media.search_playlist.set_position(0)
+        player._goto_fastest_search_result()
+        self.assertEqual(player.media.search_playlist.current_track.title, "best")
+
+
+if __name__ == "__main__":
+    unittest.main()
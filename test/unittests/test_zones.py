@@ -0,0 +1,68 @@
+import os
+import tempfile
+import time
+import unittest
+from threading import Event
+
+# keep the player state stores out of the user's XDG dirs
+_XDG = tempfile.mkdtemp()
+for _var in ("XDG_STATE_HOME", "XDG_CACHE_HOME", "XDG_DATA_HOME"):
+    os.environ[_var] = os.path.join(_XDG, _var.lower())
+
+from ovos_bus_client.message import Message
+from ovos_utils.messagebus import FakeBus
+from ovos_utils.ocp import PlaybackType
+
+from ovos_media.player import OCPMediaPlayer
+from ovos_media.utils import PlaybackPhase
+from ovos_media.zones import ZoneBus
+
+CONFIG = {"disable_mpris": True, "persist_session": False,
+          "resume_positions": False, "idle_unload_timeout": 3600}
+
+
+class TestSharedResources(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = FakeBus()
+        self.default = OCPMediaPlayer(ZoneBus(self.bus), config=CONFIG)
+        self.kitchen = OCPMediaPlayer(ZoneBus(self.bus, "kitchen"), zone="kitchen",
+                                      config=dict(CONFIG, disable_gui=True),
+                                      shared=self.default)
+
+    def tearDown(self):
+        self.kitchen.shutdown()
+        self.default.shutdown()
+
+    def test_extractors_kept_while_any_zone_resolves(self):
+        extracting, done = Event(), Event()
+
+        def slow_fetch(uri, video=False):
+            extracting.set()
+            done.wait(5)
+            return {"uri": uri}
+
+        self.kitchen.now_playing.fetch_stream = slow_fetch
+        self.bus.emit(Message("ovos.common_play.play",
+                              {"media": {"uri": "file:///tmp/a.mp3", "title": "a",
+                                         "playback": int(PlaybackType.AUDIO)}},
+                              {"session": {"session_id": "kitchen"}}))
+        self.assertTrue(extracting.wait(5))
+        self.assertEqual(self.kitchen.playback_phase, PlaybackPhase.RESOLVE)
+        self.assertEqual(self.default.playback_phase, PlaybackPhase.IDLE)
+        self.assertNotIn("stream_extractors", self.default.reclaimer.reclaim(0))
+        done.set()
+        start = time.monotonic()
+        while self.kitchen.playback_phase == PlaybackPhase.RESOLVE and \
+                time.monotonic() - start < 5:
+            time.sleep(0.01)
+        self.assertIn("stream_extractors", self.default.reclaimer.reclaim(0))
+
+    def test_removed_zone_is_not_tracked(self):
+        self.assertIn(self.kitchen, self.default.zone_players)
+        self.kitchen.shutdown()
+        self.assertNotIn(self.kitchen, self.default.zone_players)
+
+
+if __name__ == "__main__":
+    unittest.main()